@@ -0,0 +1,506 @@
+#!/usr/bin/env python
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+# Import local modules
+sys.path.append(os.path.dirname(__file__))
+import norm_cache
+from index import iter_upload, query_flag
+from metrics import ParseMetrics
+from multipart import CHUNK_SIZE, MultipartError
+from parse_file import EVENT_INDEX, SCHOOL_INDEX, output_columns, write_results
+from review import ReviewSummary
+from writers import OUTPUT_FORMATS, format_available
+
+# Pool sizing, overridable from the environment when an ASGI server such as
+# uvicorn imports the app
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", os.cpu_count() or 1))
+PARSE_QUEUE = int(os.environ.get("PARSE_QUEUE", 2 * PARSE_WORKERS))
+
+# Largest request body buffered for a worker
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 64 * 1024 * 1024))
+
+# Largest request line and header block the built-in server reads
+MAX_HEADER_BYTES = 64 * 1024
+
+def preload_index(cache_size: int = norm_cache.DEFAULT_CACHE_SIZE) -> None:
+    """
+    Get a worker process ready to parse: the alias indexes are loaded when
+    parse_file is imported, and the fuzzy scorers and any trigram blocking
+    index are built here so the first job does not pay for them.
+
+    Args:
+        cache_size (int): Entries kept in the worker's normalization cache.
+    """
+    norm_cache.configure_cache(cache_size, norm_cache.DEFAULT_CACHE_DB)
+    EVENT_INDEX.scorer
+    SCHOOL_INDEX.scorer
+    SCHOOL_INDEX.blocker
+
+def parse_upload(body: bytes, content_type: str, output_format: str = "csv", mark_values: bool = False,
+                 profile: bool = False) -> Tuple[int, str, bytes]:
+    """
+    Parse a buffered multipart upload inside a pool worker.
+
+    Args:
+        body (bytes): The whole request body.
+        content_type (str): Request Content-Type, with the boundary.
+        output_format (str): Name of a writer in OUTPUT_FORMATS.
+        mark_values (bool): Add the numeric mark columns.
+        profile (bool): Return stage timings and counters with a CSV.
+
+    Returns:
+        tuple: (HTTP status, content type, response body); CSV is wrapped in
+            the same JSON envelope as the plain HTTP handler, with the
+            unmatched strings summarized.
+    """
+    writer = OUTPUT_FORMATS[output_format]
+    metrics = ParseMetrics() if profile else None
+    summary = ReviewSummary()
+    headers = {"content-type": content_type, "content-length": str(len(body))}
+
+    try:
+        rows = iter_upload(io.BytesIO(body), headers, metrics, mark_values)
+        if rows is None:
+            return error_body(400, "Missing results file")
+
+        sink = io.BytesIO() if writer.binary else io.StringIO()
+        write_results(summary.track(rows), sink, metrics, output_columns(mark_values), output_format)
+
+    except MultipartError as e:
+        return error_body(400, str(e))
+
+    except Exception as e:
+        return error_body(500, str(e))
+
+    # Other formats are the raw response body
+    if output_format != "csv":
+        data = sink.getvalue()
+        return 200, writer.content_type, data if writer.binary else data.encode()
+
+    response = {"success": True, "data": sink.getvalue(), "unresolved": summary.unresolved()}
+    if metrics:
+        response["metrics"] = metrics.as_dict()
+    return 200, "application/json", json.dumps(response).encode()
+
+def content_length(value: str) -> Optional[int]:
+    """
+    Read a Content-Length header value.
+
+    Returns:
+        int: The length, or None if the value is not a plain decimal number.
+    """
+    value = value.strip()
+    return int(value) if value.isascii() and value.isdigit() else None
+
+def error_body(status: int, message: str) -> Tuple[int, str, bytes]:
+    """
+    Build a JSON error response.
+    """
+    return status, "application/json", json.dumps({"success": False, "error": message}).encode()
+
+class WorkerPool:
+    """
+    Bounded process pool for parse jobs.
+
+    At most `capacity` jobs are in flight at once: one running on each
+    worker and the rest waiting in the executor's queue. Requests beyond
+    that are turned away rather than queued without limit, so a burst of
+    uploads cannot pile up unbounded memory or latency.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, queue_size: int = PARSE_QUEUE,
+                 cache_size: int = norm_cache.DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            workers (int): Worker processes.
+            queue_size (int): Jobs allowed to wait for a free worker.
+            cache_size (int): Normalization cache entries per worker.
+        """
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counters = {"accepted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+        # Moving average of job time, for Retry-After estimates
+        self.average_seconds: Optional[float] = None
+
+    def executor(self) -> ProcessPoolExecutor:
+        """
+        Start the worker processes on first use, with the indexes loaded in
+        the parent first so forked workers share them.
+        """
+        if self._executor is None:
+            preload_index(self.cache_size)
+            self._executor = ProcessPoolExecutor(self.workers, initializer=preload_index,
+                                                 initargs=(self.cache_size,))
+        return self._executor
+
+    def reserve(self) -> bool:
+        """
+        Claim a slot for a job.
+
+        Returns:
+            bool: False if the pool is full and the request should be
+                retried later.
+        """
+        if self.in_flight >= self.capacity:
+            self.counters["rejected"] += 1
+            return False
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.counters["accepted"] += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Give back a slot claimed with reserve().
+        """
+        self.in_flight -= 1
+
+    async def run(self, function, *args):
+        """
+        Run a function on a worker, in a slot claimed with reserve().
+
+        Returns:
+            The function's return value.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+
+        try:
+            result = await loop.run_in_executor(self.executor(), function, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next job
+            self.counters["failed"] += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+
+        seconds = time.perf_counter() - start
+        self.average_seconds = seconds if self.average_seconds is None else 0.8 * self.average_seconds + 0.2 * seconds
+        self.counters["completed"] += 1
+        return result
+
+    def retry_after(self) -> int:
+        """
+        Estimate how many seconds until a slot frees up.
+        """
+        average = self.average_seconds or 1.0
+        waiting = max(0, self.in_flight - self.workers) + 1
+        return max(1, math.ceil(average * waiting / self.workers))
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Return the pool's queue depth and job counters.
+        """
+        running = min(self.in_flight, self.workers)
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "running": running,
+            "queued": self.in_flight - running,
+            "peak_in_flight": self.peak_in_flight,
+            **self.counters,
+            "average_seconds": round(self.average_seconds, 6) if self.average_seconds is not None else None,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+class ParseApp:
+    """
+    ASGI application that parses uploads on a WorkerPool.
+
+    POST takes the same multipart upload and query options (?format=,
+    ?marks=1, ?profile=1) as the plain HTTP handler, and answers 429 with a
+    Retry-After header when the pool is full. GET .../metrics returns the
+    pool's queue depth and counters as JSON.
+    """
+
+    def __init__(self, pool: Optional[WorkerPool] = None, max_upload: int = MAX_UPLOAD_BYTES):
+        """
+        Args:
+            pool (WorkerPool): Pool to run parses on, sized from the
+                environment by default.
+            max_upload (int): Largest request body accepted, in bytes.
+        """
+        self.pool = pool or WorkerPool()
+        self.max_upload = max_upload
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] == "GET" and scope["path"].rstrip("/").endswith("/metrics"):
+            await send_response(send, 200, "application/json", json.dumps(self.pool.stats()).encode())
+        elif scope["method"] == "POST":
+            await self.parse(scope, receive, send)
+        else:
+            await send_response(send, *error_body(405, "Expected POST"))
+
+    async def lifespan(self, receive, send) -> None:
+        """
+        Start the workers with the server and stop them on shutdown.
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.pool.executor()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.pool.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def parse(self, scope, receive, send) -> None:
+        """
+        Check a parse request, buffer its body and hand it to a worker.
+        """
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith("multipart/form-data"):
+            await send_response(send, *error_body(400, "Expected multipart/form-data"))
+            return
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        output_format = query.get("format", ["csv"])[0]
+        if output_format not in OUTPUT_FORMATS:
+            message = f"Unknown format {output_format}, expected one of {', '.join(OUTPUT_FORMATS)}"
+            await send_response(send, *error_body(400, message))
+            return
+        if not format_available(output_format):
+            await send_response(send, *error_body(501, f"The {output_format} format needs pyarrow installed"))
+            return
+        mark_values = query_flag(query, "marks") or OUTPUT_FORMATS[output_format].mark_values
+
+        length = content_length(headers["content-length"]) if "content-length" in headers else 0
+        if length is None:
+            await send_response(send, *error_body(400, "Invalid Content-Length"))
+            return
+        if length > self.max_upload:
+            await send_response(send, *error_body(413, f"Upload larger than {self.max_upload} bytes"))
+            return
+
+        # Turn the request away before reading its body if every slot is taken
+        if not self.pool.reserve():
+            retry_after = self.pool.retry_after()
+            await send_response(send, *error_body(429, "Too many parses in progress, retry later"),
+                                [(b"retry-after", str(retry_after).encode())])
+            return
+
+        try:
+            body = await read_body(receive, self.max_upload)
+            if body is None:
+                await send_response(send, *error_body(413, f"Upload larger than {self.max_upload} bytes"))
+                return
+
+            try:
+                status, response_type, response = await self.pool.run(
+                    parse_upload, body, content_type, output_format, mark_values, query_flag(query, "profile"))
+            except Exception as e:
+                status, response_type, response = error_body(500, str(e))
+        finally:
+            self.pool.release()
+
+        extra_headers = []
+        if status == 200 and output_format != "csv":
+            disposition = f'attachment; filename="results{OUTPUT_FORMATS[output_format].extension}"'
+            extra_headers.append((b"content-disposition", disposition.encode()))
+        await send_response(send, status, response_type, response, extra_headers)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        self.pool.shutdown()
+
+async def read_body(receive, limit: int) -> Optional[bytes]:
+    """
+    Read a whole ASGI request body.
+
+    Returns:
+        bytes: The body, or None if it is larger than limit.
+    """
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+
+        if not message.get("more_body", False):
+            break
+
+    return b"".join(chunks)
+
+async def send_response(send, status: int, content_type: str, body: bytes,
+                        extra_headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    """
+    Send a complete ASGI response.
+    """
+    headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers + (extra_headers or [])})
+    await send({"type": "http.response.body", "body": body})
+
+# Application for ASGI servers, e.g. `uvicorn asgi:app` from this directory
+app = ParseApp()
+
+async def handle_connection(app, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serve one HTTP/1.1 request on a connection of the built-in server, then
+    close it.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        writer.close()
+        return
+
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = request_line.split(" ")
+    except ValueError:
+        writer.close()
+        return
+
+    headers = []
+    for line in header_lines:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+            lines += [f"{name.decode('latin-1')}: {value.decode('latin-1')}" for name, value in message["headers"]]
+            lines.append("connection: close")
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        elif message["type"] == "http.response.body":
+            writer.write(message.get("body", b""))
+            await writer.drain()
+
+    # A body without a readable length cannot be framed, so it is refused
+    lengths = [value for name, value in headers if name == b"content-length"]
+    remaining = content_length(lengths[0].decode("latin-1")) if lengths else 0
+    if remaining is None:
+        with contextlib.suppress(ConnectionError):
+            await send_response(send, *error_body(400, "Invalid Content-Length"))
+        writer.close()
+        return
+
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": version.partition("/")[2] or "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "query_string": query.encode("latin-1"),
+        "headers": headers,
+        "client": writer.get_extra_info("peername"),
+        "server": writer.get_extra_info("sockname"),
+    }
+
+    body_done = False
+
+    async def receive():
+        nonlocal remaining, body_done
+        if body_done:
+            return {"type": "http.disconnect"}
+
+        chunk = await reader.read(min(CHUNK_SIZE, remaining)) if remaining else b""
+        remaining -= len(chunk)
+        body_done = not chunk or remaining <= 0
+        return {"type": "http.request", "body": chunk, "more_body": not body_done}
+
+    try:
+        await app(scope, receive, send)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(app: ParseApp, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """
+    Run the app on a minimal built-in HTTP/1.1 server, for local testing
+    without an ASGI server installed.
+    """
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(app, reader, writer),
+                                        host, port, limit=MAX_HEADER_BYTES)
+    app.pool.executor()
+    print(f"Serving on http://{host}:{port} with {app.pool.workers} workers, "
+          f"{app.pool.capacity} jobs in flight at most")
+
+    # Stop cleanly on Ctrl-C or kill, so no worker processes are left behind
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(signal_number, stop.set)
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        app.close()
+
+if __name__ == "__main__":
+    '''
+    Run the parse service locally on the built-in server.
+    '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the results parser with a worker process pool.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="Worker processes (default: CPU count)")
+    parser.add_argument("--queue", type=int, default=None,
+                        help="Jobs allowed to wait for a worker before requests get 429 (default: 2 per worker)")
+    parser.add_argument("--max-upload", type=int, default=MAX_UPLOAD_BYTES, help="Largest upload in bytes")
+    args = parser.parse_args()
+
+    queue_size = args.queue if args.queue is not None else 2 * args.workers
+    service = ParseApp(WorkerPool(args.workers, queue_size), args.max_upload)
+
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
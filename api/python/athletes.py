@@ -0,0 +1,452 @@
+#!/usr/bin/env python
+import atexit
+import bisect
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from renormalize import find_outputs, read_output, write_atomic
+from rows import ResultRow
+
+# rapidfuzz is imported on the first comparison, like the alias indexes
+
+# Defaults can be overridden per deployment through the environment; no
+# index is kept unless a path is given
+DEFAULT_ATHLETE_DB = os.environ.get("ATHLETE_INDEX_DB") or None
+
+# Minimum score (inclusive) for two names in a block to be the same athlete
+ATHLETE_MATCH_THRESHOLD = float(os.environ.get("ATHLETE_MATCH_THRESHOLD", 80))
+
+# Athletes compared on each side of a new name in its block's sorted order
+NEIGHBORHOOD = int(os.environ.get("ATHLETE_NEIGHBORHOOD", 4))
+
+# Letters of the last name in the prefix blocking key
+PREFIX_LENGTH = 3
+
+# Output column added by the athlete stage
+ATHLETE_COLUMN = "Athlete ID"
+
+# Class words used instead of grade numbers
+CLASS_GRADES = {"fr": 9, "so": 10, "jr": 11, "sr": 12}
+
+# Soundex digit of every letter; vowels, h, w and y separate repeated digits
+SOUNDEX_CODES = {letter: str(code) for code, letters in
+                 enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for letter in letters}
+
+# Anything but a letter is dropped from names before comparing them
+# ("O'Brien" -> "obrien", "St. Pierre" -> "stpierre")
+non_letter_pattern = re.compile(r"[^a-z]")
+meet_date_pattern = re.compile(r"(\d{4})-(\d{1,2})")
+
+class Athlete(NamedTuple):
+    """
+    One athlete in the index, as first seen.
+    """
+    id: int
+    school: str
+    last_name: str
+    first_name: str
+    gender: str
+    class_of: Optional[int]
+    grade: Optional[int]
+
+    @property
+    def sort_key(self) -> str:
+        return name_key(self.last_name) + " " + name_key(self.first_name)
+
+def name_key(name: str) -> str:
+    """
+    Reduce a name to lowercase ASCII letters, dropping accents and
+    punctuation.
+    """
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return non_letter_pattern.sub("", name.lower())
+
+def soundex(name: str) -> str:
+    """
+    American Soundex code of a name key, e.g. "smyth" -> "S530".
+    """
+    if not name:
+        return ""
+
+    digits = []
+    previous = SOUNDEX_CODES.get(name[0])
+    for letter in name[1:]:
+        code = SOUNDEX_CODES.get(letter)
+        if code != "0" and code != previous:
+            digits.append(code)
+        # H and W do not separate letters with the same digit
+        if letter not in "hw":
+            previous = code
+
+    return (name[0].upper() + "".join(digits) + "000")[:4]
+
+def blocking_keys(school: str, last_key: str, first_key: str) -> List[str]:
+    """
+    Return the blocks a name is compared in, all within its school: the
+    Soundex code of its last name, the first letters of its last name, and
+    the initial of its last name with the Soundex code of its first name.
+    Each key catches misspellings the others miss ("Smyth" and "Smith" share
+    a code, "Kowalski" and "Kowlaski" share a prefix, "Hamstan" and
+    "Hasmtan" share neither but are both Alex H.).
+    """
+    return [f"{school}\x1fS{soundex(last_key)}", f"{school}\x1fP{last_key[:PREFIX_LENGTH]}",
+            f"{school}\x1fF{last_key[:1]}{soundex(first_key)}"]
+
+def parse_grade(grade: str) -> Optional[int]:
+    """
+    Read a grade as a number, from "11" or a class word such as "JR".
+    """
+    grade = grade.strip().lower()
+    if grade.isdigit():
+        return int(grade)
+    return CLASS_GRADES.get(grade[:2])
+
+def class_year(grade: Optional[int], meet_date: str) -> Optional[int]:
+    """
+    Return the year an athlete graduates, from their grade and the date of
+    the meet ("2023-01-01"), or None if either is unknown. Class years stay
+    the same from season to season while grades do not.
+    """
+    match = meet_date_pattern.match(meet_date or "")
+    if grade is None or not 1 <= grade <= 12 or match is None:
+        return None
+
+    # School years end in the spring
+    year, month = int(match.group(1)), int(match.group(2))
+    return year + (month >= 7) + 12 - grade
+
+class AthleteIndex:
+    """
+    Persistent index of athletes across meets, linking every result row to
+    a stable athlete ID.
+
+    A row's name is compared only with the athletes in its blocks (same
+    school, and the same Soundex code or prefix of the last name, or the
+    same first name and last initial), and within a block only
+    with the NEIGHBORHOOD athletes on either side of it in sorted name
+    order, so linking a meet never compares it against the whole season.
+    Names already linked are found by an exact key without comparing at
+    all. New meets are linked against the stored index incrementally; IDs
+    are never reassigned.
+
+    One process links into an index at a time.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: float = ATHLETE_MATCH_THRESHOLD,
+                 neighborhood: int = NEIGHBORHOOD):
+        """
+        Open (and create if needed) the index.
+
+        Args:
+            db_path (str): Path to the SQLite file. Without one the index
+                only lives as long as this object, and IDs are only stable
+                within one run.
+            threshold (float): Minimum name score for a link.
+            neighborhood (int): Athletes compared on each side in a block.
+        """
+        # Only runs that link athletes pay for importing sqlite3
+        import sqlite3
+
+        self.threshold = threshold
+        self.neighborhood = neighborhood
+        self.compared = 0
+        self.linked = 0
+        self.created = 0
+
+        self._db = sqlite3.connect(db_path or ":memory:", timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS athletes ("
+            " id INTEGER PRIMARY KEY, school TEXT NOT NULL, last_name TEXT NOT NULL, first_name TEXT NOT NULL,"
+            " gender TEXT NOT NULL, class_of INTEGER, grade INTEGER);"
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " block TEXT NOT NULL, athlete INTEGER NOT NULL, PRIMARY KEY (block, athlete)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS records ("
+            " record TEXT PRIMARY KEY, athlete INTEGER NOT NULL) WITHOUT ROWID;"
+        )
+        self._db.commit()
+
+        # Fields linked this run, and blocks loaded from the store as
+        # (sorted name keys, athletes in the same order)
+        self._rows: Dict[tuple, object] = {}
+        self._blocks: Dict[str, Tuple[List[str], List[Athlete]]] = {}
+        self._ratio = None
+
+        # Commit anything still pending when the process exits
+        atexit.register(self.flush)
+
+    @property
+    def ratio(self):
+        """
+        The rapidfuzz name scorer, imported on first use.
+        """
+        if self._ratio is None:
+            from rapidfuzz import fuzz
+            self._ratio = fuzz.ratio
+        return self._ratio
+
+    def link_row(self, row: ResultRow) -> object:
+        """
+        Return the athlete ID of a parsed row, see link().
+
+        Args:
+            row (ResultRow): Parsed row, with its meet metadata.
+
+        Returns:
+            object: The athlete ID, or "" for rows without a name.
+        """
+        return self.link(row.school, row.last_name, row.first_name, row.gender, row.grade,
+                         row.meta.get("Meet Date", ""))
+
+    def link(self, school: str, last_name: str, first_name: str, gender: str, grade: str,
+             meet_date: str = "") -> object:
+        """
+        Link one athlete's fields to an athlete ID, adding the athlete to
+        the index if no one in its blocks matches.
+
+        Args:
+            school (str): Standardized school name.
+            last_name (str): Last name.
+            first_name (str): First name.
+            gender (str): Gender of the event, "" if unknown.
+            grade (str): Grade or class word, "" if unknown.
+            meet_date (str): Date of the meet, for the class year.
+
+        Returns:
+            object: The athlete ID, or "" if the name is blank.
+        """
+        # An athlete entered in several events is linked once per run
+        fields = (school, last_name, first_name, gender, grade, meet_date)
+        athlete = self._rows.get(fields)
+        if athlete is None:
+            athlete = self._rows[fields] = self._link(*fields)
+        return athlete
+
+    def _link(self, school: str, last_name: str, first_name: str, gender: str, grade: str,
+              meet_date: str) -> object:
+        """
+        Link fields not seen in this run.
+        """
+        last_key, first_key = name_key(last_name or ""), name_key(first_name or "")
+        if not last_key:
+            return ""
+
+        number = parse_grade(grade or "")
+        class_of = class_year(number, meet_date)
+        record = "\x1f".join((school or "", last_key, first_key, gender or "",
+                              f"c{class_of}" if class_of else f"g{number or ''}"))
+
+        # Seen before, in this run or an earlier one
+        found = self._db.execute("SELECT athlete FROM records WHERE record = ?", (record,)).fetchone()
+        if found is not None:
+            self.linked += 1
+            return found[0]
+
+        new = Athlete(0, school or "", last_name, first_name or "", gender or "", class_of, number)
+        keys = blocking_keys(new.school, last_key, first_key)
+        match = self._best_match(new, keys)
+        if match is None:
+            match = self._add(new, keys)
+            self.created += 1
+        else:
+            self.linked += 1
+
+        self._db.execute("INSERT INTO records VALUES (?, ?)", (record, match))
+        return match
+
+    def _best_match(self, new: Athlete, keys: List[str]) -> Optional[int]:
+        """
+        Compare a name with its neighbors in each of its blocks.
+
+        Returns:
+            int: ID of the best scoring compatible athlete, or None.
+        """
+        sort_key = new.sort_key
+        best, best_score = None, 0.0
+        seen = set()
+
+        for key in keys:
+            names, athletes = self._block(key)
+            position = bisect.bisect_left(names, sort_key)
+            for athlete in athletes[max(0, position - self.neighborhood):position + self.neighborhood]:
+                if athlete.id in seen or not compatible(new, athlete):
+                    continue
+                seen.add(athlete.id)
+
+                score = self.score(new, athlete)
+                self.compared += 1
+                # Ties keep the athlete compared first
+                if score >= self.threshold and score > best_score:
+                    best, best_score = athlete.id, score
+
+        return best
+
+    def score(self, new: Athlete, athlete: Athlete) -> float:
+        """
+        Score two names out of 100: last names must match closely, and first
+        names either match closely or one starts with the other ("Chris",
+        "Christopher", "J").
+        """
+        ratio = self.ratio
+        last = ratio(name_key(new.last_name), name_key(athlete.last_name))
+        if last < self.threshold:
+            return 0.0
+
+        first, other = name_key(new.first_name), name_key(athlete.first_name)
+        if first and other and (first.startswith(other) or other.startswith(first)):
+            return last
+        return (last + ratio(first, other)) / 2
+
+    def _block(self, key: str) -> Tuple[List[str], List[Athlete]]:
+        """
+        Return a block's athletes in sorted name order, loading it from the
+        store the first time it is needed.
+        """
+        block = self._blocks.get(key)
+        if block is None:
+            athletes = [Athlete(*fields) for fields in self._db.execute(
+                "SELECT a.id, a.school, a.last_name, a.first_name, a.gender, a.class_of, a.grade"
+                " FROM blocks b JOIN athletes a ON a.id = b.athlete WHERE b.block = ?", (key,))]
+            athletes.sort(key=lambda athlete: athlete.sort_key)
+            block = self._blocks[key] = ([athlete.sort_key for athlete in athletes], athletes)
+        return block
+
+    def _add(self, new: Athlete, keys: List[str]) -> int:
+        """
+        Store a new athlete and insert it into its blocks.
+
+        Returns:
+            int: The new athlete ID.
+        """
+        cursor = self._db.execute("INSERT INTO athletes VALUES (NULL, ?, ?, ?, ?, ?, ?)", new[1:])
+        athlete = new._replace(id=cursor.lastrowid)
+
+        sort_key = athlete.sort_key
+        for key in keys:
+            self._db.execute("INSERT OR IGNORE INTO blocks VALUES (?, ?)", (key, athlete.id))
+            names, athletes = self._block(key)
+            if athlete.id in (other.id for other in athletes):
+                continue
+            position = bisect.bisect_left(names, sort_key)
+            names.insert(position, sort_key)
+            athletes.insert(position, athlete)
+
+        return athlete.id
+
+    def flush(self) -> None:
+        """
+        Commit the athletes and links added so far.
+        """
+        self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return linking counters for reporting.
+        """
+        athletes = self._db.execute("SELECT COUNT(*) FROM athletes").fetchone()[0]
+        return {"athletes": athletes, "linked": self.linked, "created": self.created, "compared": self.compared}
+
+def compatible(new: Athlete, athlete: Athlete) -> bool:
+    """
+    Return whether two records could be the same athlete apart from their
+    names: same gender when both are known, the same class year when both
+    meets are dated, and grades at most one apart otherwise.
+    """
+    if new.gender and athlete.gender and new.gender != athlete.gender:
+        return False
+    if new.class_of is not None and athlete.class_of is not None:
+        return new.class_of == athlete.class_of
+    if new.grade is not None and athlete.grade is not None:
+        return abs(new.grade - athlete.grade) <= 1
+    return True
+
+def link_file(output: str, index: AthleteIndex) -> Dict[str, object]:
+    """
+    Add or refresh the athlete ID column of a CSV or NDJSON output.
+
+    Args:
+        output (str): Output file written by parse_file.py or batch.py.
+        index (AthleteIndex): Index to link against.
+
+    Returns:
+        Dict[str, object]: Report with rows, names linked to athletes in the
+            index, athletes created and seconds.
+    """
+    start = time.perf_counter()
+    before = (index.linked, index.created)
+    records = read_output(output)
+    ndjson = output.endswith(".ndjson")
+
+    # Empty outputs, without even a CSV header, are left as they are
+    if not records:
+        return {"file": output, "rows": 0, "linked": 0, "created": 0,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    if ndjson:
+        for record in records:
+            record[ATHLETE_COLUMN] = index.link(record.get("School", ""), record.get("Last Name", ""),
+                                                record.get("First Name", ""), record.get("Gender", ""),
+                                                str(record.get("Grade") or ""), record.get("Meet Date", ""))
+        text = "".join(json.dumps(record) + "\n" for record in records)
+    else:
+        header, body = records[0], records[1:]
+        if ATHLETE_COLUMN not in header:
+            header.append(ATHLETE_COLUMN)
+        columns = [header.index(column) if column in header else None for column in
+                   ("School", "Last Name", "First Name", "Gender", "Grade", "Meet Date")]
+        target = header.index(ATHLETE_COLUMN)
+
+        for record in body:
+            fields = ["" if column is None else record[column] for column in columns]
+            record[target:target + 1] = [index.link(*fields)]
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(records)
+        text = buffer.getvalue()
+
+    write_atomic(output, text)
+    index.flush()
+
+    return {
+        "file": output,
+        "rows": len(records) - (not ndjson),
+        "linked": index.linked - before[0],
+        "created": index.created - before[1],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+if __name__ == "__main__":
+    '''
+    Link the athletes of parsed outputs to a persistent athlete index.
+    '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Add stable athlete IDs to parsed outputs, linking each meet's "
+                                                 "athletes to the ones already in the index.")
+    parser.add_argument("inputs", nargs="+", help="Output CSV/NDJSON files, directories or globs, linked in order")
+    parser.add_argument("--athlete-db", default=DEFAULT_ATHLETE_DB, required=DEFAULT_ATHLETE_DB is None,
+                        help="SQLite athlete index, created if needed")
+    args = parser.parse_args()
+
+    outputs = find_outputs(args.inputs, raw_only=False)
+    if not outputs:
+        print(f"Error: no CSV or NDJSON outputs match {' '.join(args.inputs)}")
+        sys.exit(1)
+
+    index = AthleteIndex(args.athlete_db)
+    start = time.perf_counter()
+    for output in outputs:
+        report = link_file(output, index)
+        print(f"{report['file']}: {report['rows']} rows, {report['linked']} linked, "
+              f"{report['created']} new athletes, {report['seconds']:.3f}s")
+
+    stats = index.stats()
+    print(f"{len(outputs)} files linked in {time.perf_counter() - start:.3f}s, {stats['athletes']} athletes "
+          f"in the index, {stats['compared']} name comparisons")
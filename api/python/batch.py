@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Importing the parser builds the school and event indexes once, before the
+# pool starts, so forked workers share them
+import norm_cache
+import result_cache
+from athletes import AthleteIndex, link_file
+from formats import RESULT_FORMATS
+from parse_file import iter_results, output_columns, write_results
+from renormalize import RawFieldRecorder
+from writers import OUTPUT_FORMATS, format_available
+
+def find_files(pattern: str) -> List[str]:
+    """
+    Expand a directory or glob into a sorted list of results files.
+
+    Args:
+        pattern (str): A directory (every .txt file in it or its subfolders
+            is used) or a glob, where ** matches any number of folders.
+
+    Returns:
+        List[str]: Paths of the matching files.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.txt")
+
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def load_manifest(manifest_path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Load per-file meet metadata.
+
+    A CSV manifest has a "File" column plus one column per metadata field. A
+    JSON manifest is either an object mapping file names to metadata, or a
+    list of metadata objects that each have a "File" key.
+
+    Args:
+        manifest_path (str): Path to the CSV or JSON manifest.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Metadata keyed by file name.
+    """
+    with open(manifest_path, "r", newline="") as file:
+        if manifest_path.lower().endswith(".json"):
+            entries = json.load(file)
+            if isinstance(entries, dict):
+                return {name: dict(metadata) for name, metadata in entries.items()}
+        else:
+            entries = list(csv.DictReader(file))
+
+    manifest = {}
+    for entry in entries:
+        entry = dict(entry)
+        manifest[entry.pop("File")] = entry
+
+    return manifest
+
+def find_metadata(manifest: Dict[str, Dict[str, str]], path: str) -> Optional[Dict[str, str]]:
+    """
+    Find the manifest entry for a file, by path as given or by file name.
+    """
+    for key in (path, os.path.normpath(path), os.path.basename(path)):
+        if key in manifest:
+            return manifest[key]
+    return None
+
+def init_worker(cache_size: int, cache_db: Optional[str], result_cache_dir: Optional[str] = None) -> None:
+    """
+    Prepare a pool worker.
+
+    Forked workers inherit the indexes built by the parent; each worker gets
+    its own cache connection so the SQLite store is not shared across forks.
+    """
+    norm_cache.configure_cache(cache_size, cache_db)
+    result_cache.configure_result_cache(result_cache_dir)
+
+def parse_one(path: str, metadata: Dict[str, str], output_path: Optional[str],
+              options: Dict[str, bool], output_format: str = "csv",
+              keep_raw: bool = False) -> Tuple[str, int, int, float, str, Optional[str]]:
+    """
+    Parse a single file inside a pool worker.
+
+    Args:
+        path (str): Results file to parse.
+        metadata (Dict[str, str]): Meet metadata for the file.
+        output_path (str): File to write for this meet, or None to return the
+            rows as text for the merged output.
+        options (Dict[str, bool]): Parser options (batch_schools, fixed_width,
+            mark_values, encoding, input_format).
+        output_format (str): Name of a writer in OUTPUT_FORMATS; only the
+            text formats can be merged.
+        keep_raw (bool): Save the raw event and school strings next to the
+            per-meet output, for renormalize.py.
+
+    Returns:
+        tuple: (path, rows, review rows, seconds, text without CSV header,
+            error message or None). A file that fails to parse returns its
+            error instead of raising, so the rest of the batch still runs.
+    """
+    start = time.perf_counter()
+    try:
+        row_count, review, text = parse_rows(path, metadata, output_path, options, output_format, keep_raw)
+    except Exception as error:
+        # Remove a half-written output so it is not taken for a parsed meet
+        if output_path and os.path.exists(output_path):
+            os.remove(output_path)
+        return path, 0, 0, time.perf_counter() - start, "", f"{type(error).__name__}: {error}"
+
+    return path, row_count, review, time.perf_counter() - start, text, None
+
+def parse_rows(path: str, metadata: Dict[str, str], output_path: Optional[str], options: Dict[str, bool],
+               output_format: str, keep_raw: bool) -> Tuple[int, int, str]:
+    """
+    Parse one file for parse_one, returning (rows, review rows, text).
+    """
+    counts = {"review": 0}
+
+    def counted(rows):
+        # Count review-flagged rows as they stream past
+        for row in rows:
+            if row.review:
+                counts["review"] += 1
+            yield row
+
+    rows = counted(iter_results(path, metadata, **options))
+    columns = output_columns(options.get("mark_values", False))
+
+    if output_path:
+        recorder = RawFieldRecorder() if keep_raw else None
+        if recorder:
+            rows = recorder.track(rows)
+        row_count = write_results(rows, output_path, columns=columns, output_format=output_format)
+        if recorder:
+            recorder.save(output_path)
+        text = ""
+    elif output_format == "csv":
+        # The merged output writes the header once
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        row_count = 0
+        for row in rows:
+            writer.writerow(row.cells(columns))
+            row_count += 1
+        text = buffer.getvalue()
+    else:
+        buffer = io.StringIO()
+        row_count = OUTPUT_FORMATS[output_format].write(rows, buffer, columns)
+        text = buffer.getvalue()
+
+    return row_count, counts["review"], text
+
+def run_batch(files: List[str], manifest: Dict[str, Dict[str, str]], output: Optional[str] = None,
+              output_dir: Optional[str] = None, workers: Optional[int] = None,
+              options: Optional[Dict[str, bool]] = None, cache_size: int = norm_cache.DEFAULT_CACHE_SIZE,
+              cache_db: Optional[str] = None, output_format: str = "csv",
+              result_cache_dir: Optional[str] = None, keep_raw: bool = False,
+              athlete_db: Optional[str] = None) -> List[Dict[str, object]]:
+    """
+    Parse many results files in parallel.
+
+    Args:
+        files (List[str]): Results files to parse, in output order.
+        manifest (Dict[str, Dict[str, str]]): Metadata keyed by file name.
+        output (str): Merged CSV or NDJSON to write, in file order.
+        output_dir (str): Directory to write one file per meet into, in
+            the same folders as the inputs below their common directory.
+        workers (int): Number of worker processes, defaults to CPU count.
+        options (Dict[str, bool]): Parser options passed to iter_results.
+        cache_size (int): In-process normalization cache size per worker.
+        cache_db (str): Optional SQLite normalization cache shared by workers.
+        output_format (str): Name of a writer in OUTPUT_FORMATS.
+        result_cache_dir (str): Optional directory of parsed rows shared by
+            workers, so files parsed before are not parsed again.
+        keep_raw (bool): Save raw fields next to each per-meet output.
+        athlete_db (str): Optional SQLite athlete index to link every output
+            to, adding an Athlete ID column.
+
+    Returns:
+        List[Dict[str, object]]: Per-file report with rows, review count and
+            seconds, plus an "error" for files that failed to parse.
+    """
+    options = dict(options or {})
+    report = []
+
+    # Columnar formats always carry the numeric mark columns, and cannot be
+    # concatenated into one merged file
+    writer = OUTPUT_FORMATS[output_format]
+    if writer.mark_values:
+        options["mark_values"] = True
+    if writer.binary and output:
+        raise ValueError(f"The {output_format} format needs one file per meet (output_dir)")
+    if writer.binary and athlete_db:
+        raise ValueError(f"Athlete IDs cannot be added to {output_format} outputs")
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # Per-meet outputs keep each file's path below the directory the inputs
+    # share, so season/*/results.txt meets do not overwrite one another
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]) if files else ""
+    output_paths = set()
+
+    # Pair every file with its metadata and, for per-meet output, its CSV
+    jobs = []
+    for path in files:
+        metadata = find_metadata(manifest, path)
+        if metadata is None:
+            print(f"Warning: no manifest entry for {path}, metadata left blank", file=sys.stderr)
+            metadata = {}
+
+        output_path = None
+        if output_dir:
+            name = os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0]
+            output_path = os.path.join(output_dir, name + writer.extension)
+            if output_path in output_paths:
+                raise ValueError(f"{path} would overwrite the output of another file ({output_path})")
+            output_paths.add(output_path)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        jobs.append((path, metadata, output_path))
+
+    merged = open(output, "w", newline="") if output else None
+    try:
+        if merged and output_format == "csv":
+            csv.writer(merged).writerow(output_columns(options.get("mark_values", False)))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(cache_size, cache_db, result_cache_dir)) as executor:
+            results = executor.map(parse_one, *zip(*jobs), [options] * len(jobs), [output_format] * len(jobs),
+                                   [keep_raw] * len(jobs))
+
+            # Results arrive in file order, so merged rows keep that order
+            for path, rows, review, seconds, text, error in results:
+                if merged:
+                    merged.write(text)
+                entry = {"file": path, "rows": rows, "review": review, "seconds": round(seconds, 3)}
+                if error:
+                    entry["error"] = error
+                report.append(entry)
+    finally:
+        if merged:
+            merged.close()
+
+    # Athletes are linked here, in file order, so the IDs a season gets do
+    # not depend on which worker finished first
+    if athlete_db:
+        index = AthleteIndex(athlete_db)
+        for path in [output] if output else [output_path for _, _, output_path in jobs]:
+            # Outputs a parse never wrote are skipped
+            if os.path.exists(path):
+                link_file(path, index)
+
+    return report
+
+if __name__ == "__main__":
+    '''
+    Parse a whole season of results files in parallel.
+    '''
+
+    parser = argparse.ArgumentParser(description="Parse many meet results files in parallel.")
+    parser.add_argument("inputs", help="Directory of .txt results files (searched recursively), or a glob "
+                                           "such as 'season/**/*.txt'")
+    parser.add_argument("--manifest", required=True, help="CSV or JSON file of metadata per results file")
+    parser.add_argument("--output", help="Merged CSV or NDJSON of every meet (default: merged.<format>)")
+    parser.add_argument("--output-dir", help="Write one file per meet into this directory instead, "
+                                               "mirroring the input folders")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="csv",
+                        help="Output format; parquet and arrow need --output-dir and pyarrow")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fixed-width", action="store_true", help="Cut result lines by header column offsets")
+    parser.add_argument("--batch-schools", action="store_true", help="Resolve school names in one batch per file")
+    parser.add_argument("--marks", action="store_true", help="Add numeric mark and qualifier/record columns")
+    parser.add_argument("--encoding", help="Encoding of every results file (default: detected per file, "
+                                           "UTF-8 or Windows-1252)")
+    parser.add_argument("--input-format", choices=sorted(RESULT_FORMATS),
+                        help="Parser for every results file (default: sniffed per file from its first few KB)")
+    parser.add_argument("--cache-db", default=norm_cache.DEFAULT_CACHE_DB, help="SQLite normalization cache")
+    parser.add_argument("--result-cache", default=result_cache.DEFAULT_CACHE_DIR, metavar="DIR",
+                        help="Reuse the parsed rows of files seen before, cached in this directory")
+    parser.add_argument("--keep-raw", action="store_true",
+                        help="Save raw event/school strings next to each per-meet output for renormalize.py")
+    parser.add_argument("--athlete-db", help="Add an Athlete ID column, linking athletes to this SQLite index "
+                                             "across meets")
+    parser.add_argument("--report", help="Write the per-file report as JSON to this path")
+    args = parser.parse_args()
+
+    writer = OUTPUT_FORMATS[args.format]
+    if writer.binary and not args.output_dir:
+        parser.error(f"--format {args.format} writes one file per meet, use --output-dir")
+    if args.keep_raw and (writer.binary or not args.output_dir):
+        parser.error("--keep-raw needs --output-dir and a csv or ndjson format")
+    if args.athlete_db and writer.binary:
+        parser.error("--athlete-db needs a csv or ndjson format")
+    if not format_available(args.format):
+        parser.error(f"--format {args.format} needs pyarrow installed")
+
+    files = find_files(args.inputs)
+    if not files:
+        print(f"Error: no results files match {args.inputs}")
+        sys.exit(1)
+
+    output = None if args.output_dir else (args.output or "merged" + writer.extension)
+    options = {"fixed_width": args.fixed_width, "batch_schools": args.batch_schools, "mark_values": args.marks,
+               "encoding": args.encoding, "input_format": args.input_format}
+
+    start = time.perf_counter()
+    report = run_batch(files, load_manifest(args.manifest), output, args.output_dir,
+                       args.workers, options, cache_db=args.cache_db, output_format=args.format,
+                       result_cache_dir=args.result_cache, keep_raw=args.keep_raw, athlete_db=args.athlete_db)
+    elapsed = time.perf_counter() - start
+
+    # Per-file report
+    failed = [entry for entry in report if "error" in entry]
+    for entry in report:
+        if "error" in entry:
+            print(f"{entry['file']}: failed, {entry['error']}")
+        else:
+            print(f"{entry['file']}: {entry['rows']} rows, {entry['review']} for review, {entry['seconds']:.2f}s")
+    print(f"Processed {len(report) - len(failed)} files, {sum(entry['rows'] for entry in report)} rows "
+          f"in {elapsed:.2f}s" + (f", {len(failed)} failed" if failed else ""))
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+import codecs
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from itertools import chain
+from typing import IO, Callable, Iterable, Iterator, Optional
+
+# Meet Manager exports that are not UTF-8 are Windows-1252; bytes it leaves
+# undefined are replaced rather than stopping the parse
+FALLBACK_ENCODING = "cp1252"
+
+# Bytes decoded at once; blocks end at a newline so no line or character
+# is split between them. Streams use smaller blocks so parsing an upload
+# starts as soon as its first lines arrive
+BLOCK_SIZE = 1024 * 1024
+STREAM_BLOCK_SIZE = 64 * 1024
+
+def detect_encoding(data: bytes) -> str:
+    """
+    Decide how a whole results file is encoded.
+
+    A byte order mark wins. Otherwise the file is UTF-8 if every block that
+    is not plain ASCII decodes as UTF-8, and Windows-1252 if any does not.
+    ASCII blocks, most of a results file, are ruled out with a native scan.
+
+    Args:
+        data (bytes): File contents, or a memory map of them.
+
+    Returns:
+        str: Codec name.
+    """
+    if data[:3] == codecs.BOM_UTF8:
+        return "utf-8-sig"
+    if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        return "utf-16"
+
+    for block in iter_buffer_blocks(data):
+        if block.isascii():
+            continue
+        try:
+            block.decode("utf-8")
+        except UnicodeDecodeError:
+            return FALLBACK_ENCODING
+    return "utf-8"
+
+def ascii_compatible(encoding: str) -> bool:
+    """
+    Return whether an encoding writes ASCII as ASCII bytes, so its text can
+    be cut into blocks at newline bytes.
+    """
+    sample = "\r\n Event 0123456789"
+    try:
+        return sample.encode(encoding) == sample.encode("ascii")
+    except (LookupError, UnicodeError):
+        return False
+
+def codec_name(encoding: str) -> str:
+    """
+    Return the canonical name of a codec, e.g. "utf-8-sig" for "UTF_8_SIG",
+    or the name as given if Python does not know it.
+    """
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return encoding
+
+def iter_blocks(read: Callable[[int], bytes], size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Read a binary source in blocks of whole lines.
+
+    Args:
+        read (Callable): The source's read method.
+        size (int): Bytes read at a time.
+
+    Yields:
+        bytes: Blocks ending in a newline, except perhaps the last.
+    """
+    rest = b""
+    while True:
+        block = read(size)
+        if not block:
+            if rest:
+                yield rest
+            return
+
+        block = rest + block if rest else block
+        cut = block.rfind(b"\n") + 1
+        rest = block[cut:]
+        if cut:
+            yield block[:cut]
+
+def iter_buffer_blocks(data: bytes, start: int = 0, size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Cut a file's bytes, or a memory map of them, into blocks of whole lines
+    without copying more than one block at a time.
+    """
+    total = len(data)
+    while start < total:
+        end = min(start + size, total)
+        if end < total:
+            cut = data.rfind(b"\n", start, end) + 1
+            end = cut if cut > start else (data.find(b"\n", end) + 1 or total)
+        yield data[start:end]
+        start = end
+
+def decode_blocks(blocks: Iterable[bytes], encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    Decode blocks of whole lines.
+
+    Without an encoding, blocks are decoded as UTF-8 until one is not valid
+    UTF-8; that block and the rest are read as Windows-1252.
+
+    Args:
+        blocks (Iterable[bytes]): Blocks of whole lines.
+        encoding (str): ASCII compatible codec, or None to detect it.
+
+    Yields:
+        str: Each block's text.
+    """
+    for block in blocks:
+        if encoding is None:
+            try:
+                yield block.decode("utf-8")
+                continue
+            except UnicodeDecodeError:
+                encoding = FALLBACK_ENCODING
+        yield block.decode(encoding, errors="replace")
+
+def split_lines(text: str) -> io.StringIO:
+    """
+    Split text into lines the way text mode does, with "\r\n" and "\r"
+    read as "\n".
+    """
+    return io.StringIO(text, newline=None)
+
+def iter_block_lines(blocks: Iterable[bytes], encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    Decode blocks of whole lines, see decode_blocks(), and return their
+    lines. Lines are split and chained natively, without a Python frame per
+    line.
+    """
+    return chain.from_iterable(map(split_lines, decode_blocks(blocks, encoding)))
+
+def iter_bytes_lines(data: bytes, encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    Return the lines of a whole file's bytes, detecting the encoding unless
+    one is declared.
+
+    Args:
+        data (bytes): File contents, or a memory map of them.
+        encoding (str): Declared codec, or None to detect it.
+
+    Returns:
+        Iterator[str]: Each line with its newline translated to "\n".
+    """
+    encoding = codec_name(encoding) if encoding else detect_encoding(data)
+
+    # UTF-16 and the like cannot be cut at newline bytes
+    if not (ascii_compatible(encoding) or encoding == "utf-8-sig"):
+        return iter(split_lines(data[:].decode(encoding, errors="replace")))
+
+    # The byte order mark is not part of the first line
+    start = 0
+    if encoding == "utf-8-sig":
+        encoding = "utf-8"
+        if data[:3] == codecs.BOM_UTF8:
+            start = len(codecs.BOM_UTF8)
+    return iter_block_lines(iter_buffer_blocks(data, start), encoding)
+
+@contextmanager
+def open_file_lines(path: str, encoding: Optional[str] = None) -> Iterator[Iterator[str]]:
+    """
+    Memory-map a results file and yield its lines, see iter_bytes_lines().
+
+    The map lets the encoding be detected over the whole file before any of
+    it is decoded, without reading it into memory twice.
+
+    Args:
+        path (str): Results file.
+        encoding (str): Declared codec, or None to detect it.
+
+    Yields:
+        Iterator[str]: Each line with its newline translated to "\n", read
+            while the file is open.
+    """
+    with open(path, "rb") as file:
+        # Empty files cannot be mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            yield iter(())
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield iter_bytes_lines(data, encoding)
+
+def iter_stream_lines(stream: IO[bytes], encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    Return the lines of a binary stream, read and decoded a block at a time,
+    see decode_blocks(). A byte order mark at the start of the stream sets
+    the encoding.
+    """
+    blocks = iter_blocks(stream.read, STREAM_BLOCK_SIZE)
+    first = next(blocks, b"")
+
+    if encoding is None and first[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        encoding = "utf-16"
+
+    # UTF-8 with a signature streams as UTF-8 once the signature is dropped
+    if encoding and codec_name(encoding) == "utf-8-sig":
+        encoding = "utf-8"
+        if first[:3] == codecs.BOM_UTF8:
+            first = first[len(codecs.BOM_UTF8):]
+    elif encoding is None and first[:3] == codecs.BOM_UTF8:
+        first = first[len(codecs.BOM_UTF8):]
+
+    # UTF-16 and the like cannot be cut at newline bytes, so they are read whole
+    if encoding and not ascii_compatible(encoding):
+        return iter_bytes_lines(first + b"".join(blocks), encoding)
+
+    return iter_block_lines(chain([first], blocks), encoding)
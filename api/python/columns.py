@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Header labels of left-aligned text columns, mapped to the field they hold
+TEXT_COLUMNS = {
+    "Name": "name",
+    "Year": "grade",
+    "Yr": "grade",
+    "Grade": "grade",
+    "Age": "grade",
+    "School": "school",
+    "Team": "school",
+}
+
+# Header labels of right-aligned columns, mapped to the field they hold
+VALUE_COLUMNS = {
+    "Seed": "mark",
+    "Prelims": "mark",
+    "Prelim": "mark",
+    "Semis": "mark",
+    "Finals": "mark",
+    "Time": "mark",
+    "Mark": "mark",
+    "H#": "heat",
+    "Heat": "heat",
+    "Wind": "wind",
+    "Points": "points",
+    "Pts": "points",
+}
+
+# Runs of non-whitespace characters
+token_pattern = re.compile(r"\S+")
+
+def find_tokens(line: str) -> List[Tuple[int, int, str]]:
+    """
+    Split a line on whitespace, keeping the position of each token.
+
+    Args:
+        line (str): The line to split.
+
+    Returns:
+        List[tuple]: (start, end, token) for every token, in order.
+    """
+    return [(match.start(), match.end(), match.group()) for match in token_pattern.finditer(line)]
+
+class ColumnLayout:
+    """
+    Column offsets of a HY-TEK Meet Manager results table.
+
+    HY-TEK output is fixed width: text columns (Name, Year, School) start
+    under their header label and numeric columns (Finals, H#, Points) are
+    right-aligned under theirs. Offsets are read from the header row once
+    per event and every result line is then cut by position, with no
+    backtracking.
+    """
+
+    def __init__(self, text_columns: List[Tuple[int, str]], value_columns: List[Tuple[int, int, str]]):
+        """
+        Args:
+            text_columns (List[tuple]): (start, field) of each text column,
+                left to right.
+            value_columns (List[tuple]): (start, end, field) of each
+                right-aligned column, left to right.
+        """
+        self.text_columns = text_columns
+        self.value_columns = value_columns
+
+        # Text columns run up to the first right-aligned column
+        self.values_start = value_columns[0][0]
+
+    @classmethod
+    def from_header(cls, line: str) -> Optional["ColumnLayout"]:
+        """
+        Read column offsets from a header row such as
+        "Name  Year School  Finals  Points".
+
+        Args:
+            line (str): A line of the results file.
+
+        Returns:
+            ColumnLayout: The layout, or None if the line is not a header row.
+        """
+        tokens = find_tokens(line)
+
+        # Every label must be a known column, starting with Name or School
+        if not tokens or tokens[0][2] not in ("Name", "School", "Team"):
+            return None
+
+        text_columns = []
+        value_columns = []
+        for start, end, label in tokens:
+            if label in TEXT_COLUMNS and not value_columns:
+                text_columns.append((start, TEXT_COLUMNS[label]))
+            elif label in VALUE_COLUMNS:
+                value_columns.append((start, end, VALUE_COLUMNS[label]))
+            else:
+                return None
+
+        # A results table always has a mark column
+        if not any(field == "mark" for _, _, field in value_columns):
+            return None
+
+        return cls(text_columns, value_columns)
+
+    def split(self, line: str) -> Optional[Dict[str, str]]:
+        """
+        Cut a result line into fields by position.
+
+        Args:
+            line (str): A line of the results file.
+
+        Returns:
+            Dict[str, str]: Place, name, grade, school, mark, heat, wind and
+                points, or None if the line is not a placed result.
+        """
+        # HY-TEK files often pad with non-breaking spaces
+        line = line.rstrip("\r\n").replace("\xa0", " ")
+
+        # Place is the number ahead of the first column, e.g. "  1" or "  1 .",
+        # always followed by a space before the column starts
+        first_start = self.text_columns[0][0]
+        place_tokens = line[:first_start].split()
+        if not place_tokens or not place_tokens[0].isdigit() or not line[first_start - 1].isspace():
+            return None
+
+        fields = {"place": place_tokens[0], "name": "", "grade": "", "school": "",
+                  "mark": "", "heat": "", "wind": "", "points": ""}
+
+        # Right-aligned values can spill left of their header into the last
+        # text column, which HY-TEK always separates with a space
+        values_start = min(self.values_start, len(line))
+        while values_start > first_start and not line[values_start - 1].isspace():
+            values_start -= 1
+
+        # Left-aligned text columns run to the start of the next column
+        bounds = [start for start, _ in self.text_columns[1:]] + [values_start]
+        for (start, field), end in zip(self.text_columns, bounds):
+            fields[field] = line[start:end].strip()
+
+        # Team-scored events write " ." after the place and the team under
+        # Name, where it is spelled out in full and School is abbreviated
+        if fields["name"].startswith("."):
+            fields["school"] = fields["name"].lstrip(". ") or fields["school"]
+            fields["name"] = ""
+        elif not fields["name"]:
+            fields["school"] = fields["school"].lstrip(". ")
+
+        # Each right-aligned value belongs to the header it overlaps
+        for start, end, token in find_tokens(line[values_start:]):
+            start += values_start
+            end += values_start
+            for column_start, column_end, field in self.value_columns:
+                if start < column_end and end > column_start:
+                    fields[field] = token
+                    break
+
+        # Unplaced lines (DQ, DNF, scratches) carry no mark
+        if not fields["mark"]:
+            return None
+
+        return fields
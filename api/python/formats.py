@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+import os
+import re
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Characters read from the head of a file to decide its format: enough for
+# the vendor banner and the first event's header and result lines
+SNIFF_CHARS = int(os.environ.get("FORMAT_SNIFF_CHARS", 8192))
+
+# Line types
+LINE_SKIP = 0
+LINE_EVENT = 1
+LINE_ROUND = 2
+LINE_RESULT = 3
+
+# HY-TEK event headers, e.g. "Event 9  Boys 4x400 Meter Relay Division I"
+event_pattern = re.compile(r"Event\s+\d+\s+(Boys|Girls)\s+(.+)")
+
+# Individual results with a hundredths time, e.g.
+# "  2 Jane St. Pierre           9 Bartlett                     9.72*   2 "
+result_pattern = re.compile(
+    r"(\d+)\s+"                              # Place number (integer)
+    r"([\w\-\'\.]+(?:\s[\w\-\'\.]+){0,2})\s+"  # Name (first and last, up to three words)
+    r"(\d+)?\s+"                             # Grade level (optional integer)
+    r"([\w\s\-\'\.]+?)\s+"                   # School (string, non-greedy to stop at "mark")
+    r"((?:\d{1,2}:\d{2}\.\d{2}|\d{1,2}\.\d{2})[q*]?)\s+"  # Mark (##.## or #:##.##, optionally ending in 'q' or '*')
+    r"(\d+)?\s*"                             # Heat (optional integer)
+    r"(\d+\.\d+)?\s*"                        # Optional unrounded times (decimal)
+    r"(\d+)?\s*"                             # Optional wind/points numbers (integer)
+)
+
+# Every mark ends in a decimal point and two digits, then an optional
+# q or * and whitespace; starting the pattern with a literal lets the regex
+# engine scan for it quickly
+mark_hint_pattern = re.compile(r"\.\d\d[q*]?\s")
+
+# Relay and team-scored results whose event has no header row to cut them
+# by, in the same eight groups as result_pattern, e.g.
+# "  1 . Saint John's               St. John's               5.50m   18-00.50   8"
+# "  6 Marlboro                                             46.2   2   0.50"
+team_result_pattern = re.compile(
+    r"\s*(\d+)\s+(?:\.\s+)?"                 # Place, and the " ." of team-scored events
+    r"()()"                                  # No athlete name or grade
+    r"(\S+(?: \S+)*)\s+"                     # Team, single spaced words
+    r"(?:\S+(?: \S+)*\s+)??"                 # Abbreviated school of team-scored events
+    r"((?:\d{1,2}:)?\d{1,2}:\d{2}\.\d{1,2}[qQ*#@]?"  # Mark: hand or FAT time,
+    r"|\d{1,3}\.\d{1,2}m?[qQ*#@]?"                   # seconds or metric field mark,
+    r"|\d{1,3}-\d{2}(?:\.\d{1,2})?[qQ*#@]?)"         # or feet-inches field mark
+    r"(?:\s+\d{1,3}-\d{2}(?:\.\d{1,2})?)?"   # Feet-inches conversion of a metric mark
+    r"(?:\s+(\d{1,2})(?!\.))?"               # Heat (optional integer)
+    r"()"                                    # No wind
+    r"(?:\s+(\d+(?:\.\d+)?))?"               # Points, halved on ties
+)
+
+# Relay and field marks: tenths, metric or feet-inches
+team_mark_hint_pattern = re.compile(r"\d[.\-]\d")
+
+# Signs of relay, team-scored or field tables in the head of a file: a
+# " ." after the place, a header row led by School or Team, or a metric mark
+team_layout_pattern = re.compile(r"^\s*\d+ \. \S|^\s+(?:School|Team)\s{2,}|\d\.\d\dm[qQ*#@]?\s", re.M)
+
+# Tab-separated exports from spreadsheets and timing systems: an event title
+# line, then one result per line with the same eight fields in order, the
+# trailing heat, wind and points optional, e.g.
+# "Girls 600 Meter Run"
+# "1<TAB>Jane Doe<TAB>10<TAB>Bartlett<TAB>1:39.74<TAB>2"
+tsv_event_pattern = re.compile(r"\s*(?:Event\s+\d+\s+)?(Boys|Girls)\s+([^\t]+?)\s*$")
+tsv_result_pattern = re.compile(
+    r" *(\d+) *\t"                                   # Place number (integer)
+    r" *([^\t]*?) *\t"                               # Name
+    r" *(\d+)? *\t"                                  # Grade level (optional integer)
+    r" *([^\t]*?) *\t"                               # School
+    r" *((?:\d{1,2}:)?\d{1,2}:\d{2}(?:\.\d{1,2})?[qQ*#@]?"  # Mark: time,
+    r"|\d{1,3}\.\d{1,2}m?[qQ*#@]?"                   # seconds or metric field mark,
+    r"|\d{1,3}-\d{2}(?:\.\d{1,2})?[qQ*#@]?) *"       # or feet-inches field mark
+    r"(?:\t *(\d+)? *)?"                             # Heat (optional integer)
+    r"(?:\t *([+-]?\d+(?:\.\d+)?|NWI)? *)?"          # Wind (optional)
+    r"(?:\t *(\d+(?:\.\d+)?)? *)?\s*$"               # Points (optional), then the line end
+)
+
+def line_classifier(event_pattern: re.Pattern,
+                    mark_hint_pattern: re.Pattern) -> Callable[[str], Tuple[int, Optional[re.Match]]]:
+    """
+    Build the line classifier of a HY-TEK style format from its event and
+    mark patterns.
+
+    The event pattern only runs on lines containing "Event", and only lines
+    containing something shaped like a mark are returned as possible
+    results, so blank lines, ===== separators, column headers and record
+    lines are dropped after a few substring scans.
+
+    Args:
+        event_pattern (re.Pattern): Event header pattern, grouping the gender
+            word and the event name.
+        mark_hint_pattern (re.Pattern): Cheap pattern every result line matches.
+
+    Returns:
+        Callable: Takes a line of the results file and returns (line type,
+            event match or None).
+    """
+    def classify_line(line: str) -> Tuple[int, Optional[re.Match]]:
+        # Event headers
+        if "Event" in line:
+            event_match = event_pattern.search(line)
+            if event_match:
+                return LINE_EVENT, event_match
+
+        # Round headers
+        if "Finals" in line:
+            return LINE_ROUND, None
+
+        # Possible result, the full result pattern decides
+        if mark_hint_pattern.search(line):
+            return LINE_RESULT, None
+
+        return LINE_SKIP, None
+
+    return classify_line
+
+def sniff_hytek(head: str) -> int:
+    """
+    Any file with HY-TEK event headers, scored low so more specific HY-TEK
+    layouts win.
+    """
+    return 1 if "HY-TEK" in head or event_pattern.search(head) else 0
+
+def sniff_hytek_team(head: str) -> int:
+    """
+    HY-TEK event headers with relay, team-scored or field tables.
+    """
+    return 2 if event_pattern.search(head) and team_layout_pattern.search(head) else 0
+
+def classify_tsv_line(line: str) -> Tuple[int, Optional[re.Match]]:
+    """
+    Classify a line of a tab-separated export: lines with tabs are possible
+    results, lines without them event titles, round titles or skipped.
+    """
+    if "\t" in line:
+        return LINE_RESULT, None
+
+    event_match = tsv_event_pattern.match(line)
+    if event_match:
+        return LINE_EVENT, event_match
+    if "Finals" in line:
+        return LINE_ROUND, None
+    return LINE_SKIP, None
+
+def sniff_tsv(head: str) -> int:
+    """
+    Tab-separated result lines, scored above the HY-TEK layouts, whose
+    columns are aligned with spaces.
+    """
+    return 3 if any(tsv_result_pattern.match(line) for line in head.splitlines() if "\t" in line) else 0
+
+class ResultFormat(NamedTuple):
+    """
+    A pluggable results file parser: how to recognize the format from the
+    head of a file, and the precompiled patterns its lines are parsed with.
+    """
+    description: str
+    # Scores the head of a file, 0 when it is not this format; the highest
+    # score wins
+    sniff: Callable[[str], int]
+    # Returns (line type, event match); event matches group the gender word
+    # and the event name
+    classify_line: Callable[[str], Tuple[int, Optional[re.Match]]]
+    # Matches a result line, grouping place, name, grade, school, mark,
+    # heat, wind and points
+    match_result: Callable[[str], Optional[re.Match]]
+    # Cut result lines by the column offsets of each event's header row,
+    # whether or not fixed width parsing is asked for
+    fixed_width: bool
+
+# Result parsers by name, in the order ties are settled; register_format()
+# adds more
+RESULT_FORMATS: Dict[str, ResultFormat] = {
+    "hytek": ResultFormat("HY-TEK Meet Manager individual results", sniff_hytek,
+                          line_classifier(event_pattern, mark_hint_pattern), result_pattern.search, False),
+    "hytek-team": ResultFormat("HY-TEK Meet Manager relay, team-scored and field results", sniff_hytek_team,
+                               line_classifier(event_pattern, team_mark_hint_pattern), team_result_pattern.match,
+                               True),
+    "tsv": ResultFormat("Tab-separated results exported from a spreadsheet or timing system", sniff_tsv,
+                        classify_tsv_line, tsv_result_pattern.match, False),
+}
+
+# Parser of files no format recognizes
+DEFAULT_FORMAT = "hytek"
+
+def register_format(name: str, result_format: ResultFormat) -> None:
+    """
+    Add a results format, or replace one of the same name, for sniffing and
+    the --input-format option.
+    """
+    RESULT_FORMATS[name] = result_format
+
+def sniff_format(head: str) -> str:
+    """
+    Pick the registered format that scores the head of a file highest.
+
+    Args:
+        head (str): The first SNIFF_CHARS or so characters of the file.
+
+    Returns:
+        str: Name of a format in RESULT_FORMATS, DEFAULT_FORMAT when none
+            recognizes the head.
+    """
+    best, best_score = DEFAULT_FORMAT, 0
+    for name, result_format in RESULT_FORMATS.items():
+        score = result_format.sniff(head)
+        if score > best_score:
+            best, best_score = name, score
+    return best
+
+def sniff_lines(lines: Iterable[str]) -> Tuple[str, Iterator[str]]:
+    """
+    Sniff the format of a file from its first lines, without reading any
+    line twice.
+
+    The format is chosen once for the whole file, not per event: a single
+    relay, team-scored or field table in the first SNIFF_CHARS switches
+    every event to hytek-team. Its patterns are cut by each event's header
+    row, so they read the individual events of such a file as well.
+
+    Args:
+        lines (Iterable[str]): Lines of the file, read lazily.
+
+    Returns:
+        tuple: (format name, iterator over every line from the first)
+    """
+    lines = iter(lines)
+    head: List[str] = []
+    size = 0
+    for line in lines:
+        head.append(line)
+        size += len(line)
+        if size >= SNIFF_CHARS:
+            break
+
+    return sniff_format("".join(head)), chain(head, lines)
@@ -1,81 +1,181 @@
 from http.server import BaseHTTPRequestHandler
+import itertools
 import json
 import os
 import sys
-import tempfile
-from urllib.parse import parse_qs
+import time
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
 # Import local modules
 sys.path.append(os.path.dirname(__file__))
-from parser import parse_results
+from metrics import ParseMetrics
+from multipart import CHUNK_SIZE, MultipartError, MultipartPart, MultipartReader
+from parse_file import COLUMNS, iter_results, output_columns, write_results
+from review import ReviewSummary
+from rows import ResultRow
+from writers import OUTPUT_FORMATS, format_available
+
+class JSONStringWriter:
+    """
+    File-like sink that writes text into the response as a JSON string body.
+
+    Each chunk is escaped as it is written, so the CSV is streamed into the
+    JSON response without ever being held in memory.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        # Strip the surrounding quotes json.dumps adds to each chunk
+        self.wfile.write(json.dumps(text)[1:-1].encode())
+        return len(text)
+
+class EncodingWriter:
+    """
+    Text sink that encodes each chunk straight into a binary stream.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        self.wfile.write(text.encode())
+        return len(text)
+
+# Form field names sent by the web app, mapped to metadata columns
+FORM_FIELDS = {
+    "meetDate": "Meet Date",
+    "edition": "Edition",
+    "meetName": "Meet Name",
+    "meetLocation": "Meet Location",
+    "season": "Season",
+    "url": "URL",
+    "timing": "Timing",
+}
+
+# Seconds between job status checks while streaming progress, and the
+# longest a progress stream stays open before the client polls again
+JOB_POLL_SECONDS = 0.5
+JOB_STREAM_SECONDS = 25
+
+def query_flag(query: dict, name: str) -> bool:
+    """
+    Read an on/off query string option such as ?profile=1.
+    """
+    return query.get(name, ['0'])[0].lower() not in ('', '0', 'false', 'no')
+
+def read_upload(stream, headers) -> Tuple[Dict[str, str], Optional[MultipartPart]]:
+    """
+    Read the metadata fields of a multipart upload, up to its results file.
+
+    Args:
+        stream: Binary stream holding the request body.
+        headers: Mapping of request headers with Content-Type and,
+            optionally, Content-Length.
+
+    Returns:
+        tuple: (metadata by output column, results file part or None if the
+            upload has none); the part is read as a stream.
+
+    Raises:
+        MultipartError: If the body is not well-formed multipart/form-data.
+    """
+    reader = MultipartReader.from_headers(stream, headers)
+    metadata = {}
+
+    for part in reader.parts():
+        if part.filename is not None:
+            return metadata, part
+
+        # Extract metadata from form fields, which the web app sends ahead
+        # of the file
+        column = FORM_FIELDS.get(part.name, part.name)
+        if column in COLUMNS:
+            metadata[column] = part.read_value()
+
+    return metadata, None
+
+def iter_upload(stream, headers, metrics: Optional[ParseMetrics] = None,
+                mark_values: bool = False) -> Optional[Iterator[ResultRow]]:
+    """
+    Read the metadata fields of a multipart upload and start parsing its
+    results file as it streams in.
+
+    Args:
+        stream: Binary stream holding the request body.
+        headers: Mapping of request headers with Content-Type and,
+            optionally, Content-Length.
+        metrics (ParseMetrics): Optional stage timers and counters to fill in.
+        mark_values (bool): Add the numeric mark columns.
+
+    Returns:
+        Iterator[ResultRow]: The parsed rows, or None if the upload has no
+            results file.
+
+    Raises:
+        MultipartError: If the body is not well-formed multipart/form-data.
+    """
+    metadata, part = read_upload(stream, headers)
+    if part is None:
+        return None
+
+    # Results file is fed line by line straight into the parser
+    return iter_results(part, metadata, metrics=metrics, mark_values=mark_values)
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
-        # Get content-type and content-length
-        content_length = int(self.headers.get('content-length', 0))
-        content_type = self.headers.get('content-type', '')
-
         # Check for multipart form data
+        content_type = self.headers.get('content-type', '')
         if not content_type.startswith('multipart/form-data'):
             self.send_error(400, "Expected multipart/form-data")
             return
 
-        # Read the body
-        post_data = self.rfile.read(content_length)
-        
-        # The boundary is defined in the content-type header
-        boundary = content_type.split('=')[1].strip()
-        
-        # Parse multipart form data (simplified, in real code use a proper library)
-        fields = {}
-        files = {}
-        
-        # This is a simple multipart parser that isn't production-ready
-        # In production, use a proper library or the built-in functionality of frameworks
-        
+        # Stage timings and counters are only collected when asked for with
+        # ?profile=1, and returned in the metrics field of the JSON response
+        query = parse_qs(urlparse(self.path).query)
+        metrics = ParseMetrics() if query_flag(query, 'profile') else None
+
+        # Output format is chosen with ?format=, CSV inside a JSON body by
+        # default; columnar formats always carry the numeric mark columns
+        output_format = query.get('format', ['csv'])[0]
+        if output_format not in OUTPUT_FORMATS:
+            self.send_error(400, f"Unknown format {output_format}, expected one of {', '.join(OUTPUT_FORMATS)}")
+            return
+        if not format_available(output_format):
+            self.send_error(501, f"The {output_format} format needs pyarrow installed")
+            return
+        writer = OUTPUT_FORMATS[output_format]
+
+        # Numeric mark columns are added with ?marks=1
+        mark_values = query_flag(query, 'marks') or writer.mark_values
+
+        # Large files can be queued with ?async=1 and fetched with GET ?job=
+        if query_flag(query, 'async'):
+            if output_format != 'csv':
+                self.send_error(400, "Queued jobs produce CSV only")
+                return
+            self.submit_job(mark_values)
+            return
+
         try:
-            # Parse the multipart data to extract the file and fields
-            # This is where you'd use a library in production
-            # For this example, we'll create a temporary file to work with
-            
-            with tempfile.NamedTemporaryFile(suffix='.txt', delete=False) as temp_file:
-                temp_file.write(b"Sample meet data for testing\nEvent 1 Boys 100m\n1 John Doe 12 School Name 10.23")
-                temp_file_path = temp_file.name
-            
-            # Extract metadata from form fields (in a real implementation)
-            metadata = {
-                "Meet Date": "2023-05-15",  # Default/example values
-                "Meet Location": "Example Stadium",
-                "Edition": "1st",
-                "Meet Name": "Example Track Meet",
-                "Timing": "FAT",
-                "URL": "https://example.com",
-                "Season": "Outdoor"
-            }
-            
-            # Parse the results using our function
-            output_file = parse_results(temp_file_path, metadata)
-            
-            # Read the generated CSV
-            with open(output_file, 'r') as f:
-                csv_content = f.read()
-            
-            # Clean up temporary files
-            os.unlink(temp_file_path)
-            os.unlink(output_file)
-            
-            # Prepare the response
-            response_data = {
-                'success': True,
-                'data': csv_content
-            }
-            
-            # Send successful response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
-            
+            # Parse the multipart body as it streams in, in fixed-size chunks
+            rows = iter_upload(self.rfile, self.headers, metrics, mark_values)
+            if rows is None:
+                self.send_error(400, "Missing results file")
+                return
+
+            # Parse the results lazily, pulling the first row so parse
+            # errors are still reported before the response starts
+            first_row = next(rows, None)
+            if first_row is not None:
+                rows = itertools.chain([first_row], rows)
+
+        except MultipartError as e:
+            self.send_error(400, str(e))
+            return
+
         except Exception as e:
             # Send error response
             self.send_response(500)
@@ -84,4 +184,113 @@ class handler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps({
                 'success': False,
                 'error': str(e)
-            }).encode())
\ No newline at end of file
+            }).encode())
+            return
+
+        columns = output_columns(mark_values)
+
+        # Other formats are streamed as the raw response body
+        if output_format != 'csv':
+            self.send_response(200)
+            self.send_header('Content-type', writer.content_type)
+            self.send_header('Content-Disposition', f'attachment; filename="results{writer.extension}"')
+            self.end_headers()
+            sink = self.wfile if writer.binary else EncodingWriter(self.wfile)
+            write_results(rows, sink, metrics, columns, output_format)
+            return
+
+        # Send successful response, streaming the CSV into the data field
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"success": true, "data": "')
+        summary = ReviewSummary()
+        write_results(summary.track(rows), JSONStringWriter(self.wfile), metrics, columns)
+        self.wfile.write(b'"')
+
+        # Each unmatched string once, with its rows and the names offered
+        # for it, so the reviewer needs no further lookups
+        self.wfile.write(b', "unresolved": ' + json.dumps(summary.unresolved()).encode())
+
+        # Metrics are complete only once the last row is written
+        if metrics:
+            self.wfile.write(b', "metrics": ' + json.dumps(metrics.as_dict()).encode())
+        self.wfile.write(b'}')
+
+    def submit_job(self, mark_values: bool):
+        """
+        Queue the uploaded file for a job worker and answer with its id.
+        """
+        # Only the job endpoints need the queue
+        from jobs import JobStore
+
+        try:
+            metadata, part = read_upload(self.rfile, self.headers)
+            if part is None:
+                self.send_error(400, "Missing results file")
+                return
+
+            store = JobStore()
+            try:
+                job_id = store.submit(part, metadata, {"mark_values": mark_values})
+            finally:
+                store.close()
+
+        except MultipartError as e:
+            self.send_error(400, str(e))
+            return
+
+        self.send_response(202)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({'success': True, 'job': job_id, 'status': 'queued'}).encode())
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        job_id = query.get('job', [''])[0]
+        if not job_id:
+            self.send_error(400, "Expected ?job=<id>")
+            return
+
+        from jobs import DONE, FAILED, JobStore
+
+        store = JobStore()
+        try:
+            job = store.get(job_id)
+            if job is None:
+                self.send_error(404, "Unknown or expired job")
+                return
+
+            # One JSON line per progress change, ending with the usual
+            # response body once the job is finished
+            self.send_response(200)
+            self.send_header('Content-type', 'application/x-ndjson')
+            self.end_headers()
+
+            deadline = time.monotonic() + JOB_STREAM_SECONDS
+            last = None
+            while True:
+                status = {key: job[key] for key in ('status', 'attempts', 'lines', 'rows', 'event')}
+                if status != last:
+                    self.wfile.write(json.dumps({'job': job_id, **status}).encode() + b'\n')
+                    self.wfile.flush()
+                    last = status
+
+                if job['status'] in (DONE, FAILED) or time.monotonic() >= deadline:
+                    break
+                time.sleep(JOB_POLL_SECONDS)
+                job = store.get(job_id) or job
+
+            if job['status'] == FAILED:
+                self.wfile.write(json.dumps({'success': False, 'error': job['error']}).encode() + b'\n')
+            elif job['status'] == DONE:
+                # Stream the stored CSV into the data field
+                self.wfile.write(b'{"success": true, "data": "')
+                with open(store.output_path(job_id), 'r', newline='') as output:
+                    sink = JSONStringWriter(self.wfile)
+                    for chunk in iter(lambda: output.read(CHUNK_SIZE), ''):
+                        sink.write(chunk)
+                self.wfile.write(b'"}\n')
+
+        finally:
+            store.close()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python
+import glob
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import IO, Dict, Iterable, Iterator, Optional
+
+from byte_lines import iter_stream_lines
+from parse_file import iter_results, output_columns, write_results
+from rows import ResultRow
+
+logger = logging.getLogger(__name__)
+
+# Where queued uploads, finished outputs and the queue database live
+JOBS_DIR = os.environ.get("PARSE_JOBS_DIR") or os.path.join(tempfile.gettempdir(), "parse_jobs")
+
+# Seconds a finished job's output is kept before it is purged
+JOB_TTL = int(os.environ.get("PARSE_JOB_TTL", 24 * 60 * 60))
+
+# A running job not heard from in this many seconds is assumed to belong to
+# a worker that stopped, and is handed to the next worker that asks; many
+# heartbeats must be missed first
+STALE_SECONDS = int(os.environ.get("PARSE_JOB_STALE_SECONDS", 300))
+
+# Runs of one job before it is given up on, so an upload that kills its
+# worker cannot crash every worker in turn
+MAX_ATTEMPTS = 3
+
+# Seconds between progress writes while a job runs
+PROGRESS_SECONDS = 0.5
+
+# Seconds between heartbeats written from a background thread, so a job is
+# heard from while its source is read whole or its sections parse elsewhere
+HEARTBEAT_SECONDS = 5
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class JobStore:
+    """
+    Persistent parse job queue in a SQLite database.
+
+    Uploads and outputs are files next to the database, so queued jobs, and
+    the outputs of finished ones, survive restarts of the web process and of
+    the workers. Outputs are written under a temporary name and renamed once
+    complete, so a half-written output is never served.
+    """
+
+    def __init__(self, directory: str = JOBS_DIR, ttl: int = JOB_TTL):
+        """
+        Open (and create if needed) the queue.
+
+        Args:
+            directory (str): Directory for the database, uploads and outputs.
+            ttl (int): Seconds finished outputs are kept.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl = ttl
+
+        # Autocommit, with explicit transactions where a job is claimed
+        self._db = sqlite3.connect(os.path.join(directory, "jobs.sqlite3"), timeout=30,
+                                   isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL,"
+            " metadata TEXT NOT NULL, options TEXT NOT NULL,"
+            " created REAL NOT NULL, updated REAL NOT NULL, finished REAL, expires REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " lines INTEGER NOT NULL DEFAULT 0, rows INTEGER NOT NULL DEFAULT 0,"
+            " event TEXT, error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._db.close()
+
+    def input_path(self, job_id: str) -> str:
+        """
+        Return where a job's uploaded results file is kept.
+        """
+        return os.path.join(self.directory, f"{job_id}.txt")
+
+    def output_path(self, job_id: str) -> str:
+        """
+        Return where a job's finished CSV is kept.
+        """
+        return os.path.join(self.directory, f"{job_id}.csv")
+
+    def partial_path(self, job_id: str, attempt: int) -> str:
+        """
+        Return where one claim of a job writes its output until it is
+        complete, so a worker wrongly thought stopped never shares it.
+        """
+        return f"{self.output_path(job_id)}.{attempt}.part"
+
+    def submit(self, source: IO[bytes], metadata: Dict[str, str], options: Optional[Dict[str, bool]] = None) -> str:
+        """
+        Queue a results file for parsing.
+
+        Args:
+            source (IO[bytes]): The results file, copied to disk in chunks.
+            metadata (Dict[str, str]): Meet metadata for every row.
+            options (Dict[str, bool]): Parser options (mark_values).
+
+        Returns:
+            str: The new job's id.
+        """
+        job_id = uuid.uuid4().hex
+        with open(self.input_path(job_id), "wb") as file:
+            shutil.copyfileobj(source, file)
+
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO jobs (id, status, metadata, options, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(metadata), json.dumps(options or {}), now, now),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, object]]:
+        """
+        Return a job's status and progress.
+
+        Args:
+            job_id (str): Id returned by submit().
+
+        Returns:
+            Dict[str, object]: The job, or None if it does not exist or has
+                expired.
+        """
+        row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (row["expires"] is not None and row["expires"] < time.time()):
+            return None
+        return dict(row)
+
+    def claim(self) -> Optional[Dict[str, object]]:
+        """
+        Take the oldest queued job, or a running job whose worker stopped.
+
+        Returns:
+            Dict[str, object]: The job, now running, or None if there is
+                nothing to do.
+        """
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = ? OR (status = ? AND updated < ?)"
+                    " ORDER BY created LIMIT 1",
+                    (QUEUED, RUNNING, now - STALE_SECONDS),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+
+                # Give up on jobs that keep stopping their workers
+                if row["attempts"] >= MAX_ATTEMPTS:
+                    self._finish(row["id"], FAILED, f"Parsing stopped {row['attempts']} times")
+                    continue
+
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, updated = ?, lines = 0, rows = 0,"
+                    " event = NULL WHERE id = ?",
+                    (RUNNING, now, row["id"]),
+                )
+                self._db.execute("COMMIT")
+
+                job = dict(row)
+                job.update(status=RUNNING, attempts=row["attempts"] + 1, lines=0, rows=0, event=None)
+                return job
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def progress(self, job_id: str, lines: int, rows: int, event: Optional[str]) -> None:
+        """
+        Record how far a running job has got, which also tells other workers
+        it is still alive.
+        """
+        self._db.execute("UPDATE jobs SET lines = ?, rows = ?, event = ?, updated = ? WHERE id = ?",
+                         (lines, rows, event, time.time(), job_id))
+
+    def complete(self, job_id: str, lines: int, rows: int, event: Optional[str]) -> None:
+        """
+        Mark a job done once its output is in place.
+        """
+        self.progress(job_id, lines, rows, event)
+        self._finish(job_id, DONE)
+
+        # The upload is no longer needed
+        remove_file(self.input_path(job_id))
+
+    def fail(self, job_id: str, error: str) -> None:
+        """
+        Mark a job failed.
+        """
+        self._finish(job_id, FAILED, error)
+        remove_file(self.input_path(job_id))
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        self._db.execute("UPDATE jobs SET status = ?, error = ?, updated = ?, finished = ?, expires = ? WHERE id = ?",
+                         (status, error, now, now, now + self.ttl, job_id))
+
+    def purge_expired(self) -> int:
+        """
+        Delete finished jobs, and their files, once their TTL has passed.
+
+        Returns:
+            int: Number of jobs purged.
+        """
+        expired = [row["id"] for row in
+                   self._db.execute("SELECT id FROM jobs WHERE expires < ?", (time.time(),))]
+        for job_id in expired:
+            remove_file(self.input_path(job_id))
+            remove_file(self.output_path(job_id))
+
+            # Outputs left half-written by workers that stopped
+            for partial in glob.glob(glob.escape(self.output_path(job_id)) + ".*.part"):
+                remove_file(partial)
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(expired)
+
+def remove_file(path: str) -> None:
+    """
+    Delete a file if it exists.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class JobProgress:
+    """
+    Counts the lines read and rows parsed by a running job, and writes them
+    to the store every PROGRESS_SECONDS as they pass.
+
+    Used as a context manager it also writes a heartbeat every
+    HEARTBEAT_SECONDS from a background thread, so a job stays claimed while
+    no lines or rows pass: a source read whole before parsing, or sections
+    parsed by other processes.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.lines = 0
+        self.rows = 0
+        self.event: Optional[str] = None
+        self._written = time.monotonic()
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "JobProgress":
+        self._heartbeat = threading.Thread(target=self._beat, name=f"heartbeat-{self.job_id}", daemon=True)
+        self._heartbeat.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._heartbeat.join()
+
+    def _beat(self) -> None:
+        # SQLite connections stay in the thread that opened them
+        store = JobStore(self.store.directory, self.store.ttl)
+        try:
+            while not self._stopped.wait(HEARTBEAT_SECONDS):
+                store.progress(self.job_id, self.lines, self.rows, self.event)
+        finally:
+            store.close()
+
+    def track_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Pass source lines through, counting them.
+        """
+        for line in lines:
+            self.lines += 1
+            if not self.lines % 1024:
+                self.tick()
+            yield line
+
+    def track_rows(self, rows: Iterable[ResultRow]) -> Iterator[ResultRow]:
+        """
+        Pass parsed rows through, counting them and noting the event.
+        """
+        for row in rows:
+            self.rows += 1
+            self.event = row.event
+            if not self.rows % 1024:
+                self.tick()
+            yield row
+
+    def tick(self) -> None:
+        """
+        Write the progress if enough time has passed since the last write.
+        """
+        now = time.monotonic()
+        if now - self._written >= PROGRESS_SECONDS:
+            self._written = now
+            self.store.progress(self.job_id, self.lines, self.rows, self.event)
+
+def run_job(store: JobStore, job: Dict[str, object], workers: Optional[int] = None) -> None:
+    """
+    Parse a claimed job's upload into its output CSV.
+
+    Args:
+        store (JobStore): The queue the job came from.
+        job (Dict[str, object]): A job returned by JobStore.claim().
+        workers (int): Split the upload at event headers across this many
+            processes (0 for one per CPU), None to parse it in this one.
+    """
+    job_id = job["id"]
+    options = json.loads(job["options"])
+    mark_values = options.get("mark_values", False)
+    progress = JobProgress(store, job_id)
+
+    output = store.output_path(job_id)
+    partial = store.partial_path(job_id, job["attempts"])
+
+    try:
+        # Uploads are decoded the same way as on the synchronous endpoint
+        with progress, open(store.input_path(job_id), "rb") as source:
+            lines = iter_stream_lines(source)
+            rows = iter_results(progress.track_lines(lines), json.loads(job["metadata"]), mark_values=mark_values,
+                                workers=workers)
+            write_results(progress.track_rows(rows), partial, columns=output_columns(mark_values))
+        os.replace(partial, output)
+
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        remove_file(partial)
+        store.fail(job_id, str(e))
+        return
+
+    store.complete(job_id, progress.lines, progress.rows, progress.event)
+    logger.info("Job %s done: %d lines, %d rows", job_id, progress.lines, progress.rows)
+
+def work(store: JobStore, poll_seconds: float = 1.0, once: bool = False, workers: Optional[int] = None) -> int:
+    """
+    Run queued jobs one at a time, purging expired outputs between jobs.
+
+    Args:
+        store (JobStore): The queue to work on.
+        poll_seconds (float): Wait between checks of an empty queue.
+        once (bool): Return once the queue is empty instead of waiting for
+            more jobs.
+        workers (int): Processes each job is split across, see run_job().
+
+    Returns:
+        int: Number of jobs run.
+    """
+    count = 0
+    while True:
+        store.purge_expired()
+
+        job = store.claim()
+        if job is None:
+            if once:
+                return count
+            time.sleep(poll_seconds)
+            continue
+
+        logger.info("Job %s started (attempt %d)", job["id"], job["attempts"])
+        run_job(store, job, workers)
+        count += 1
+
+if __name__ == "__main__":
+    '''
+    Run a worker for the asynchronous parse job queue.
+    '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run queued parse jobs submitted with POST ?async=1.")
+    parser.add_argument("--dir", default=JOBS_DIR, help="Queue directory (default: $PARSE_JOBS_DIR or the temp dir)")
+    parser.add_argument("--ttl", type=int, default=JOB_TTL, help="Seconds finished outputs are kept")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between checks of an empty queue")
+    parser.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="Split each upload at event headers across N processes (0: one per CPU)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    store = JobStore(args.dir, args.ttl)
+    try:
+        count = work(store, args.poll, args.once, args.workers)
+    except KeyboardInterrupt:
+        sys.exit(0)
+    finally:
+        store.close()
+
+    print(f"Ran {count} jobs")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from metrics import ParseMetrics
+from rows import ResultRow
+
+# Extra output columns added by the mark stage
+MARK_COLUMNS = ["Mark Seconds", "Mark Meters", "Qualifier", "Record"]
+
+# Rows converted per batch, so output still streams
+MARK_BATCH_SIZE = 4096
+
+# Meters per foot and per inch
+FOOT = 0.3048
+INCH = 0.0254
+
+# Character codes the mark scanner looks for
+DIGIT_0, DIGIT_9 = ord("0"), ord("9")
+DOT, COLON, DASH, METRIC = ord("."), ord(":"), ord("-"), ord("m")
+
+# Suffixes HY-TEK appends to marks: qualified, and record or tie markers
+QUALIFIER_CODES = [ord(flag) for flag in "qQ"]
+RECORD_CODES = [ord(flag) for flag in "*#@"]
+
+def normalize_marks(marks: List[str]) -> Dict[str, object]:
+    """
+    Convert a whole column of raw marks to numbers at once.
+
+    The marks are laid out as a matrix of character codes, one row per mark,
+    and scanned column by column with NumPy array operations, so the Python
+    loop runs once per character position rather than once per mark.
+    Times (10.23, 1:58.23, 1:02:03.4) become seconds; metric (5.60m) and
+    feet-inches (18-04.50) field marks become meters.
+
+    Args:
+        marks (List[str]): Raw marks such as "1:58.23q", "10.23*", "5.60m#"
+            or "18-04.50".
+
+    Returns:
+        Dict[str, numpy.ndarray]: "seconds" and "meters" (NaN where the mark
+            is not of that kind or cannot be read), and boolean "qualifier"
+            and "record" flags.
+    """
+    # NumPy is only needed when marks are normalized
+    import numpy as np
+
+    count = len(marks)
+    if not count:
+        empty = np.empty(0)
+        return {"seconds": empty, "meters": empty, "qualifier": empty.astype(bool),
+                "record": empty.astype(bool)}
+
+    # Fixed-width unicode strings viewed as one code point per cell, padded
+    # with zeros
+    codes = np.array(marks, dtype=str)
+    codes = codes.view(np.uint32).reshape(count, -1) if codes.itemsize else np.zeros((count, 1), np.uint32)
+
+    # Scanner state for every mark
+    current = np.zeros(count)      # Digits of the group being read
+    fraction = np.zeros(count)     # Place value of the next decimal digit, 0 before the point
+    total = np.zeros(count)        # Hours and minutes read so far, in seconds
+    feet = np.zeros(count)
+    digits = np.zeros(count, dtype=bool)
+    imperial = np.zeros(count, dtype=bool)
+    metric = np.zeros(count, dtype=bool)
+    done = np.zeros(count, dtype=bool)
+    qualifier = np.zeros(count, dtype=bool)
+    record = np.zeros(count, dtype=bool)
+
+    for column in codes.T:
+        active = ~done
+        digit = active & (column >= DIGIT_0) & (column <= DIGIT_9)
+        value = column.astype(np.float64) - DIGIT_0
+
+        # Whole digits shift the group left, decimals add at their place
+        whole = digit & (fraction == 0)
+        decimal = digit & (fraction > 0)
+        current = np.where(whole, current * 10 + value, current)
+        current = np.where(decimal, current + value * fraction, current)
+        fraction = np.where(decimal, fraction / 10, fraction)
+        digits |= digit
+
+        # Separators
+        point = active & (column == DOT) & (fraction == 0)
+        colon = active & (column == COLON)
+        dash = active & (column == DASH)
+        fraction = np.where(point, 0.1, fraction)
+        total = np.where(colon, (total + current) * 60, total)
+        feet = np.where(dash, current, feet)
+        imperial |= dash
+        separator = colon | dash
+        current = np.where(separator, 0, current)
+        fraction = np.where(separator, 0, fraction)
+
+        # "m" ends a metric mark, anything else ends the number
+        metric |= active & (column == METRIC)
+        done |= active & ~(digit | point | colon | dash)
+
+        # Suffix flags
+        for code in QUALIFIER_CODES:
+            qualifier |= column == code
+        for code in RECORD_CODES:
+            record |= column == code
+
+    timed = digits & ~metric & ~imperial
+    seconds = np.where(timed, total + current, np.nan)
+    meters = np.where(digits & metric, current, np.nan)
+    meters = np.where(digits & imperial, feet * FOOT + current * INCH, meters)
+
+    # Flags only count on marks that were read ("DQ" is not a qualifier)
+    return {
+        "seconds": np.round(seconds, 3),
+        "meters": np.round(meters, 4),
+        "qualifier": qualifier & digits,
+        "record": record & digits,
+    }
+
+def add_mark_columns(rows: List[ResultRow]) -> None:
+    """
+    Fill in the mark columns of a batch of parsed rows.
+
+    Args:
+        rows (List[ResultRow]): Parsed rows with a raw mark.
+    """
+    converted = normalize_marks([row.mark or "" for row in rows])
+    columns = zip(converted["seconds"].tolist(), converted["meters"].tolist(),
+                  converted["qualifier"].tolist(), converted["record"].tolist())
+
+    for row, (seconds, meters, qualifier, record) in zip(rows, columns):
+        # NaN is left blank in the output
+        row.mark_seconds = "" if seconds != seconds else seconds
+        row.mark_meters = "" if meters != meters else meters
+        row.qualifier = qualifier
+        row.record = record
+
+def iter_with_marks(rows: Iterable[ResultRow], batch_size: int = MARK_BATCH_SIZE,
+                    metrics: Optional[ParseMetrics] = None) -> Iterator[ResultRow]:
+    """
+    Add the mark columns to a stream of rows, one batch at a time.
+
+    Args:
+        rows (Iterable[ResultRow]): Parsed rows, consumed lazily.
+        batch_size (int): Rows converted together.
+        metrics (ParseMetrics): Optional metrics to charge conversion to.
+
+    Yields:
+        ResultRow: Each row with the mark columns filled in.
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            add_mark_columns(batch)
+            if metrics:
+                metrics.lap("marks")
+            yield from batch
+            batch = []
+
+    if batch:
+        add_mark_columns(batch)
+        if metrics:
+            metrics.lap("marks")
+        yield from batch
@@ -0,0 +1,754 @@
+#!/usr/bin/env python
+import hashlib
+import importlib
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# rapidfuzz is imported on first lookup, so a cold start that only loads the
+# snapshot never pays for it
+
+# Minimum score (exclusive) for a fuzzy match to be accepted
+MATCH_THRESHOLD = 85
+
+# Standardized names offered for review when a name is not matched, and the
+# lowest score worth offering
+CANDIDATE_LIMIT = int(os.environ.get("MATCH_CANDIDATES", 3))
+CANDIDATE_MIN_SCORE = 50
+
+# A lookup result, (standardized_name, score) or None, and the best scoring
+# standardized names offered instead when it is None
+Match = Optional[Tuple[str, float]]
+Resolution = Tuple[Match, List[Tuple[str, float]]]
+
+# Tables with at least this many choices narrow each fuzzy lookup to the
+# choices sharing the most trigrams with the query; smaller tables are
+# scanned in full. Overridable per deployment through the environment
+BLOCKING_MIN_CHOICES = int(os.environ.get("MATCH_BLOCKING_MIN_CHOICES", 5000))
+
+# Choices scored per blocked lookup
+BLOCKING_CANDIDATES = int(os.environ.get("MATCH_BLOCKING_CANDIDATES", 256))
+
+# Directory holding the standardized name tables and the snapshot
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Precompiled snapshot of every index, written by running this module
+SNAPSHOT_PATH = os.environ.get("ALIAS_SNAPSHOT", os.path.join(TABLE_DIR, "alias_snapshot.json"))
+
+# Bumped whenever the snapshot layout or key canonicalization changes
+SNAPSHOT_FORMAT = 3
+
+# Abbreviations expanded when canonicalizing names, so "Cape Cod Reg. Tech"
+# and "Cape Cod Regional Technical" share a key
+ABBREVIATIONS = {
+    "reg": "regional",
+    "voc": "vocational",
+    "tech": "technical",
+    "acad": "academy",
+    "st": "saint",
+    "mt": "mount",
+    "hs": "high school",
+}
+
+# Apostrophes are dropped ("St. John's" -> "st johns"), other punctuation
+# separates words ("Blackstone-Millville" -> "blackstone millville")
+apostrophe_pattern = re.compile(r"['\u2019]")
+punctuation_pattern = re.compile(r"[^\w\s]|_")
+
+def canonical_key(name: str) -> str:
+    """
+    Reduce a name to the key used by the exact-match fast path.
+
+    Casefolds, strips punctuation, expands common abbreviations and drops a
+    trailing "High School", so trivial spelling differences share a key.
+
+    Args:
+        name (str): A standardized name, alternative or raw string.
+
+    Returns:
+        str: The canonical key.
+    """
+    name = name.casefold().replace("&", " and ")
+    name = punctuation_pattern.sub(" ", apostrophe_pattern.sub("", name))
+
+    # Initialisms written with periods ("H.S.", "N.D.A.") become one word
+    words = []
+    initialism = False
+    for word in name.split():
+        if len(word) == 1 and initialism:
+            words[-1] += word
+        else:
+            words.append(word)
+            initialism = len(word) == 1
+
+    words = [expanded for word in words for expanded in ABBREVIATIONS.get(word, word).split()]
+
+    # "Littleton High School" is "Littleton"
+    if len(words) > 2 and words[-2:] == ["high", "school"]:
+        del words[-2:]
+
+    return " ".join(words)
+
+# Source module, table and rapidfuzz scorer of each index
+INDEX_SOURCES = {
+    "event": ("standard_events", "STANDARD_EVENTS", "WRatio"),
+    "school": ("standard_schools", "STANDARD_SCHOOLS", "partial_ratio"),
+}
+
+class MatchIndex:
+    """
+    Flattened lookup table of every standardized name and its alternatives.
+
+    `choices` holds each standardized name followed by its alternatives, in
+    the order of the source table, and `canonicals` maps each position in
+    `choices` back to its standardized name. A lookup is a single rapidfuzz
+    query over `choices` instead of one query per standardized name.
+
+    Before any fuzzy scoring, the canonical key of the query is looked up in
+    `exact`, which maps the key of every choice to its standardized name.
+    HY-TEK abbreviates a trailing word to its initial ("Shepherd H."), so
+    keys with the last word cut to its initial are included too, unless the
+    initial is ambiguous.
+
+    Tables of BLOCKING_MIN_CHOICES or more choices also get a TrigramBlocker,
+    built on the first fuzzy lookup, so a lookup scores a few hundred
+    candidates instead of every choice.
+    """
+
+    def __init__(self, name: str, table: Dict[str, List[str]], scorer: str = "WRatio"):
+        """
+        Build the index from a standardized name table.
+
+        Args:
+            name (str): Short name of the table (e.g. "school"), used to
+                namespace cached lookups.
+            table (Dict[str, List[str]]): Mapping of standardized names to
+                their alternative spellings.
+            scorer (str): Name of the rapidfuzz.fuzz scorer used for every
+                lookup.
+        """
+        self.name = name
+        self.scorer_name = scorer
+        self._scorer = None
+        self._blocker = None
+        self._groups = None
+        self.choices: List[str] = []
+        self.canonicals: List[str] = []
+        self.exact_hits = 0
+        self.fuzzy_lookups = 0
+
+        for standard_name, alternatives in table.items():
+            # Standardized name first, then alternatives, to keep tie-breaking
+            # identical to scanning the table entry by entry
+            for choice in [standard_name] + alternatives:
+                self.choices.append(choice)
+                self.canonicals.append(standard_name)
+
+        self.exact = self._exact_keys()
+
+        # Table version changes whenever the table contents, scorer or key
+        # canonicalization change; the version also covers the matcher
+        digest = hashlib.sha1()
+        digest.update(scorer.encode())
+        digest.update(json.dumps(table).encode())
+        digest.update(json.dumps(ABBREVIATIONS).encode())
+        self.table_version = digest.hexdigest()[:16]
+        self.version = matcher_version(self.table_version)
+
+    def _exact_keys(self) -> Dict[str, str]:
+        """
+        Map the canonical key of every choice to its standardized name.
+
+        Returns:
+            Dict[str, str]: Exact-match table, earlier choices winning ties
+                like the fuzzy match.
+        """
+        exact: Dict[str, str] = {}
+        for choice, canonical in zip(self.choices, self.canonicals):
+            key = canonical_key(choice)
+            if key:
+                exact.setdefault(key, canonical)
+
+        # Last word cut to its initial, kept only where it is unambiguous
+        initials: Dict[str, Optional[str]] = {}
+        for key, canonical in exact.items():
+            words = key.split()
+            if len(words) > 1 and len(words[-1]) > 1:
+                initial = " ".join(words[:-1] + [words[-1][0]])
+                if initials.get(initial, canonical) != canonical:
+                    canonical = None
+                initials[initial] = canonical
+
+        for initial, canonical in initials.items():
+            if canonical is not None:
+                exact.setdefault(initial, canonical)
+
+        return exact
+
+    @classmethod
+    def from_snapshot(cls, name: str, entry: Dict[str, object]) -> "MatchIndex":
+        """
+        Restore an index from its snapshot entry without rebuilding it.
+
+        Args:
+            name (str): Short name of the table.
+            entry (Dict[str, object]): Entry written by to_snapshot().
+
+        Returns:
+            MatchIndex: The ready-to-query index.
+        """
+        index = cls.__new__(cls)
+        index.name = name
+        index.scorer_name = entry["scorer"]
+        index._scorer = None
+        index._blocker = None
+        index._groups = None
+        index.exact_hits = 0
+        index.fuzzy_lookups = 0
+        # Entries written before the matcher was versioned hold the table
+        # version as "version"
+        index.table_version = entry.get("table_version") or entry["version"]
+        index.version = matcher_version(index.table_version)
+        index.choices = entry["choices"]
+
+        # Canonical names are stored once and referenced by position
+        standard = entry["standard"]
+        index.canonicals = [standard[position] for position in entry["canonical_ids"]]
+        index.exact = {key: standard[position] for key, position in entry["exact"].items()}
+        return index
+
+    def to_snapshot(self) -> Dict[str, object]:
+        """
+        Serialize the flattened index for the snapshot file.
+        """
+        standard = list(dict.fromkeys(self.canonicals))
+        positions = {name: position for position, name in enumerate(standard)}
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "scorer": self.scorer_name,
+            "table_version": self.table_version,
+            "standard": standard,
+            "choices": self.choices,
+            "canonical_ids": [positions[name] for name in self.canonicals],
+            "exact": {key: positions[name] for key, name in self.exact.items()},
+        }
+
+    @property
+    def scorer(self):
+        """
+        The rapidfuzz scorer, imported on first use.
+        """
+        if self._scorer is None:
+            from rapidfuzz import fuzz
+            self._scorer = getattr(fuzz, self.scorer_name)
+        return self._scorer
+
+    @property
+    def blocker(self) -> Optional["TrigramBlocker"]:
+        """
+        The trigram blocking index, built on first use, or None if the table
+        is small enough to scan in full.
+        """
+        if self._blocker is None and len(self.choices) >= BLOCKING_MIN_CHOICES:
+            self._blocker = TrigramBlocker(self.choices)
+        return self._blocker
+
+    @property
+    def groups(self):
+        """
+        The standardized names in table order, and for each choice the
+        position of its standardized name in that list, as a NumPy array.
+        Choices of one standardized name are contiguous, so the best score
+        per name is one np.maximum.reduceat over a row of choice scores.
+        """
+        if self._groups is None:
+            import numpy as np
+
+            standard = list(dict.fromkeys(self.canonicals))
+            positions = {name: position for position, name in enumerate(standard)}
+            self._groups = standard, np.array([positions[name] for name in self.canonicals], dtype=np.int32)
+        return self._groups
+
+    def score(self, queries: List[str], candidates: Optional[List[int]] = None, workers: int = 1):
+        """
+        Score queries against the choices, or only the given ones, in one
+        native rapidfuzz cdist call.
+
+        Args:
+            queries (List[str]): The raw names to look up.
+            candidates (List[int]): Ascending choice positions to score, or
+                None for every choice.
+            workers (int): Number of threads for cdist, -1 uses all cores.
+
+        Returns:
+            numpy.ndarray: One row per query, one column per scored choice;
+                scores below CANDIDATE_MIN_SCORE are 0.
+        """
+        import numpy as np
+        from rapidfuzz import process
+
+        choices = self.choices if candidates is None else [self.choices[position] for position in candidates]
+        return process.cdist(queries, choices, scorer=self.scorer, score_cutoff=CANDIDATE_MIN_SCORE,
+                             dtype=np.float64, workers=workers)
+
+    def resolve_scores(self, scores, candidates: Optional[List[int]] = None,
+                       limit: int = CANDIDATE_LIMIT) -> List[Resolution]:
+        """
+        Turn a score matrix from score() into lookup results, with the best
+        scoring standardized names for each query left unmatched.
+
+        Candidates are ranked by the best score of each standardized name's
+        choices, so the alternatives of one name never crowd the others out.
+
+        Args:
+            scores (numpy.ndarray): Scores from score().
+            candidates (List[int]): The choice positions that were scored,
+                or None for every choice.
+            limit (int): Most standardized names offered per unmatched
+                query.
+
+        Returns:
+            List[Resolution]: (match, candidates) per query; candidates are
+                (standardized_name, score) pairs, best first, and empty for
+                matched queries.
+        """
+        import numpy as np
+
+        # The first best choice decides a match, as in extractOne
+        top = scores.argmax(axis=1) if scores.shape[1] else np.zeros(len(scores), dtype=np.intp)
+        top_scores = scores[np.arange(len(scores)), top].tolist() if scores.shape[1] else [0.0] * len(scores)
+
+        results: List[Resolution] = []
+        unmatched = []
+        for row, (column, score) in enumerate(zip(top.tolist(), top_scores)):
+            if score > MATCH_THRESHOLD:
+                results.append(((self.canonicals[column if candidates is None else candidates[column]], score), []))
+            else:
+                results.append((None, []))
+                unmatched.append(row)
+
+        if not unmatched or not scores.shape[1]:
+            return results
+
+        # Only unmatched queries are ranked: the best score per standardized
+        # name, from the start of each run of its choices
+        standard, ids = self.groups
+        if candidates is not None:
+            ids = ids[candidates]
+        starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+        names = ids[starts].tolist()
+        best = np.maximum.reduceat(scores[unmatched], starts, axis=1)
+
+        for row, name_scores in zip(unmatched, best):
+            order = np.argsort(-name_scores, kind="stable")[:limit]
+            results[row] = (None, [(standard[names[column]], score) for column, score in
+                                   zip(order.tolist(), name_scores[order].tolist()) if score >= CANDIDATE_MIN_SCORE])
+
+        return results
+
+    def fuzzy_resolve(self, query: str, candidates: Optional[List[int]] = None,
+                      limit: int = CANDIDATE_LIMIT) -> Resolution:
+        """
+        Score a query against the choices, or only the given ones.
+
+        One rapidfuzz call ranks every choice worth offering, so the match
+        and the candidates offered instead come from the same scores,
+        without NumPy.
+
+        Args:
+            query (str): The raw name to look up.
+            candidates (List[int]): Ascending choice positions to score, or
+                None for every choice.
+            limit (int): Most standardized names offered if unmatched.
+
+        Returns:
+            Resolution: (match, candidates), see resolve_scores().
+        """
+        from rapidfuzz import process
+
+        choices = self.choices if candidates is None else [self.choices[position] for position in candidates]
+
+        # Best first; equal scores stay in table order, like extractOne
+        scored = process.extract(query, choices, scorer=self.scorer, score_cutoff=CANDIDATE_MIN_SCORE, limit=None)
+        positions = [column if candidates is None else candidates[column] for _, _, column in scored]
+
+        if scored and scored[0][1] > MATCH_THRESHOLD:
+            return (self.canonicals[positions[0]], scored[0][1]), []
+
+        offered: Dict[str, float] = {}
+        for (_, score, _), position in zip(scored, positions):
+            if len(offered) >= limit:
+                break
+            offered.setdefault(self.canonicals[position], score)
+        return None, list(offered.items())
+
+    def fuzzy_match(self, query: str, candidates: Optional[List[int]] = None) -> Match:
+        """
+        Score a query against the choices, or only the given ones.
+
+        Returns:
+            tuple: (standardized_name, score) if the best score is above
+                MATCH_THRESHOLD, otherwise None.
+        """
+        return self.fuzzy_resolve(query, candidates)[0]
+
+    def exact_match(self, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up the canonical key of a query in the exact-match table.
+
+        Args:
+            query (str): The raw name to look up.
+
+        Returns:
+            tuple: (standardized_name, 100.0) on a hit, otherwise None.
+        """
+        canonical = self.exact.get(canonical_key(query))
+        if canonical is None:
+            return None
+
+        self.exact_hits += 1
+        return canonical, 100.0
+
+    def lookup(self, query: str) -> Match:
+        """
+        Find the standardized name closest to the query.
+
+        Args:
+            query (str): The raw name to look up.
+
+        Returns:
+            tuple: (standardized_name, score) if the best score is above
+                MATCH_THRESHOLD, otherwise None.
+        """
+        return self.resolve(query)[0]
+
+    def resolve(self, query: str) -> Resolution:
+        """
+        Find the standardized name closest to the query, or the names to
+        offer a reviewer if none is close enough, from the same scores.
+
+        Args:
+            query (str): The raw name to look up.
+
+        Returns:
+            Resolution: (match, candidates), see resolve_scores().
+        """
+        # Exact match on the canonical key, no scoring needed
+        match = self.exact_match(query)
+        if match:
+            return match, []
+
+        self.fuzzy_lookups += 1
+
+        blocker = self.blocker
+        return self.fuzzy_resolve(query, blocker.candidates(query) if blocker else None)
+
+    def lookup_many(self, queries: List[str], workers: int = -1) -> List[Match]:
+        """
+        Resolve many raw names at once with a single score matrix, see
+        resolve_many().
+
+        Returns:
+            List[tuple]: One lookup result per query, in order.
+        """
+        return [match for match, _ in self.resolve_many(queries, workers)]
+
+    def resolve_many(self, queries: List[str], workers: int = -1) -> List[Resolution]:
+        """
+        Resolve many raw names at once with a single score matrix.
+
+        Scores every query against every choice in one native rapidfuzz
+        cdist call spread over all cores, then picks the best choice per
+        query, and the candidates of unmatched queries from the same
+        matrix. Queries with an exact canonical key match are resolved
+        first and left out of the matrix. Results match calling resolve on
+        each query.
+
+        Args:
+            queries (List[str]): The raw names to look up.
+            workers (int): Number of threads for cdist, -1 uses all cores.
+
+        Returns:
+            List[Resolution]: One (match, candidates) pair per query, in
+                order.
+        """
+        # Exact matches first, only the rest are scored
+        results: List[Resolution] = [(self.exact_match(query), []) for query in queries]
+        rows = [position for position, (match, _) in enumerate(results) if match is None]
+        if not rows:
+            return results
+
+        self.fuzzy_lookups += len(rows)
+
+        # A large table is blocked per query, which beats one full matrix
+        blocker = self.blocker
+        if blocker:
+            for row in rows:
+                results[row] = self.fuzzy_resolve(queries[row], blocker.candidates(queries[row]))
+            return results
+
+        # Rows are queries, columns are choices
+        scores = self.score([queries[row] for row in rows], workers=workers)
+        for row, result in zip(rows, self.resolve_scores(scores)):
+            results[row] = result
+
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Return fast-path counters for reporting.
+        """
+        lookups = self.exact_hits + self.fuzzy_lookups
+        return {
+            "exact_hits": self.exact_hits,
+            "fuzzy_lookups": self.fuzzy_lookups,
+            "exact_hit_rate": self.exact_hits / lookups if lookups else 0.0,
+        }
+
+class TrigramBlocker:
+    """
+    Inverted index from character trigrams to the choices containing them,
+    used to pick the few choices worth scoring for a query.
+
+    Choices are ranked by the IDF-weighted trigrams they share with the
+    query, divided by the weight of the shorter of the two, so a short
+    query inside a long name ("Shepherd H." in "Shepherd Hill Regional")
+    and a short name inside a long query both rank near the top. Trigrams
+    found in most names ("hig", "sch") weigh next to nothing.
+    """
+
+    def __init__(self, choices: List[str]):
+        """
+        Args:
+            choices (List[str]): The index's choices, in table order.
+        """
+        import numpy as np
+
+        postings: Dict[str, List[int]] = {}
+        for position, choice in enumerate(choices):
+            for gram in trigrams(choice):
+                postings.setdefault(gram, []).append(position)
+
+        count = len(choices)
+        self.count = count
+        self.postings = {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()}
+        self.weights = {gram: float(np.log((count + 1) / len(positions))) for gram, positions in postings.items()}
+
+        # Total weight of each choice's trigrams, to normalize shared weight
+        self.totals = np.zeros(count)
+        for gram, positions in self.postings.items():
+            self.totals[positions] += self.weights[gram]
+
+    def candidates(self, query: str, limit: int = BLOCKING_CANDIDATES) -> List[int]:
+        """
+        Return the choices most likely to score highest for a query.
+
+        Args:
+            query (str): The raw name to look up.
+            limit (int): Most candidates returned.
+
+        Returns:
+            List[int]: Choice positions in ascending (table) order.
+        """
+        import numpy as np
+
+        grams = [gram for gram in trigrams(query) if gram in self.postings]
+        if not grams:
+            return []
+
+        positions = np.concatenate([self.postings[gram] for gram in grams])
+        weights = np.repeat([self.weights[gram] for gram in grams], [len(self.postings[gram]) for gram in grams])
+        shared = np.bincount(positions, weights=weights, minlength=self.count)
+
+        # Weight of the query's trigrams, unknown ones included
+        query_total = sum(self.weights.get(gram, np.log(self.count + 1)) for gram in trigrams(query))
+        ranking = shared / np.minimum(self.totals, query_total)
+
+        matched = np.flatnonzero(shared)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-ranking[matched], limit - 1)[:limit]]
+            matched.sort()
+        return matched.tolist()
+
+def trigrams(text: str) -> set:
+    """
+    Return the distinct casefolded character trigrams of a name, padded
+    with spaces so short words and word boundaries count.
+    """
+    text = " " + " ".join(text.casefold().split()) + " "
+    return {text[position:position + 3] for position in range(len(text) - 2)}
+
+def changed_queries(old: MatchIndex, new: MatchIndex, results: Dict[str, Optional[str]]) -> List[str]:
+    """
+    Find the raw strings that may resolve differently after a table change,
+    without scoring them against the whole new table.
+
+    A string can only change if its exact-match key now maps elsewhere, if
+    the standardized name it resolved to had alternatives added, removed or
+    moved, or if a newly added alternative scores above the threshold for
+    it. Anything else keeps its old result, so only the strings returned
+    need looking up again. If the scorer or the order of the table entries
+    changed, every string is returned.
+
+    Args:
+        old (MatchIndex): Index the results were resolved with.
+        new (MatchIndex): Index to resolve them with now; both must use the
+            same key canonicalization.
+        results (Dict[str, Optional[str]]): Raw strings and the standardized
+            name each resolved to with the old index, None if unmatched.
+
+    Returns:
+        List[str]: Raw strings to look up again in the new index.
+    """
+    if old.scorer_name != new.scorer_name:
+        return list(results)
+
+    def groups(index: MatchIndex) -> Dict[str, List[str]]:
+        grouped: Dict[str, List[str]] = {}
+        for choice, canonical in zip(index.choices, index.canonicals):
+            grouped.setdefault(canonical, []).append(choice)
+        return grouped
+
+    old_groups, new_groups = groups(old), groups(new)
+
+    # Ties go to the earliest choice, so reordered entries can change any result
+    if [name for name in old_groups if name in new_groups] != [name for name in new_groups if name in old_groups]:
+        return list(results)
+
+    affected = {name for name in old_groups.keys() | new_groups.keys() if old_groups.get(name) != new_groups.get(name)}
+    old_pairs = set(zip(old.choices, old.canonicals))
+    added = [choice for choice, canonical in zip(new.choices, new.canonicals) if (choice, canonical) not in old_pairs]
+    changed_keys = {key for key in old.exact.keys() | new.exact.keys() if old.exact.get(key) != new.exact.get(key)}
+
+    changed = []
+    unchanged_standard = []
+    for query, standard in results.items():
+        key = canonical_key(query)
+        if key in changed_keys or (key not in new.exact and standard in affected):
+            changed.append(query)
+        elif key not in new.exact:
+            # Resolved by fuzzy scoring to an untouched name, or unmatched
+            unchanged_standard.append(query)
+
+    # Only a new alternative scoring above the threshold can change those
+    if added and unchanged_standard:
+        import numpy as np
+        from rapidfuzz import process
+
+        scores = process.cdist(unchanged_standard, added, scorer=new.scorer, score_cutoff=MATCH_THRESHOLD,
+                               dtype=np.float64, workers=-1)
+        for query, best in zip(unchanged_standard, scores.max(axis=1).tolist()):
+            if best > MATCH_THRESHOLD:
+                changed.append(query)
+
+    return changed
+
+def matcher_version(table_version: str) -> str:
+    """
+    Combine a table version with the matching settings and this module's
+    code (key canonicalization, the exact fast path, scoring and blocking),
+    so results cached under one matcher are never served by another.
+
+    Args:
+        table_version (str): Digest of the table, scorer and abbreviations.
+
+    Returns:
+        str: The index version.
+    """
+    digest = hashlib.sha1(table_version.encode())
+    digest.update(json.dumps([MATCH_THRESHOLD, CANDIDATE_LIMIT, CANDIDATE_MIN_SCORE, BLOCKING_MIN_CHOICES,
+                              BLOCKING_CANDIDATES]).encode())
+    digest.update(source_digest("match_index").encode())
+    return digest.hexdigest()[:16]
+
+def source_digest(module_name: str) -> str:
+    """
+    Hash the source file of a standardized name table, so a snapshot built
+    from an older table is never used.
+    """
+    with open(os.path.join(TABLE_DIR, module_name + ".py"), "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def build_index(name: str) -> MatchIndex:
+    """
+    Build an index from its standardized name table.
+
+    Args:
+        name (str): Index name, a key of INDEX_SOURCES.
+
+    Returns:
+        MatchIndex: The index.
+    """
+    module_name, table_name, scorer = INDEX_SOURCES[name]
+    table = getattr(importlib.import_module(module_name), table_name)
+    return MatchIndex(name, table, scorer)
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> Dict[str, Dict[str, object]]:
+    """
+    Read every snapshot entry with a single file read.
+
+    Returns:
+        Dict[str, Dict[str, object]]: Entries keyed by index name, empty if
+            there is no usable snapshot.
+    """
+    try:
+        with open(path, "rb") as file:
+            return json.loads(file.read())
+    except (OSError, ValueError):
+        return {}
+
+def load_index(name: str, snapshot: Dict[str, Dict[str, object]]) -> MatchIndex:
+    """
+    Load an index from the snapshot, or build it if the snapshot is missing
+    or was built from a different table.
+
+    Args:
+        name (str): Index name, a key of INDEX_SOURCES.
+        snapshot (Dict[str, Dict[str, object]]): Entries from read_snapshot().
+
+    Returns:
+        MatchIndex: The index.
+    """
+    module_name, _, scorer = INDEX_SOURCES[name]
+    entry = snapshot.get(name)
+
+    try:
+        if (entry and entry.get("format") == SNAPSHOT_FORMAT and entry["scorer"] == scorer
+                and entry["source"] == source_digest(module_name)):
+            return MatchIndex.from_snapshot(name, entry)
+    except (OSError, KeyError, TypeError):
+        pass
+
+    return build_index(name)
+
+def write_snapshot(path: str = SNAPSHOT_PATH) -> None:
+    """
+    Build every index and save them as one compact snapshot file.
+
+    Args:
+        path (str): Where to write the snapshot.
+    """
+    snapshot = {}
+    for name, (module_name, _, _) in INDEX_SOURCES.items():
+        snapshot[name] = {"source": source_digest(module_name), **build_index(name).to_snapshot()}
+
+    with open(path, "w") as file:
+        json.dump(snapshot, file, separators=(",", ":"))
+
+# Indexes are loaded once at import and shared by every lookup, including
+# across warm invocations of the serverless function
+_snapshot = read_snapshot()
+EVENT_INDEX = load_index("event", _snapshot)
+SCHOOL_INDEX = load_index("school", _snapshot)
+del _snapshot
+
+if __name__ == "__main__":
+    '''
+    Build step: precompile the alias snapshot loaded at cold start.
+    '''
+
+    path = sys.argv[1] if len(sys.argv) > 1 else SNAPSHOT_PATH
+    write_snapshot(path)
+    print(f"Alias snapshot saved to {path}")
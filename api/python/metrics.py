@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+import heapq
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Parsing stages, in pipeline order
+STAGES = ["read", "classify", "regex", "match", "marks", "write"]
+
+# Stages that are not part of handling a line itself, and so are left out
+# of the per-line timings used for slowest-line tracking
+LINE_EXCLUDED_STAGES = {"read", "write"}
+
+class ParseMetrics:
+    """
+    Stage timers, counters and slowest lines for a single parse.
+
+    Timing works like a stopwatch with laps: every call to lap() charges the
+    time since the previous lap to a stage, so the stages always add up to
+    the wall time of the parse. The parser only touches a ParseMetrics when
+    one is passed in, so unprofiled parses pay nothing for it.
+    """
+
+    def __init__(self, slowest: int = 5):
+        """
+        Start the stopwatch.
+
+        Args:
+            slowest (int): Number of slowest lines to keep.
+        """
+        self.stages: Dict[str, float] = defaultdict(float)
+        self.counters: Counter = Counter()
+        self.slowest: List[Tuple[float, int, str]] = []
+        self.keep_slowest = slowest
+
+        self._start = self._mark = time.perf_counter()
+        self._line_number = 0
+        self._line = ""
+        self._line_seconds = 0.0
+        self._lookups_start = None
+        self._lookups_end = None
+        self._elapsed = None
+
+    def lap(self, stage: str) -> None:
+        """
+        Charge the time since the previous lap to a stage.
+        """
+        now = time.perf_counter()
+        seconds = now - self._mark
+        self._mark = now
+
+        self.stages[stage] += seconds
+        if stage not in LINE_EXCLUDED_STAGES:
+            self._line_seconds += seconds
+
+    def start_line(self, line_number: int, line: str) -> None:
+        """
+        Finish timing the previous line and start timing a new one.
+
+        Args:
+            line_number (int): 1-based line number in the source.
+            line (str): The line just read.
+        """
+        self.lap("read")
+        self._end_line()
+        self._line_number = line_number
+        self._line = line
+        self.counters["lines"] += 1
+
+    def _end_line(self) -> None:
+        """
+        Record the current line if it is among the slowest seen so far.
+        """
+        if self._line_number:
+            entry = (self._line_seconds, self._line_number, self._line)
+            if len(self.slowest) < self.keep_slowest:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+        self._line_seconds = 0.0
+
+    def time_rows(self, rows: Iterable[Dict[str, object]], stage: str) -> Iterator[Dict[str, object]]:
+        """
+        Pass rows through, charging the consumer's work on each row to a
+        stage (e.g. "write" for an output writer).
+        """
+        for row in rows:
+            yield row
+            self.lap(stage)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Add to a counter.
+        """
+        self.counters[name] += amount
+
+    def watch_lookups(self, stats: Dict[str, int]) -> None:
+        """
+        Remember the process-wide lookup counters (cache and fast-path hits)
+        at the start of the parse.
+        """
+        self._lookups_start = stats
+
+    def finish(self, lookup_stats: Optional[Dict[str, int]] = None) -> None:
+        """
+        Stop the stopwatch once the last row is written.
+
+        Args:
+            lookup_stats (Dict[str, int]): Lookup counters at the end of the
+                parse, compared against those passed to watch_lookups().
+        """
+        self._end_line()
+        self._line_number = 0
+        self._elapsed = time.perf_counter() - self._start
+        self._lookups_end = lookup_stats
+
+    def as_dict(self) -> Dict[str, object]:
+        """
+        Return the metrics as a JSON-serializable dictionary.
+        """
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._start
+        counters = dict(self.counters)
+
+        # Lookup activity during this parse only
+        if self._lookups_start is not None and self._lookups_end is not None:
+            for name, value in self._lookups_end.items():
+                counters[name] = value - self._lookups_start.get(name, 0)
+
+            # Share of fuzzy-match candidates resolved by the exact fast path
+            resolved = counters.get("exact_hits", 0) + counters.get("fuzzy_lookups", 0)
+            if resolved:
+                counters["exact_hit_rate"] = round(counters["exact_hits"] / resolved, 4)
+
+        return {
+            "seconds": round(elapsed, 6),
+            "stages": {stage: round(self.stages.get(stage, 0.0), 6) for stage in STAGES},
+            "counters": counters,
+            "slowest_lines": [
+                {"line": line_number, "seconds": round(seconds, 6), "text": line.rstrip("\r\n")}
+                for seconds, line_number, line in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+    def report(self) -> str:
+        """
+        Format the metrics as a plain text table.
+        """
+        metrics = self.as_dict()
+        total = metrics["seconds"] or 1.0
+        lines = [f"Total: {metrics['seconds']:.3f}s"]
+
+        for stage, seconds in metrics["stages"].items():
+            lines.append(f"  {stage:<10} {seconds:8.3f}s  {100 * seconds / total:5.1f}%")
+
+        for name, value in metrics["counters"].items():
+            lines.append(f"  {name:<16} {value:>10}")
+
+        lines.append("Slowest lines:")
+        for entry in metrics["slowest_lines"]:
+            lines.append(f"  {entry['line']:>8}  {entry['seconds'] * 1e6:8.1f}us  {entry['text'][:70]}")
+
+        return "\n".join(lines)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+import io
+from typing import Dict, Iterator, Optional, Tuple
+
+# Bytes read from the request body at a time
+CHUNK_SIZE = 64 * 1024
+
+# Largest header block or form field value kept in memory
+MAX_HEADER_SIZE = 16 * 1024
+MAX_FIELD_SIZE = 64 * 1024
+
+class MultipartError(ValueError):
+    """
+    Raised when a multipart/form-data body is malformed.
+    """
+
+def parse_options_header(value: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a header such as Content-Type or Content-Disposition into its main
+    value and its parameters.
+
+    Args:
+        value (str): The raw header value, e.g.
+            'form-data; name="file"; filename="results.txt"'.
+
+    Returns:
+        tuple: (main value, dict of lower-cased parameter names to values)
+    """
+    main, _, rest = value.partition(";")
+    options = {}
+
+    for param in rest.split(";"):
+        key, sep, val = param.strip().partition("=")
+        if not sep:
+            continue
+
+        # Strip optional quotes around the value
+        val = val.strip()
+        if len(val) >= 2 and val[0] == val[-1] == '"':
+            val = val[1:-1]
+        options[key.strip().lower()] = val
+
+    return main.strip().lower(), options
+
+class MultipartPart(io.RawIOBase):
+    """
+    One part of a multipart body, readable as a binary stream.
+
+    The part's data is pulled from the request body in chunks as it is read;
+    it must be consumed (or skipped by moving to the next part) in order.
+    """
+
+    def __init__(self, reader: "MultipartReader", headers: Dict[str, str]):
+        self._reader = reader
+        self.headers = headers
+        self._pending = b""
+        self._offset = 0
+        self._done = False
+
+        # Field name and upload filename from Content-Disposition
+        _, disposition = parse_options_header(headers.get("content-disposition", ""))
+        self.name = disposition.get("name", "")
+        self.filename = disposition.get("filename")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # Refill from the request body when the pending data is used up
+        while self._offset >= len(self._pending) and not self._done:
+            self._pending, self._done = self._reader._read_part_data()
+            self._offset = 0
+
+        size = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:size] = self._pending[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def drain(self) -> None:
+        """
+        Skip whatever is left of the part's data.
+        """
+        self._pending = b""
+        self._offset = 0
+        while not self._done:
+            _, self._done = self._reader._read_part_data()
+
+    def read_value(self, encoding: str = "utf-8") -> str:
+        """
+        Read the whole part as a short text form field.
+
+        Returns:
+            str: The decoded field value.
+        """
+        # Raw reads stop at the end of each piece of data, which can be short
+        value = b""
+        while len(value) <= MAX_FIELD_SIZE:
+            data = self.read(MAX_FIELD_SIZE + 1 - len(value))
+            if not data:
+                break
+            value += data
+        if len(value) > MAX_FIELD_SIZE:
+            raise MultipartError(f"Form field {self.name!r} is too large")
+        self.drain()
+        return value.decode(encoding, errors="replace")
+
+class MultipartReader:
+    """
+    Streaming multipart/form-data parser.
+
+    Reads the request body in fixed-size chunks and yields each part as a
+    stream as soon as its headers are read, so peak memory does not depend
+    on the size of the upload.
+    """
+
+    def __init__(self, stream, boundary: str, content_length: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            stream: Binary stream holding the request body (e.g. rfile).
+            boundary (str): Boundary from the Content-Type header.
+            content_length (int): Size of the body in bytes, if known. Reading
+                never goes past it.
+            chunk_size (int): Bytes read from the stream at a time.
+        """
+        if not boundary:
+            raise MultipartError("Missing multipart boundary")
+
+        self._stream = stream
+        self._remaining = content_length
+        self._chunk_size = chunk_size
+
+        # Every delimiter, including the first, is preceded by CRLF, so the
+        # body is treated as if it started with one
+        self._delimiter = b"\r\n--" + boundary.encode("latin-1")
+        self._buffer = b"\r\n"
+        self._eof = False
+        self._finished = False
+
+    @classmethod
+    def from_headers(cls, stream, headers, chunk_size: int = CHUNK_SIZE) -> "MultipartReader":
+        """
+        Create a reader from HTTP request headers.
+
+        Args:
+            stream: Binary stream holding the request body.
+            headers: Mapping of request headers with Content-Type and,
+                optionally, Content-Length.
+
+        Returns:
+            MultipartReader: Reader for the request body.
+        """
+        content_type, options = parse_options_header(headers.get("content-type", ""))
+        if content_type != "multipart/form-data":
+            raise MultipartError("Expected multipart/form-data")
+
+        content_length = headers.get("content-length")
+        return cls(stream, options.get("boundary", ""),
+                   int(content_length) if content_length else None, chunk_size)
+
+    def _fill(self) -> bool:
+        """
+        Read the next chunk of the body into the buffer.
+
+        Returns:
+            bool: False once the body is exhausted.
+        """
+        if self._eof:
+            return False
+
+        size = self._chunk_size
+        if self._remaining is not None:
+            size = min(size, self._remaining)
+
+        chunk = self._stream.read(size) if size else b""
+        if not chunk:
+            self._eof = True
+            return False
+
+        if self._remaining is not None:
+            self._remaining -= len(chunk)
+        self._buffer += chunk
+        return True
+
+    def _read_part_data(self) -> Tuple[bytes, bool]:
+        """
+        Return the next piece of the current part's data.
+
+        Returns:
+            tuple: (data, done) where done is True once the delimiter ending
+                the part has been reached.
+        """
+        while True:
+            index = self._buffer.find(self._delimiter)
+
+            # Delimiter found, the part ends here
+            if index >= 0:
+                data = self._buffer[:index]
+                self._buffer = self._buffer[index + len(self._delimiter):]
+                return data, True
+
+            # Keep a tail that could be the start of a split delimiter
+            keep = len(self._delimiter) - 1
+            if len(self._buffer) > keep:
+                data = self._buffer[:-keep]
+                self._buffer = self._buffer[-keep:]
+                return data, False
+
+            if not self._fill():
+                raise MultipartError("Unexpected end of multipart body")
+
+    def _read_headers(self) -> Optional[Dict[str, str]]:
+        """
+        Read the line after a delimiter and the part headers that follow.
+
+        Returns:
+            Dict[str, str]: Lower-cased header names to values, or None when
+                the closing delimiter was reached.
+        """
+        # Need at least the two bytes after the delimiter
+        while len(self._buffer) < 2 and self._fill():
+            pass
+
+        # Closing delimiter ends the body
+        if self._buffer.startswith(b"--"):
+            self._finished = True
+            return None
+
+        # Read up to the blank line that ends the header block
+        while True:
+            end = self._buffer.find(b"\r\n\r\n")
+            if end >= 0:
+                break
+            if len(self._buffer) > MAX_HEADER_SIZE:
+                raise MultipartError("Multipart headers are too large")
+            if not self._fill():
+                raise MultipartError("Unexpected end of multipart body")
+
+        block = self._buffer[:end].decode("utf-8", errors="replace")
+        self._buffer = self._buffer[end + 4:]
+
+        headers = {}
+        for line in block.split("\r\n"):
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        return headers
+
+    def parts(self) -> Iterator[MultipartPart]:
+        """
+        Yield each part of the body in order.
+
+        A part that has not been fully read when the next one is requested
+        is skipped.
+
+        Yields:
+            MultipartPart: The next part, readable as a binary stream.
+        """
+        # Skip the preamble before the first delimiter
+        _, done = self._read_part_data()
+        while not done:
+            _, done = self._read_part_data()
+
+        while not self._finished:
+            headers = self._read_headers()
+            if headers is None:
+                break
+
+            part = MultipartPart(self, headers)
+            yield part
+            part.drain()
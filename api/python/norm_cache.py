@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+import atexit
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from match_index import Match, MatchIndex, Resolution
+
+# Defaults can be overridden per deployment through the environment
+DEFAULT_CACHE_SIZE = int(os.environ.get("NORM_CACHE_SIZE", "4096"))
+DEFAULT_CACHE_DB = os.environ.get("NORM_CACHE_DB") or None
+
+# Entries kept in the on-disk store; past this the oldest written are
+# dropped, whatever table version they were resolved with
+DEFAULT_CACHE_DB_ROWS = int(os.environ.get("NORM_CACHE_DB_ROWS", "500000"))
+
+# Number of pending on-disk writes before they are committed
+FLUSH_EVERY = 64
+
+# Number of on-disk writes between checks of the store's size
+PRUNE_EVERY = 4096
+
+class NormalizationCache:
+    """
+    Memo cache for event and school lookups.
+
+    Entries are keyed on (table name, table version, raw string), so editing
+    standard_schools.py or standard_events.py changes the version and stale
+    entries are never returned. Unmatched strings keep the candidates the
+    index offered for them. Lookups go to a bounded in-process LRU first,
+    then to an optional SQLite store that persists across runs.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, db_path: Optional[str] = None,
+                 max_rows: int = DEFAULT_CACHE_DB_ROWS):
+        """
+        Create the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept in memory.
+            db_path (str): Optional path to a SQLite file used as the
+                persistent store. No disk store is used when omitted.
+            max_rows (int): Maximum number of entries kept in the store.
+        """
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._memory: "OrderedDict[Tuple[str, str, str], Resolution]" = OrderedDict()
+        self._db = None
+        self._pending = 0
+        self._written = 0
+
+        if db_path:
+            self._open(db_path)
+
+    def _open(self, db_path: str) -> None:
+        """
+        Open (and create if needed) the SQLite store.
+
+        Args:
+            db_path (str): Path to the SQLite file.
+        """
+        # Only deployments with a disk store pay for importing sqlite3
+        import sqlite3
+
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS normalized ("
+            " kind TEXT NOT NULL, version TEXT NOT NULL, raw TEXT NOT NULL,"
+            " name TEXT, score REAL, candidates TEXT,"
+            " PRIMARY KEY (kind, version, raw))"
+        )
+
+        # Stores written before candidates were kept: unmatched entries are
+        # dropped so they are resolved again with their candidates
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(normalized)")]
+        if "candidates" not in columns:
+            try:
+                self._db.execute("ALTER TABLE normalized ADD COLUMN candidates TEXT")
+                self._db.execute("DELETE FROM normalized WHERE name IS NULL")
+            except sqlite3.OperationalError:
+                # Another worker sharing the store migrated it first
+                pass
+        self._db.commit()
+        self._prune()
+
+        # Commit anything still pending when the process exits
+        atexit.register(self.flush)
+
+    def _prune(self) -> None:
+        """
+        Drop the oldest written on-disk entries once the store holds more
+        than max_rows.
+
+        Entries are not dropped for belonging to another table version:
+        processes sharing the store may be running different versions of
+        the tables, and would otherwise keep deleting each other's entries.
+        Entries of retired versions are simply no longer written, so they
+        age out first.
+        """
+        self._written = 0
+        (count,) = self._db.execute("SELECT COUNT(*) FROM normalized").fetchone()
+        if count > self.max_rows:
+            # Every write takes a new, higher rowid
+            self._db.execute("DELETE FROM normalized WHERE rowid IN"
+                             " (SELECT rowid FROM normalized ORDER BY rowid LIMIT ?)", (count - self.max_rows,))
+            self._db.commit()
+
+    def lookup(self, index: MatchIndex, query: str) -> Match:
+        """
+        Look up a raw string, querying the index only on a cache miss.
+
+        Args:
+            index (MatchIndex): The index to query on a miss.
+            query (str): The raw name to look up.
+
+        Returns:
+            tuple: Same result as MatchIndex.lookup.
+        """
+        return self.resolve(index, query)[0]
+
+    def resolve(self, index: MatchIndex, query: str) -> Resolution:
+        """
+        Resolve a raw string with its candidates, querying the index only on
+        a cache miss.
+
+        Args:
+            index (MatchIndex): The index to query on a miss.
+            query (str): The raw name to look up.
+
+        Returns:
+            tuple: Same result as MatchIndex.resolve.
+        """
+        key = (index.name, index.version, query)
+
+        found, result = self._cached(index, key)
+        if found:
+            return result
+
+        # Miss, run the fuzzy match
+        self.misses += 1
+        result = index.resolve(query)
+        self._store(key, result)
+
+        return result
+
+    def lookup_many(self, index: MatchIndex, queries: List[str]) -> List[Match]:
+        """
+        Look up many distinct raw strings, resolving all misses in one batch.
+
+        Args:
+            index (MatchIndex): The index to query on a miss.
+            queries (List[str]): Distinct raw names to look up.
+
+        Returns:
+            List[tuple]: Same results as MatchIndex.lookup_many.
+        """
+        return [match for match, _ in self.resolve_many(index, queries)]
+
+    def resolve_many(self, index: MatchIndex, queries: List[str]) -> List[Resolution]:
+        """
+        Resolve many distinct raw strings with their candidates, resolving
+        all misses in one batch.
+
+        Args:
+            index (MatchIndex): The index to query on a miss.
+            queries (List[str]): Distinct raw names to look up.
+
+        Returns:
+            List[tuple]: Same results as MatchIndex.resolve_many.
+        """
+        results: Dict[str, Resolution] = {}
+        missing = []
+
+        for query in queries:
+            found, result = self._cached(index, (index.name, index.version, query))
+            if found:
+                results[query] = result
+            else:
+                missing.append(query)
+
+        # Resolve every miss with a single score matrix
+        for query, result in zip(missing, index.resolve_many(missing)):
+            self.misses += 1
+            self._store((index.name, index.version, query), result)
+            results[query] = result
+
+        return [results[query] for query in queries]
+
+    def _cached(self, index: MatchIndex, key: Tuple[str, str, str]) -> Tuple[bool, Optional[Resolution]]:
+        """
+        Check the LRU, then the persistent store, for a key.
+
+        Returns:
+            tuple: (found, result)
+        """
+        # In-process LRU
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return True, self._memory[key]
+
+        # Persistent store
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT name, score, candidates FROM normalized WHERE kind = ? AND version = ? AND raw = ?",
+                key
+            ).fetchone()
+
+            if row is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                match = (row[0], row[1]) if row[0] is not None else None
+                result = (match, [tuple(candidate) for candidate in json.loads(row[2] or "[]")])
+                self._remember(key, result)
+                return True, result
+
+        return False, None
+
+    def _store(self, key: Tuple[str, str, str], result: Resolution) -> None:
+        """
+        Record a freshly computed result in the LRU and the persistent store.
+        """
+        self._remember(key, result)
+
+        if self._db is not None:
+            match, candidates = result
+            self._db.execute(
+                "INSERT OR REPLACE INTO normalized VALUES (?, ?, ?, ?, ?, ?)",
+                key + (match or (None, None)) + (json.dumps(candidates) if candidates else None,)
+            )
+            self._pending += 1
+            self._written += 1
+            if self._pending >= FLUSH_EVERY:
+                self.flush()
+
+    def _remember(self, key: Tuple[str, str, str], result: Resolution) -> None:
+        """
+        Store a result in the LRU, evicting the least recently used entry.
+        """
+        self._memory[key] = result
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def flush(self) -> None:
+        """
+        Commit pending writes to the persistent store.
+        """
+        if self._db is not None and self._pending:
+            self._db.commit()
+            self._pending = 0
+
+            if self._written >= PRUNE_EVERY:
+                self._prune()
+
+    def clear(self) -> None:
+        """
+        Empty the in-process LRU and reset the counters.
+        """
+        self._memory.clear()
+        self.hits = self.misses = self.disk_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters for reporting.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "size": len(self._memory),
+        }
+
+# Shared cache used by normalize_event and normalize_school
+NORM_CACHE = NormalizationCache(db_path=DEFAULT_CACHE_DB)
+
+def configure_cache(maxsize: int = DEFAULT_CACHE_SIZE, db_path: Optional[str] = None) -> NormalizationCache:
+    """
+    Replace the shared cache, e.g. to enable the on-disk store from the CLI.
+
+    Args:
+        maxsize (int): Maximum number of entries kept in memory.
+        db_path (str): Optional path to a SQLite file for the persistent store.
+
+    Returns:
+        NormalizationCache: The new shared cache.
+    """
+    global NORM_CACHE
+
+    NORM_CACHE.flush()
+    NORM_CACHE = NormalizationCache(maxsize, db_path)
+    return NORM_CACHE
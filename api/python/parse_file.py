@@ -1,15 +1,28 @@
 #!/usr/bin/env python
-import re
 import csv
 import io
+import logging
+import os
 import sys
-from typing import List, Dict
-from rapidfuzz import fuzz, process
+from contextlib import contextmanager
+from itertools import chain
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
 
-from standard_events import STANDARD_EVENTS
-from standard_schools import STANDARD_SCHOOLS
+import byte_lines
+import norm_cache
+import result_cache
+from athletes import ATHLETE_COLUMN, AthleteIndex
+from columns import ColumnLayout
+from formats import LINE_EVENT, LINE_RESULT, LINE_ROUND, RESULT_FORMATS, sniff_lines
+from marks import MARK_COLUMNS, iter_with_marks
+from match_index import EVENT_INDEX, SCHOOL_INDEX
+from metrics import ParseMetrics
+from rows import ResultRow
+from writers import OUTPUT_FORMATS, format_available
 
-def normalize_event(event_name: str, review_bool: bool) -> str:
+logger = logging.getLogger(__name__)
+
+def normalize_event(event_name: str, review_bool: bool) -> tuple:
     """
     Normalize the event name to the closest standardized name using fuzzy matching.
     
@@ -18,32 +31,23 @@ def normalize_event(event_name: str, review_bool: bool) -> str:
         review_bool (bool): The review flag to mark if the event name is missing or invalid.
     
     Returns:
-        str: The standardized event name if a match is found, otherwise the original name.
+        tuple: (standardized event name if a match is found, otherwise the
+            original name; review flag; closest standardized names as
+            (name, score) pairs if no match is found, otherwise None)
     """
 
-    # Initialize best match and score variables
-    best_match = ""
-    best_score = 0
-
-    for standard_event, alternatives in STANDARD_EVENTS.items():
-        # Combine standard event and alternatives for fuzzy matching
-        possible_matches = [standard_event] + alternatives
-        result = process.extractOne(event_name, possible_matches)
-
-        # If score is higher than previous best, update with standardized
-        # event name and score
-        if result[1] > best_score:
-            best_match, best_score = standard_event, result[1]
+    # Query the prebuilt event index in a single pass, memoized
+    match, candidates = norm_cache.NORM_CACHE.resolve(EVENT_INDEX, event_name)
 
-    # At end of loop, return best match if score is above threshold (85)
-    if best_score > 85:
-        print(best_match)
-        return best_match, review_bool
+    # Return best match if score is above threshold (85)
+    if match:
+        logger.debug("Event %r normalized to %r", event_name, match[0])
+        return match[0], review_bool, None
     else :
         # Return original if no close match found
-        return event_name, True
+        return event_name, True, candidates
 
-def normalize_school(school_name: str, review_bool: bool) -> str:
+def normalize_school(school_name: str, review_bool: bool) -> tuple:
     """
     Normalize the school name to the closest standardized name using fuzzy matching.
     
@@ -52,156 +56,564 @@ def normalize_school(school_name: str, review_bool: bool) -> str:
         review_bool (bool): The review flag to mark if the school name is missing or invalid.
     
     Returns:
-        str: The standardized school name if a match is found, otherwise the original name.
+        tuple: (standardized school name if a match is found, otherwise the
+            original name; review flag; closest standardized names as
+            (name, score) pairs if no match is found, otherwise None)
+    """
+    # Query the prebuilt school index in a single pass, memoized
+    match, candidates = norm_cache.NORM_CACHE.resolve(SCHOOL_INDEX, school_name)
+
+    # Return best match if score is above threshold (85)
+    if match:
+        return match[0], review_bool, None
+    else:
+        # Return original if no close match found
+        return school_name, True, candidates
+
+def normalize_schools(rows: List[ResultRow]) -> None:
+    """
+    Resolve the raw school names of parsed rows in one batch.
+
+    Collects the distinct raw school strings, scores them all against the
+    school index in a single score matrix, and writes the standardized names
+    and review flags, and the candidates of names left unmatched, back into
+    the rows.
+
+    Args:
+        rows (List[ResultRow]): Parsed rows whose school still holds the raw
+            school name.
+    """
+    # Distinct raw school names, in order of first appearance
+    raw_schools = list(dict.fromkeys(row.school for row in rows))
+    resolutions = norm_cache.NORM_CACHE.resolve_many(SCHOOL_INDEX, raw_schools)
+    resolved = dict(zip(raw_schools, resolutions))
+
+    for row in rows:
+        match, candidates = resolved[row.school]
+
+        # Keep the raw name and flag for review if no close match found
+        if match:
+            row.school = match[0]
+        else:
+            row.review = True
+            row.school_candidates = candidates
+
+def lookup_stats() -> Dict[str, int]:
+    """
+    Return the process-wide normalization counters: cache hits and misses,
+    and how many cache misses the exact-match fast path resolved before
+    falling back to fuzzy matching.
     """
-    # Initialize best match and score variables
-    bset_match = ""
-    best_score = 0
+    cache = norm_cache.NORM_CACHE.stats()
+    indexes = [EVENT_INDEX.stats(), SCHOOL_INDEX.stats()]
+    return {
+        "cache_hits": cache["hits"],
+        "cache_misses": cache["misses"],
+        "cache_disk_hits": cache["disk_hits"],
+        "exact_hits": sum(stats["exact_hits"] for stats in indexes),
+        "fuzzy_lookups": sum(stats["fuzzy_lookups"] for stats in indexes),
+    }
+
+# Output columns
+COLUMNS = [
+    "Meet Date", "Edition", "Meet Name", "Meet Location", "Season", "URL", 
+    "Timing", "Event", "Round", "Gender", "Place", "Last Name", "First Name",
+    "Grade", "School", "Mark", "Heat", "Wind", "Points", "Review"
+]
+
+# Gender words of event headers
+gender_map = {"Girls": "F", "Boys": "M"}
+
+# Define distance events
+distance_events = {"shot put", "discus", "high jump", "long jump", "triple jump", "pole vault", "javelin"}
+
+@contextmanager
+def open_source(source: Union[str, os.PathLike, bytes, IO], encoding: Optional[str] = None) -> Iterator[Iterable[str]]:
+    """
+    Open a results source as an iterable of text lines.
+
+    Files are memory-mapped and, like bytes and binary streams, decoded a
+    block of lines at a time with the declared encoding, or as UTF-8 falling
+    back to Windows-1252 (see byte_lines).
+
+    Args:
+        source: Path to the input text file, the file contents as bytes, or
+            an open text or binary stream.
+        encoding (str): Codec of a byte source, None to detect it.
 
-    for standard_school, alternatives in STANDARD_SCHOOLS.items():
-        # Combine standard school and alternatives for fuzzy matching
-        possible_matches = [standard_school] + alternatives
-        result = process.extractOne(school_name, possible_matches, scorer=fuzz.partial_ratio)
+    Yields:
+        Iterable[str]: The lines of the source, read lazily.
+    """
+    # Path on disk
+    if isinstance(source, (str, os.PathLike)):
+        with byte_lines.open_file_lines(source, encoding) as lines:
+            yield lines
+
+    # Contents already in memory
+    elif isinstance(source, (bytes, bytearray)):
+        yield byte_lines.iter_bytes_lines(bytes(source), encoding)
 
-        # If score is higher than previous best, update with standardized 
-        # school name and score
-        if result[1] > best_score:
-            best_match, best_score = standard_school, result[1]
+    # Binary stream, decoded as it is read
+    elif isinstance(source, io.RawIOBase):
+        yield byte_lines.iter_stream_lines(io.BufferedReader(source), encoding)
+    elif isinstance(source, io.BufferedIOBase):
+        yield byte_lines.iter_stream_lines(source, encoding)
 
-    # At end of loop, return best match if score is above threshold (85)
-    if best_score > 85:
-        return best_match, review_bool
+    # Text stream or any other iterable of lines
     else:
-        # Return original if no close match found
-        return school_name, True
+        yield source
 
-def parse_results(file_path: str, metadata: Dict[str, str]) -> None:
+def iter_results(source: Union[str, os.PathLike, bytes, IO], metadata: Optional[Dict[str, str]] = None,
+                 batch_schools: bool = False, fixed_width: bool = False,
+                 metrics: Optional[ParseMetrics] = None, mark_values: bool = False,
+                 workers: Optional[int] = None, encoding: Optional[str] = None,
+                 athletes: Optional[AthleteIndex] = None, input_format: Optional[str] = None) -> Iterator[ResultRow]:
     """
-    Main function for parsing the track meet results and generate a structured CSV.
-    
+    Parse track meet results, yielding one row per result line.
+
+    Rows are produced as the source is read, so memory stays constant no
+    matter how large the source is. With batch_schools every row is held
+    until school names are resolved in one batch at the end. The metadata
+    is held once and shared by every row, not copied into each.
+
+    When a result cache is configured (RESULT_CACHE_DIR), the source is read
+    whole so its contents can be hashed, and a file parsed before is read
+    back from the cache instead of being parsed again.
+
     Args:
-        file_path (str): Path to the input text file.
+        source: Path to the input text file, the file contents as bytes, or
+            an open text or binary stream.
         metadata (Dict[str, str]): Dictionary of constant metadata to include
             in each row that was inputted on web app upon file upload.
+        batch_schools (bool): Resolve school names in one batch after all
+            lines are parsed instead of one at a time.
+        fixed_width (bool): Cut result lines by the column offsets of each
+            event's header row, falling back to the result pattern for
+            lines that do not fit the layout.
+        metrics (ParseMetrics): Optional stage timers and counters to fill in.
+        mark_values (bool): Add the numeric MARK_COLUMNS (seconds, meters,
+            qualifier and record flags), converted a batch of rows at a time.
+        workers (int): Parse runs of events on this many worker processes
+            (0 for one per CPU) and merge them in file order; None parses
+            in this process. Stage timings are not collected per line.
+        encoding (str): Codec of a file, bytes or binary stream source, None
+            to detect UTF-8 or Windows-1252.
+        athletes (AthleteIndex): Link every row to an athlete ID in this
+            index, committed once the last row is read.
+        input_format (str): Name of a parser in RESULT_FORMATS, None to
+            sniff it from the head of the source.
+
+    Yields:
+        ResultRow: One parsed row, read by output column.
     """
-    
-    # Define output columns
-    columns = [
-        "Meet Date", "Edition", "Meet Name", "Meet Location", "Season", "URL", 
-        "Timing", "Event", "Round", "Gender", "Place", "Last Name", "First Name",
-        "Grade", "School", "Mark", "Heat", "Wind", "Points", "Review"
-    ]
-    
-    rows = []  # Store parsed data
-
-    # Patterns for parsing
-    event_pattern = re.compile(r"Event\s+\d+\s+(Boys|Girls)\s+(.+)")
-    result_pattern = re.compile(
-        r"(\d+)\s+"                              # Place number (integer)
-        r"([\w\-\'\.]+(?:\s[\w\-\'\.]+){0,2})\s+"  # Name (first and last, up to three words)
-        r"(\d+)?\s+"                             # Grade level (optional integer)
-        r"([\w\s\-\'\.]+?)\s+"                   # School (string, non-greedy to stop at "mark")
-        r"((?:\d{1,2}:\d{2}\.\d{2}|\d{1,2}\.\d{2})[q*]?)\s+"  # Mark (##.## or #:##.##, optionally ending in 'q' or '*')
-        r"(\d+)?\s*"                             # Heat (optional integer)
-        r"(\d+\.\d+)?\s*"                        # Optional unrounded times (decimal)
-        r"(\d+)?\s*"                             # Optional wind/points numbers (integer)
-    )
-
-    finals_pattern = re.compile(r"Finals")
-    gender_map = {"Girls": "F", "Boys": "M"}
-    
-    # Define distance events
-    distance_events = {"shot put", "discus", "high jump", "long jump", "triple jump", "pole vault", "javelin"}
+    if metrics:
+        metrics.watch_lookups(lookup_stats())
+
+    # One copy of the metadata for the whole parse
+    metadata = dict(metadata) if metadata else None
+
+    # A file parsed before, with any metadata, is read back from the result
+    # cache without parsing or matching
+    cache = result_cache.RESULT_CACHE
+    if cache is not None:
+        rows = iter_cached_rows(cache, source, batch_schools, fixed_width, metrics, workers, encoding, input_format)
+    else:
+        rows = iter_source_rows(source, batch_schools, fixed_width, metrics, workers, encoding, input_format)
+
+    # Numeric marks are converted a whole column at a time
+    if mark_values:
+        rows = iter_with_marks(rows, metrics=metrics)
+
+    for row in rows:
+        # Share the metadata with each row
+        if metadata:
+            row.meta = metadata
+
+        # Athletes are linked by class year, which needs the meet date
+        if athletes is not None:
+            row.athlete_id = athletes.link_row(row)
+
+        if metrics:
+            metrics.count("rows")
+            if row.review:
+                metrics.count("review")
+
+        yield row
+
+    if athletes is not None:
+        athletes.flush()
+
+def iter_cached_rows(cache: result_cache.ResultCache, source: Union[str, os.PathLike, bytes, IO],
+                     batch_schools: bool = False, fixed_width: bool = False,
+                     metrics: Optional[ParseMetrics] = None, workers: Optional[int] = None,
+                     encoding: Optional[str] = None, input_format: Optional[str] = None) -> Iterator[ResultRow]:
+    """
+    Read a source's rows back from the result cache, or parse them and
+    store them, without holding more than a bounded part of the source.
+
+    Files and bytes are hashed in a streaming pass before they are looked
+    up. Streams can only be read once: up to MAX_BUFFERED_CHARS of one is
+    held so it can be looked up first, and a longer one is hashed as it is
+    parsed and stored under its key once the last row is read.
+
+    Yields:
+        ResultRow: One row as parsed and matched, without metadata.
+    """
+    key = cache.source_key({"batch_schools": batch_schools, "fixed_width": fixed_width,
+                            "input_format": input_format})
+    lines = None
+
+    with open_source(source, encoding) as file:
+        if isinstance(source, (str, os.PathLike, bytes, bytearray)):
+            key.update(file)
+        else:
+            lines = []
+            size = 0
+            file = iter(file)
+            for line in file:
+                lines.append(line)
+                size += len(line)
+
+                # Too long to hold, parsed as it streams and only stored
+                if size > result_cache.MAX_BUFFERED_CHARS:
+                    yield from cache.store(key, iter_source_rows(key.track(chain(lines, file)), batch_schools,
+                                                                 fixed_width, metrics, workers, encoding,
+                                                                 input_format))
+                    return
+            key.update(lines)
+
+    if metrics:
+        metrics.lap("read")
+
+    rows = cache.load(key.hexdigest())
+    if rows is not None:
+        if metrics:
+            metrics.count("result_cache_hits")
+        yield from rows
+        return
+
+    # Files and bytes are read again, held streams from memory
+    yield from cache.store(key.hexdigest(), iter_source_rows(source if lines is None else lines, batch_schools,
+                                                             fixed_width, metrics, workers, encoding, input_format))
+
+def iter_source_rows(source: Union[str, os.PathLike, bytes, IO], batch_schools: bool = False,
+                     fixed_width: bool = False, metrics: Optional[ParseMetrics] = None,
+                     workers: Optional[int] = None, encoding: Optional[str] = None,
+                     input_format: Optional[str] = None) -> Iterator[ResultRow]:
+    """
+    Parse a source in this process, or split at event headers across
+    worker processes when workers is given.
+    """
+    if workers is None:
+        return iter_matched_rows(source, batch_schools, fixed_width, metrics, encoding, input_format)
+
+    from sections import iter_section_rows
+    return iter_section_rows(source, workers or None, batch_schools, fixed_width, encoding=encoding,
+                             input_format=input_format)
+
+def iter_matched_rows(source: Union[str, os.PathLike, bytes, IO], batch_schools: bool = False,
+                      fixed_width: bool = False, metrics: Optional[ParseMetrics] = None,
+                      encoding: Optional[str] = None, input_format: Optional[str] = None) -> Iterator[ResultRow]:
+    """
+    Parse the result lines of a source with their school names resolved,
+    one at a time or in one batch at the end.
+
+    Args:
+        source: Path to the input text file, the file contents as bytes, or
+            an open text or binary stream.
+        batch_schools (bool): Resolve school names in one batch.
+        fixed_width (bool): Cut result lines by header column offsets.
+        metrics (ParseMetrics): Optional stage timers and counters to fill in.
+        encoding (str): Codec of a byte source, None to detect it.
+        input_format (str): Name of a parser in RESULT_FORMATS, None to
+            sniff it.
+
+    Returns:
+        Iterator[ResultRow]: Parsed rows, without metadata.
+    """
+    rows = iter_parsed_rows(source, batch_schools, fixed_width, metrics, encoding=encoding,
+                            input_format=input_format)
+
+    # Batch mode needs every raw school name before it can resolve any
+    if batch_schools:
+        rows = list(rows)
+        normalize_schools(rows)
+        if metrics:
+            metrics.lap("match")
+        rows = iter(rows)
+
+    return rows
+
+def iter_parsed_rows(source: Union[str, os.PathLike, bytes, IO], batch_schools: bool = False,
+                     fixed_width: bool = False, metrics: Optional[ParseMetrics] = None,
+                     initial_round: str = "", first_line: int = 1,
+                     encoding: Optional[str] = None, input_format: Optional[str] = None) -> Iterator[ResultRow]:
+    """
+    Parse the result lines of a source, without meet metadata.
+
+    Args:
+        source: Path to the input text file, the file contents as bytes, or
+            an open text or binary stream.
+        batch_schools (bool): Leave school names raw for a later batch pass.
+        fixed_width (bool): Cut result lines by header column offsets.
+        metrics (ParseMetrics): Optional stage timers and counters to fill in.
+        initial_round (str): Round in effect where the source starts, for a
+            section cut from the middle of a file.
+        first_line (int): Line number of the source's first line in the
+            whole file.
+        encoding (str): Codec of a byte source, None to detect it.
+        input_format (str): Name of a parser in RESULT_FORMATS, None to
+            sniff it from the first SNIFF_CHARS of the source.
+
+    Yields:
+        ResultRow: One parsed row, without metadata.
+    """
+    # Per-row debug logging is decided once, not checked on every line
+    debug = logger.isEnabledFor(logging.DEBUG)
+    intern = sys.intern
 
     # Initialize variables to store current
     current_event = ""
+    current_raw_event = None
+    current_event_candidates = None
     current_gender = ""
-    current_round = ""
+    current_round = initial_round
 
-    try:
-        # Open file for reading
-        with open(file_path, "r") as file:
+    # Column offsets of the current event's header row, in fixed width mode
+    layout = None
 
-            # Iterate through each line in the file
-            for line in file:
-                # Reset review flag
-                review_bool = False
-
-                # Check if line specifies event
-                event_match = event_pattern.search(line)
-
-                # Event detected
-                if event_match:
-
-                    # Extract gender from event line
-                    current_gender = gender_map[event_match.group(1)]
-
-                    # Extract and normalize event name
-                    raw_event_name = event_match.group(2).strip()
-                    current_event, review_bool = normalize_event(raw_event_name, review_bool)
-                    
-                    # Skip parsing if the event is a distance event
-                    if any(event in raw_event_name for event in distance_events):
-                        print(f"Skipping distance event: {current_event}")
-                        current_event = None  # Clear current event for skipped events
-                        continue
-                    
+    # Open source for reading
+    with open_source(source, encoding) as file:
+
+        # One parser for the whole file, chosen from its head
+        if input_format is None:
+            input_format, file = sniff_lines(file)
+        result_format = RESULT_FORMATS[input_format]
+        classify_line = result_format.classify_line
+        match_result = result_format.match_result
+        fixed_width = fixed_width or result_format.fixed_width
+        logger.info("Parsing as %s", result_format.description)
+
+        # Iterate through each line in the file
+        for line_number, line in enumerate(file, first_line):
+            if metrics:
+                metrics.start_line(line_number, line)
+
+            # Reset review flag
+            review_bool = False
+
+            # Decide the line type before running any expensive pattern
+            line_type, event_match = classify_line(line)
+            if metrics:
+                metrics.lap("classify")
+
+            # Event detected
+            if line_type == LINE_EVENT:
+
+                # Each event brings its own header row
+                layout = None
+
+                # Extract gender from event line
+                current_gender = gender_map[event_match.group(1)]
+
+                # Extract and normalize event name
+                raw_event_name = event_match.group(2).strip()
+                current_event, review_bool, current_event_candidates = normalize_event(raw_event_name, review_bool)
+                current_event = intern(current_event)
+                current_raw_event = intern(raw_event_name)
+                if metrics:
+                    metrics.lap("match")
+                    metrics.count("events")
+
+                # Skip parsing if the event is a distance event
+                if any(event in raw_event_name for event in distance_events):
+                    logger.info("Skipping distance event: %s", current_event)
+                    current_event = None  # Clear current event for skipped events
+                    current_raw_event = None
+                    current_event_candidates = None
+                    if metrics:
+                        metrics.count("skipped_events")
                     continue
                 
-                # Detect finals round
-                if finals_pattern.search(line):
-                    current_round = "Final"
+                continue
+            
+            # Read column offsets from the event's header row
+            if fixed_width and ("School" in line or "Team" in line):
+                header_layout = ColumnLayout.from_header(line)
+                if header_layout:
+                    layout = header_layout
+
+            # Detect finals round
+            if line_type == LINE_ROUND:
+                current_round = "Final"
+                continue
+
+            # Cut result lines by position, falling back to the pattern
+            fields = layout.split(line) if layout else None
+            if fields:
+                place, full_name, grade, school, mark, heat, wind, points = (
+                    fields["place"], fields["name"], fields["grade"], fields["school"],
+                    fields["mark"], fields["heat"], fields["wind"], fields["points"]
+                )
+
+            # Nothing else to parse on this line
+            elif line_type != LINE_RESULT:
+                continue
+
+            # Match individual results
+            else:
+                result_match = match_result(line)
+                if not result_match:
+                    if metrics:
+                        metrics.lap("regex")
+                        metrics.count("unmatched_lines")
                     continue
-                
-                # Match individual results
-                result_match = result_pattern.search(line)
-
-                # Result detected
-                if result_match:
-                    # Extract result fields
-                    place, full_name, grade, school, mark, heat, wind, points = result_match.groups()
-
-                    # Parse full name into last and first names
-                    if len(full_name.split()) > 1:
-                        last_name, first_name = parse_name(full_name)
-
-                    print(f"Place: {place}, Name: {full_name}, Grade: {grade}, School: {school}, Mark: {mark}, Heat: {heat}, Wind: {wind}, Points: {points}")
-
-                    # Normalize school name
-                    normalized_school, review_bool = normalize_school(school.strip(), review_bool)
-                    
-                    # Append row to results
-                    rows.append({   
-                        "Event": current_event,
-                        "Round": current_round or "Prelim",
-                        "Gender": current_gender,
-                        "Place": place,
-                        "Last Name": last_name,
-                        "First Name": first_name,
-                        "Grade": grade or "",
-                        "School": normalized_school,
-                        "Mark": mark,
-                        "Heat": heat or "",
-                        "Wind": wind or "",
-                        "Points": points or "",
-                        "Review": review_bool
-                    })
-    except FileNotFoundError:
-        print(f"Error: File {file_path} not found.")
-        sys.exit(1)
 
-    # Add metadata to each row
-    for row in rows:
-        row.update(metadata)
-    
-    # Write output to CSV
-    output_file = "output.csv"
-    with open(output_file, "w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-        writer.writerows(rows)
+                # Extract result fields
+                place, full_name, grade, school, mark, heat, wind, points = result_match.groups()
+
+            # Parse full name into last and first names, single names
+            # are kept whole as the last name
+            if len(full_name.split()) > 1:
+                last_name, first_name = parse_name(full_name)
+            else:
+                last_name, first_name = full_name, ""
+
+            if metrics:
+                metrics.lap("regex")
+            if debug:
+                logger.debug("Line %d: place %s, name %r, grade %s, school %r, mark %s, heat %s, wind %s, points %s",
+                             line_number, place, full_name, grade, school, mark, heat, wind, points)
+
+            # Normalize school name, or leave it raw for the batch pass
+            raw_school = intern(school.strip())
+            if batch_schools:
+                normalized_school, school_candidates = raw_school, None
+            else:
+                normalized_school, review_bool, school_candidates = normalize_school(raw_school, review_bool)
+            if metrics:
+                metrics.lap("match")
+
+            # Repeated short values share one string object across rows
+            yield ResultRow(
+                current_event,
+                current_round or "Prelim",
+                current_gender,
+                intern(place),
+                last_name,
+                first_name,
+                intern(grade) if grade else "",
+                intern(normalized_school),
+                mark,
+                intern(heat) if heat else "",
+                wind or "",
+                intern(points) if points else "",
+                review_bool,
+                current_raw_event,
+                raw_school,
+                current_event_candidates,
+                school_candidates,
+            )
+
+def output_columns(mark_values: bool = False, athlete_ids: bool = False) -> List[str]:
+    """
+    Return the output columns, with the numeric mark and athlete ID columns
+    if requested.
+    """
+    columns = COLUMNS + MARK_COLUMNS if mark_values else COLUMNS
+    return columns + [ATHLETE_COLUMN] if athlete_ids else columns
+
+def write_results(rows: Iterable[ResultRow], sink: Union[str, os.PathLike, IO],
+                  metrics: Optional[ParseMetrics] = None, columns: Optional[List[str]] = None,
+                  output_format: str = "csv") -> int:
+    """
+    Stream rows into a file path or any writable sink.
+
+    Args:
+        rows (Iterable[ResultRow]): Rows to write, consumed lazily.
+        sink: Output file path, or a file-like object with a write method;
+            text for csv and ndjson, binary for parquet and arrow.
+        metrics (ParseMetrics): Optional metrics to charge writing to,
+            finished once the last row is written.
+        columns (List[str]): Output columns, COLUMNS by default.
+        output_format (str): Name of a writer in OUTPUT_FORMATS.
+
+    Returns:
+        int: Number of rows written.
+    """
+    writer = OUTPUT_FORMATS[output_format]
+
+    # Open path sinks here, write straight into file-like sinks
+    if isinstance(sink, (str, os.PathLike)):
+        if writer.binary:
+            with open(sink, "wb") as file:
+                return write_results(rows, file, metrics, columns, output_format)
+        with open(sink, "w", newline="") as file:
+            return write_results(rows, file, metrics, columns, output_format)
+
+    if metrics:
+        rows = metrics.time_rows(rows, "write")
+
+    count = writer.write(rows, sink, columns or COLUMNS)
+
+    if metrics:
+        metrics.finish(lookup_stats())
+
+    return count
+
+def parse_results(source: Union[str, os.PathLike, bytes, IO], metadata: Dict[str, str],
+                  output: Union[str, os.PathLike, IO] = "output.csv", batch_schools: bool = False,
+                  fixed_width: bool = False, metrics: Optional[ParseMetrics] = None,
+                  mark_values: bool = False, output_format: str = "csv", keep_raw: bool = False,
+                  workers: Optional[int] = None, encoding: Optional[str] = None,
+                  athletes: Optional[AthleteIndex] = None, input_format: Optional[str] = None) -> int:
+    """
+    Main function for parsing the track meet results and generate a structured CSV.
     
-    print(f"Processed results saved to {output_file}")
+    Args:
+        source: Path to the input text file, the file contents as bytes, or
+            an open text or binary stream.
+        metadata (Dict[str, str]): Dictionary of constant metadata to include
+            in each row that was inputted on web app upon file upload.
+        output: Output file path, or a file-like object to stream the output
+            into.
+        batch_schools (bool): Resolve school names in one batch after all
+            lines are parsed instead of one at a time.
+        fixed_width (bool): Cut result lines by header column offsets.
+        metrics (ParseMetrics): Optional stage timers and counters to fill in.
+        mark_values (bool): Add numeric seconds/meters and suffix flag columns,
+            always on for the columnar formats.
+        output_format (str): Name of a writer in OUTPUT_FORMATS.
+        keep_raw (bool): Save the raw event and school strings next to an
+            output path, so renormalize.py can apply later alias table
+            changes without parsing the source again.
+        workers (int): Parse runs of events on this many worker processes,
+            0 for one per CPU, None for this process only.
+        encoding (str): Codec of the source, None to detect UTF-8 or
+            Windows-1252.
+        athletes (AthleteIndex): Add an athlete ID column linking each row
+            to this index.
+        input_format (str): Name of a parser in RESULT_FORMATS, None to
+            sniff it from the head of the source.
+
+    Returns:
+        int: Number of rows written.
+    """
+    mark_values = mark_values or OUTPUT_FORMATS[output_format].mark_values
+    rows = iter_results(source, metadata, batch_schools, fixed_width, metrics, mark_values, workers, encoding,
+                        athletes, input_format)
+
+    # Raw fields can only be kept next to an output file
+    recorder = None
+    if keep_raw and isinstance(output, (str, os.PathLike)):
+        from renormalize import RawFieldRecorder
+        recorder = RawFieldRecorder()
+        rows = recorder.track(rows)
+
+    count = write_results(rows, output, metrics, output_columns(mark_values, athletes is not None), output_format)
+    if recorder:
+        recorder.save(output)
+    return count
 
 def parse_name(full_name: str):
     """
@@ -234,12 +646,38 @@ if __name__ == "__main__":
     '''
     Main function to parse the results file.
     '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse a meet results file into a CSV.")
+    parser.add_argument("results_file", help="Results text file to parse")
+    parser.add_argument("output_file", nargs="?",
+                        help="Where to save the output (default: output.csv, or output.<format>, "
+                             "in the current directory)")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="csv",
+                        help="Output format: csv, ndjson, or columnar parquet / arrow (needs pyarrow)")
+    parser.add_argument("--profile", action="store_true", help="Print stage timings, counters and slowest lines")
+    parser.add_argument("--marks", action="store_true",
+                        help="Add numeric Mark Seconds/Mark Meters and Qualifier/Record columns")
+    parser.add_argument("--result-cache", default=result_cache.DEFAULT_CACHE_DIR, metavar="DIR",
+                        help="Reuse the parsed rows of files seen before, cached in this directory")
+    parser.add_argument("--keep-raw", action="store_true",
+                        help="Save raw event/school strings next to the output for renormalize.py")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="Parse runs of events on N worker processes (0: one per CPU), for very large files")
+    parser.add_argument("--encoding", help="Encoding of the results file (default: UTF-8, or Windows-1252 "
+                                           "if it is not valid UTF-8)")
+    parser.add_argument("--input-format", choices=sorted(RESULT_FORMATS),
+                        help="Parser for the results file (default: sniffed from its first few KB)")
+    parser.add_argument("--athlete-db", metavar="PATH",
+                        help="Add an Athlete ID column, linking athletes to this SQLite index across meets")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="Log skipped events (-v) or every parsed line (-vv)")
+    args = parser.parse_args()
+
+    # Quiet by default, -v logs per event and -vv logs every result line
+    logging.basicConfig(level=[logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)],
+                        format="%(levelname)s %(message)s")
 
-    # Check for file path argument
-    if len(sys.argv) < 2:
-        print("Usage: python3 parse_file.py <results_file>")
-        sys.exit(1)
-    
     # Example metadata
     metadata = {
         "Meet Date": "2023-01-01",
@@ -251,5 +689,24 @@ if __name__ == "__main__":
         "Season": "Indoor"
     }
 
+    if not format_available(args.format):
+        parser.error(f"--format {args.format} needs pyarrow installed")
+
+    output_file = args.output_file or "output" + OUTPUT_FORMATS[args.format].extension
+    result_cache.configure_result_cache(args.result_cache)
+    metrics = ParseMetrics() if args.profile else None
+    athletes = AthleteIndex(args.athlete_db) if args.athlete_db else None
+
     # Call main function to parse results
-    parse_results(sys.argv[1], metadata)
+    try:
+        parse_results(args.results_file, metadata, output_file, metrics=metrics, mark_values=args.marks,
+                      output_format=args.format, keep_raw=args.keep_raw, workers=args.workers,
+                      encoding=args.encoding, athletes=athletes, input_format=args.input_format)
+    except FileNotFoundError:
+        print(f"Error: File {args.results_file} not found.")
+        sys.exit(1)
+
+    print(f"Processed results saved to {output_file}")
+
+    if metrics:
+        print(metrics.report())
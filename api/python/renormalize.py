@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+import csv
+import glob
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import norm_cache
+from match_index import ABBREVIATIONS, EVENT_INDEX, SCHOOL_INDEX, MatchIndex, changed_queries
+from rows import ResultRow
+
+# Bump when the raw field file layout changes
+RAW_FORMAT = 2
+
+# Suffix of the raw field file kept next to an output
+RAW_SUFFIX = ".raw.json"
+
+# Directory, next to the outputs, holding every table version they were
+# normalized with
+TABLE_ARCHIVE = "alias_tables"
+
+# Output formats that can be rewritten in place
+TEXT_EXTENSIONS = {".csv", ".ndjson"}
+
+# Old result of raw strings in raw field files that did not record them
+UNRECORDED = object()
+
+def current_indexes() -> Dict[str, MatchIndex]:
+    """
+    Return the indexes outputs are normalized with now, by name.
+    """
+    return {"event": EVENT_INDEX, "school": SCHOOL_INDEX}
+
+def raw_fields_path(output: str) -> str:
+    """
+    Return where the raw fields of an output file are kept.
+    """
+    return os.fspath(output) + RAW_SUFFIX
+
+def archive_tables(directory: str) -> Dict[str, str]:
+    """
+    Save the current event and school indexes next to the outputs, once per
+    table version, so a later table change can be diffed against them.
+
+    Args:
+        directory (str): Directory of the output files.
+
+    Returns:
+        Dict[str, str]: Table versions, by index name.
+    """
+    archive = os.path.join(directory, TABLE_ARCHIVE)
+    os.makedirs(archive, exist_ok=True)
+
+    versions = {}
+    for name, index in current_indexes().items():
+        path = os.path.join(archive, f"{name}-{index.version}.json")
+        if not os.path.exists(path):
+            entry = dict(index.to_snapshot(), abbreviations=ABBREVIATIONS)
+            write_atomic(path, json.dumps(entry))
+        versions[name] = index.version
+
+    return versions
+
+def load_archived_index(directory: str, name: str, version: str) -> Optional[MatchIndex]:
+    """
+    Restore an archived table version.
+
+    Args:
+        directory (str): Directory of the output files.
+        name (str): Index name ("event" or "school").
+        version (str): Table version recorded for an output.
+
+    Returns:
+        MatchIndex: The old index, or None if it was not archived or was
+            canonicalized with different abbreviations than today's.
+    """
+    path = os.path.join(directory, TABLE_ARCHIVE, f"{name}-{version}.json")
+    try:
+        with open(path, "r") as file:
+            entry = json.load(file)
+    except FileNotFoundError:
+        return None
+
+    if entry.get("abbreviations") != ABBREVIATIONS:
+        return None
+    return MatchIndex.from_snapshot(name, entry)
+
+class RawFieldRecorder:
+    """
+    Collects the raw event and school string of every row written to an
+    output, in output order, to save next to it.
+
+    Each distinct string is stored once, with the standardized name it
+    resolved to (None when it was left unmatched), and rows refer to it by
+    position.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, int] = {}
+        self.schools: Dict[str, int] = {}
+        self.event_results: List[Optional[str]] = []
+        self.school_results: List[Optional[str]] = []
+        self.rows: List[List[Optional[int]]] = []
+
+    def track(self, rows: Iterable[ResultRow]) -> Iterator[ResultRow]:
+        """
+        Pass rows through, recording their raw fields.
+        """
+        events, schools = self.events, self.schools
+        for row in rows:
+            event = school = None
+            if row.raw_event is not None:
+                event = events.get(row.raw_event)
+                if event is None:
+                    event = events[row.raw_event] = len(events)
+                    self.event_results.append(None if row.event_candidates is not None else row.event)
+            if row.raw_school is not None:
+                school = schools.get(row.raw_school)
+                if school is None:
+                    school = schools[row.raw_school] = len(schools)
+                    self.school_results.append(None if row.school_candidates is not None else row.school)
+            self.rows.append([event, school])
+            yield row
+
+    def save(self, output: str) -> None:
+        """
+        Write the raw fields next to an output, and archive the tables the
+        output was normalized with.
+
+        Args:
+            output (str): Path of the output file.
+        """
+        versions = archive_tables(os.path.dirname(os.path.abspath(output)))
+        write_atomic(raw_fields_path(output), json.dumps({
+            "format": RAW_FORMAT,
+            "tables": versions,
+            "events": list(self.events),
+            "schools": list(self.schools),
+            "event_results": self.event_results,
+            "school_results": self.school_results,
+            "rows": self.rows,
+        }))
+
+def write_atomic(path: str, text: str) -> None:
+    """
+    Write a file under a temporary name and move it into place.
+    """
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(descriptor, "w", newline="") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+def read_output(path: str) -> List[object]:
+    """
+    Read an output file as a header and rows of cells (CSV) or objects
+    (NDJSON).
+    """
+    with open(path, "r", newline="") as file:
+        if path.endswith(".ndjson"):
+            return [json.loads(line) for line in file if line.strip()]
+        return list(csv.reader(file))
+
+def renormalize_file(output: str, dry_run: bool = False) -> Dict[str, object]:
+    """
+    Bring one output up to date with the current event and school tables.
+
+    Only raw strings that changed_queries() reports as possibly affected by
+    the table change are looked up again, and only rows whose standardized
+    name or review flag changes are rewritten.
+
+    Args:
+        output (str): Output CSV or NDJSON with a raw field file next to it.
+        dry_run (bool): Count the changes without writing them.
+
+    Returns:
+        Dict[str, object]: Report with rows, strings looked up again, rows
+            changed and seconds.
+    """
+    start = time.perf_counter()
+    with open(raw_fields_path(output), "r") as file:
+        raw = json.load(file)
+
+    directory = os.path.dirname(os.path.abspath(output))
+    indexes = current_indexes()
+    report = {"file": output, "rows": len(raw["rows"]), "rechecked": 0, "changed": 0}
+
+    if raw["tables"] == {name: index.version for name, index in indexes.items()}:
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        return report
+
+    ndjson = output.endswith(".ndjson")
+    records = read_output(output)
+    if ndjson:
+        header, body = None, records
+    else:
+        header, body = records[0], records[1:]
+    if len(body) != len(raw["rows"]):
+        raise ValueError(f"{output} has {len(body)} rows but its raw fields have {len(raw['rows'])}")
+
+    # NDJSON records are keyed by column, CSV rows by position
+    columns = {column: column if ndjson else header.index(column) for column in ("Event", "School", "Review")}
+
+    def set_cell(record, column, value) -> bool:
+        if not ndjson and isinstance(value, bool):
+            value = str(value)
+        if record[columns[column]] == value:
+            return False
+        record[columns[column]] = value
+        return True
+
+    updates = {}
+    for name in ("event", "school"):
+        index = indexes[name]
+        strings = raw[name + "s"]
+        old_index = load_archived_index(directory, name, raw["tables"][name])
+
+        # What each raw string resolved to when the output was written;
+        # raw field files from before RAW_FORMAT 2 did not record it, so
+        # every string of those is rewritten with its current result
+        recorded = raw.get(name + "_results") or [UNRECORDED] * len(strings)
+        old_results: Dict[str, object] = dict(zip(strings, recorded))
+
+        if old_index is None or raw["format"] < 2:
+            # No record of the old table or results, so every string is checked
+            recheck = strings
+        elif old_index.version == index.version:
+            recheck = []
+        else:
+            recheck = changed_queries(old_index, index, old_results)
+
+        report["rechecked"] += len(recheck)
+        results = norm_cache.NORM_CACHE.lookup_many(index, recheck) if recheck else []
+        updates[name] = {string: match for string, match in zip(recheck, results)
+                         if (match[0] if match else None) != old_results[string]}
+
+        # The raw fields record the new results for the next table change
+        for string, match in updates[name].items():
+            old_results[string] = match[0] if match else None
+        raw[name + "_results"] = [old_results[string] for string in strings]
+
+    # Rewrite only the rows whose raw strings now resolve differently
+    for record, (event, school) in zip(body, raw["rows"]):
+        changed = False
+        if event is not None and raw["events"][event] in updates["event"]:
+            string = raw["events"][event]
+            match = updates["event"][string]
+            changed |= set_cell(record, "Event", match[0] if match else string)
+        if school is not None and raw["schools"][school] in updates["school"]:
+            string = raw["schools"][school]
+            match = updates["school"][string]
+            changed |= set_cell(record, "School", match[0] if match else string)
+            changed |= set_cell(record, "Review", match is None)
+        report["changed"] += changed
+
+    if not dry_run:
+        if report["changed"]:
+            if ndjson:
+                text = "".join(json.dumps(record) + "\n" for record in body)
+            else:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(records)
+                text = buffer.getvalue()
+            write_atomic(output, text)
+
+        raw["tables"] = archive_tables(directory)
+        raw["format"] = RAW_FORMAT
+        write_atomic(raw_fields_path(output), json.dumps(raw))
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+def find_outputs(inputs: List[str], raw_only: bool = True) -> List[str]:
+    """
+    Expand directories and globs into the CSV and NDJSON outputs, only
+    those with raw fields unless raw_only is False.
+    """
+    outputs = []
+    for entry in inputs:
+        # Directories are searched all the way down, as batch.py mirrors the
+        # input folders under its output directory
+        if os.path.isdir(entry):
+            paths = sorted(os.path.join(folder, name) for folder, _, names in os.walk(entry) for name in names)
+        else:
+            paths = sorted(glob.glob(entry)) or [entry]
+
+        outputs += [path for path in paths if os.path.splitext(path)[1] in TEXT_EXTENSIONS
+                    and (not raw_only or os.path.exists(raw_fields_path(path)))]
+    return outputs
+
+if __name__ == "__main__":
+    '''
+    Apply event and school table changes to outputs parsed with --keep-raw.
+    '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-normalize stored outputs after an alias table change, "
+                                                 "without parsing the results files again.")
+    parser.add_argument("inputs", nargs="+", help="Output CSV/NDJSON files, directories or globs")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    outputs = find_outputs(args.inputs)
+    if not outputs:
+        print("Error: no outputs with raw fields found (parse with --keep-raw)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    totals = {"rows": 0, "rechecked": 0, "changed": 0}
+    for output in outputs:
+        report = renormalize_file(output, args.dry_run)
+        for name in totals:
+            totals[name] += report[name]
+        print(f"{report['file']}: {report['changed']} of {report['rows']} rows changed, "
+              f"{report['rechecked']} strings rechecked, {report['seconds']:.3f}s")
+
+    print(f"{len(outputs)} files, {totals['changed']} of {totals['rows']} rows changed, "
+          f"{totals['rechecked']} strings rechecked in {time.perf_counter() - start:.3f}s")
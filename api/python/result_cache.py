@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import operator
+import os
+import sys
+import tempfile
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from match_index import EVENT_INDEX, SCHOOL_INDEX, TABLE_DIR
+from rows import ResultRow
+
+# Defaults can be overridden per deployment through the environment; the
+# cache is off unless a directory is given
+DEFAULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR") or None
+DEFAULT_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Largest stream, in characters, held in memory so it can be looked up
+# before it is parsed; larger streams are hashed as they are parsed and
+# only stored
+MAX_BUFFERED_CHARS = int(os.environ.get("RESULT_CACHE_MAX_BUFFERED_CHARS", 16 * 1024 * 1024))
+
+# Bump when the stored row layout changes
+CACHE_FORMAT = 3
+
+# Modules whose code decides what rows a file parses into: decoding, line
+# parsing, matching (the table versions only cover the tables and scorer)
+# and mark conversion
+PARSER_MODULES = ("byte_lines", "parse_file", "columns", "formats", "match_index", "norm_cache", "rows", "marks")
+
+# Rows serialized together, one JSON array per line of the entry
+CACHE_BATCH_ROWS = 4096
+
+# Parsed row fields stored in an entry, in ResultRow argument order
+STORED_FIELDS = ("event", "round", "gender", "place", "last_name", "first_name", "grade", "school", "mark",
+                 "heat", "wind", "points", "review", "raw_event", "raw_school", "event_candidates",
+                 "school_candidates")
+
+class FileCacheBackend:
+    """
+    Cache entries as files in a local directory, evicting the least recently
+    used once the directory grows past a size limit.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory (str): Directory for the entries, created if needed.
+            max_bytes (int): Total size the entries are kept under.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".rows")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read an entry, marking it recently used.
+
+        Returns:
+            bytes: The entry, or None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+
+        # Modification time doubles as last use, for eviction
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Write an entry, then evict old entries if the cache is too big.
+        """
+        # Written under a temporary name so readers never see half an entry
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporary, self._path(key))
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used entries until the cache fits.
+
+        Returns:
+            int: Number of entries deleted.
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".rows"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+
+        return evicted
+
+class SourceKey:
+    """
+    A cache key built up a line at a time, so a source is hashed as it is
+    read instead of being held whole.
+    """
+
+    def __init__(self, prefix: bytes):
+        self._digest = hashlib.sha256(prefix)
+
+    def update(self, lines: Iterable[str]) -> None:
+        """
+        Hash lines of the source, with their line endings normalized.
+        """
+        for line in lines:
+            self._digest.update(normalize_text(line).encode("utf-8", errors="surrogatepass"))
+
+    def track(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Pass lines through, hashing each as it goes by.
+        """
+        update = self._digest.update
+        for line in lines:
+            update(normalize_text(line).encode("utf-8", errors="surrogatepass"))
+            yield line
+
+    def hexdigest(self) -> str:
+        """
+        Return the key of the lines hashed so far.
+        """
+        return self._digest.hexdigest()
+
+class ResultCache:
+    """
+    Parsed rows of whole results files, keyed by content.
+
+    The key hashes the file text with its line endings normalized, the
+    event and school table versions, the parser code and the parse options,
+    so the same file uploaded twice, by anyone and with any metadata, is
+    parsed once. Entries hold rows as parsed and matched, before the mark
+    columns and metadata are added.
+    """
+
+    def __init__(self, backend: FileCacheBackend):
+        """
+        Args:
+            backend (FileCacheBackend): Where entries are kept.
+        """
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._parser_digest = parser_digest()
+
+    def source_key(self, options: Dict[str, bool]) -> SourceKey:
+        """
+        Start the cache key of a file parsed with the given options; the
+        file's lines are added to it as they are read.
+
+        Args:
+            options (Dict[str, bool]): Parser options that affect the rows.
+
+        Returns:
+            SourceKey: Key without any of the file hashed yet.
+        """
+        return SourceKey(json.dumps([CACHE_FORMAT, self._parser_digest, EVENT_INDEX.version, SCHOOL_INDEX.version,
+                                     sorted(options.items())]).encode())
+
+    def key(self, text: str, options: Dict[str, bool]) -> str:
+        """
+        Return the cache key of a file's whole text parsed with the given
+        options, the same key source_key() builds line by line.
+
+        Returns:
+            str: Hex digest naming the entry.
+        """
+        key = self.source_key(options)
+        key.update([text])
+        return key.hexdigest()
+
+    def load(self, key: str) -> Optional[Iterator[ResultRow]]:
+        """
+        Return the cached rows for a key.
+
+        Returns:
+            Iterator[ResultRow]: Fresh rows, or None on a miss.
+        """
+        data = self.backend.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return iter_stored_rows(zlib.decompress(data))
+
+    def store(self, key: Union[str, SourceKey], rows: Iterable[ResultRow]) -> Iterator[ResultRow]:
+        """
+        Pass rows through, storing them under a key once the last row has
+        been read. Nothing is stored if the rows are not read to the end.
+
+        Args:
+            key: Key from key(), or a SourceKey still hashing the source as
+                the rows are parsed, read once the last row is.
+            rows (Iterable[ResultRow]): Parsed rows, before marks and
+                metadata are added.
+
+        Yields:
+            ResultRow: Each row, unchanged.
+        """
+        fields = operator.attrgetter(*STORED_FIELDS)
+        compressor = zlib.compressobj(1)
+        chunks = []
+        batch = []
+
+        for row in rows:
+            batch.append(fields(row))
+            if len(batch) == CACHE_BATCH_ROWS:
+                chunks.append(compressor.compress(json.dumps(batch).encode() + b"\n"))
+                batch = []
+            yield row
+
+        if batch:
+            chunks.append(compressor.compress(json.dumps(batch).encode() + b"\n"))
+        chunks.append(compressor.flush())
+        self.backend.put(key if isinstance(key, str) else key.hexdigest(), b"".join(chunks))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit and miss counters.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+def iter_stored_rows(data: bytes) -> Iterator[ResultRow]:
+    """
+    Rebuild rows from a decompressed cache entry.
+    """
+    intern = sys.intern
+    for line in data.splitlines():
+        for (event, round_name, gender, place, last_name, first_name, grade, school, mark, heat, wind, points,
+             review, raw_event, raw_school, event_candidates, school_candidates) in json.loads(line):
+            # Repeated values share one string object, as in a fresh parse
+            yield ResultRow(
+                intern(event) if event else event,
+                intern(round_name),
+                intern(gender),
+                intern(place),
+                last_name,
+                first_name,
+                intern(grade),
+                intern(school),
+                mark,
+                intern(heat),
+                wind,
+                intern(points),
+                review,
+                intern(raw_event) if raw_event else raw_event,
+                intern(raw_school),
+                stored_candidates(event_candidates),
+                stored_candidates(school_candidates),
+            )
+
+def stored_candidates(candidates: Optional[list]) -> Optional[list]:
+    """
+    Turn stored [name, score] pairs back into the tuples a parse returns.
+    """
+    return None if candidates is None else [tuple(candidate) for candidate in candidates]
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize line endings, which do not change how a file parses, so the
+    same file saved on Windows or Unix has the same key.
+    """
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def parser_digest() -> str:
+    """
+    Hash the parser source, so rows cached by an older parser are never used.
+    """
+    digest = hashlib.sha1()
+    for module_name in PARSER_MODULES:
+        with open(os.path.join(TABLE_DIR, module_name + ".py"), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+# Process-wide result cache, off unless configured
+RESULT_CACHE: Optional[ResultCache] = (
+    ResultCache(FileCacheBackend(DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES)) if DEFAULT_CACHE_DIR else None
+)
+
+def configure_result_cache(directory: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[ResultCache]:
+    """
+    Replace the process-wide result cache.
+
+    Args:
+        directory (str): Cache directory, or None to turn the cache off.
+        max_bytes (int): Total size the entries are kept under.
+
+    Returns:
+        ResultCache: The new cache, or None when turned off.
+    """
+    global RESULT_CACHE
+    RESULT_CACHE = ResultCache(FileCacheBackend(directory, max_bytes)) if directory else None
+    return RESULT_CACHE
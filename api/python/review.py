@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from rows import ResultRow
+
+class ReviewSummary:
+    """
+    Collects the distinct raw event and school strings a parse left
+    unmatched, with the output rows holding each, so a reviewer fixes every
+    bad string once instead of row by row.
+
+    A string is unmatched when its row carries candidates for it, which the
+    lookup that left it unmatched set in the same pass as the review flag,
+    so nothing is looked up again here.
+    """
+
+    def __init__(self):
+        self.rows: Dict[Tuple[str, str], List[int]] = {}
+        self.candidates: Dict[Tuple[str, str], Sequence[Tuple[str, float]]] = {}
+
+    def track(self, rows: Iterable[ResultRow]) -> Iterator[ResultRow]:
+        """
+        Pass rows through, recording the unmatched strings of each.
+        """
+        for position, row in enumerate(rows):
+            if row.school_candidates is not None:
+                self._record(("school", row.raw_school or row.school), position, row.school_candidates)
+            if row.event_candidates is not None:
+                self._record(("event", row.raw_event or row.event), position, row.event_candidates)
+            yield row
+
+    def _record(self, key: Tuple[str, str], position: int, candidates: Sequence[Tuple[str, float]]) -> None:
+        positions = self.rows.get(key)
+        if positions is None:
+            positions = self.rows[key] = []
+            self.candidates[key] = candidates
+        positions.append(position)
+
+    def unresolved(self) -> List[Dict[str, object]]:
+        """
+        Return one entry per unmatched string, most rows first.
+
+        Returns:
+            List[Dict[str, object]]: "kind" ("event" or "school"), "raw"
+                string, row "count", 0-based output "rows", and "candidates"
+                as {"name", "score"} objects, best first.
+        """
+        entries = []
+        for (kind, raw), rows in self.rows.items():
+            entries.append({
+                "kind": kind,
+                "raw": raw,
+                "count": len(rows),
+                "rows": rows,
+                "candidates": [{"name": name, "score": round(score, 1)}
+                               for name, score in self.candidates[(kind, raw)]],
+            })
+
+        entries.sort(key=lambda entry: -entry["count"])
+        return entries
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Attribute holding each per-athlete output column, in parse order; the
+# trailing mark and athlete ID columns are only set once their stages have
+# run
+FIELD_SLOTS = {
+    "Event": "event",
+    "Round": "round",
+    "Gender": "gender",
+    "Place": "place",
+    "Last Name": "last_name",
+    "First Name": "first_name",
+    "Grade": "grade",
+    "School": "school",
+    "Mark": "mark",
+    "Heat": "heat",
+    "Wind": "wind",
+    "Points": "points",
+    "Review": "review",
+    "Mark Seconds": "mark_seconds",
+    "Mark Meters": "mark_meters",
+    "Qualifier": "qualifier",
+    "Record": "record",
+    "Athlete ID": "athlete_id",
+}
+
+# Metadata of rows parsed without any
+NO_METADATA = MappingProxyType({})
+
+class ResultRow(Mapping):
+    """
+    One parsed result, read like a read-only dict keyed by output column.
+
+    The per-athlete fields live in slots rather than a per-row dict, and the
+    meet metadata is a reference to a single mapping shared by every row of
+    the parse, joined in only when the row is serialized. Columns that are
+    neither fields nor metadata are missing, as with a dict.
+
+    The raw event and school strings the standardized names were matched
+    from are kept too, but are not output columns, as are the closest
+    standardized names of an event or school left unmatched: (name, score)
+    pairs from the lookup that flagged it, None when it matched.
+    """
+    __slots__ = tuple(FIELD_SLOTS.values()) + ("meta", "raw_event", "raw_school", "event_candidates",
+                                               "school_candidates")
+
+    def __init__(self, event: str, round: str, gender: str, place: str, last_name: str, first_name: str,
+                 grade: str, school: str, mark: str, heat: str, wind: str, points: str, review: bool,
+                 raw_event: Optional[str] = None, raw_school: Optional[str] = None,
+                 event_candidates: Optional[Sequence[Tuple[str, float]]] = None,
+                 school_candidates: Optional[Sequence[Tuple[str, float]]] = None):
+        self.event = event
+        self.round = round
+        self.gender = gender
+        self.place = place
+        self.last_name = last_name
+        self.first_name = first_name
+        self.grade = grade
+        self.school = school
+        self.mark = mark
+        self.heat = heat
+        self.wind = wind
+        self.points = points
+        self.review = review
+        self.meta = NO_METADATA
+        self.raw_event = raw_event
+        self.raw_school = raw_school
+        self.event_candidates = event_candidates
+        self.school_candidates = school_candidates
+
+    def __getitem__(self, column: str) -> object:
+        slot = FIELD_SLOTS.get(column)
+        if slot is None:
+            return self.meta[column]
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            raise KeyError(column) from None
+
+    def __setitem__(self, column: str, value: object) -> None:
+        # Metadata is shared by every row, so only fields can be set
+        slot = FIELD_SLOTS.get(column)
+        if slot is None:
+            raise KeyError(column)
+        setattr(self, slot, value)
+
+    def __iter__(self) -> Iterator[str]:
+        for column, slot in FIELD_SLOTS.items():
+            if hasattr(self, slot):
+                yield column
+        yield from (column for column in self.meta if column not in FIELD_SLOTS)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ResultRow({dict(self)!r})"
+
+    def cells(self, columns: List[str]) -> List[object]:
+        """
+        Return the values of the output columns, in order, with "" for
+        missing columns.
+
+        Args:
+            columns (List[str]): Output columns.
+
+        Returns:
+            List[object]: One value per column, ready for a writer.
+        """
+        meta = self.meta
+        return [
+            getattr(self, FIELD_SLOTS[column], "") if column in FIELD_SLOTS else meta.get(column, "")
+            for column in columns
+        ]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+import operator
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterator, List, Optional, Tuple, Union
+
+import norm_cache
+from formats import DEFAULT_FORMAT, LINE_EVENT, RESULT_FORMATS, sniff_lines
+from match_index import EVENT_INDEX, SCHOOL_INDEX
+from parse_file import iter_matched_rows, iter_parsed_rows, normalize_schools, open_source
+from result_cache import STORED_FIELDS
+from rows import ResultRow
+
+# Fewest lines handed to a worker at once; smaller files are parsed in
+# process, since starting the pool would cost more than it saves
+MIN_CHUNK_LINES = int(os.environ.get("PARSE_MIN_CHUNK_LINES", 20000))
+
+# Chunks per worker, so a few long events do not leave the other workers idle
+CHUNKS_PER_WORKER = 4
+
+# A run of whole events: its lines, first line number and the round in
+# effect where it starts
+Chunk = Tuple[List[str], int, str]
+
+def split_sections(lines: List[str], chunk_lines: int, input_format: str = DEFAULT_FORMAT) -> List[Chunk]:
+    """
+    Cut a file at event headers into chunks of whole events.
+
+    The round is the only parser state that carries over an event header
+    (every "Finals" line sets it for the rest of the file), so it is tracked
+    here and handed to each chunk; the event, gender and column layout are
+    reset by the header the chunk starts with.
+
+    Args:
+        lines (List[str]): Lines of the file, as the serial parser reads them.
+        chunk_lines (int): Lines to gather into a chunk before cutting at
+            the next event header.
+        input_format (str): Name of the file's parser in RESULT_FORMATS.
+
+    Returns:
+        List[Chunk]: Chunks covering every line, in file order.
+    """
+    classify_line = RESULT_FORMATS[input_format].classify_line
+    chunks = []
+    start = 0
+    start_round = ""
+    current_round = ""
+
+    for line_number, line in enumerate(lines):
+        # Only lines holding either word can change the state
+        if "Event" not in line and "Finals" not in line:
+            continue
+
+        line_type, _ = classify_line(line)
+        if line_type == LINE_EVENT:
+            if line_number - start >= chunk_lines:
+                chunks.append((lines[start:line_number], start + 1, start_round))
+                start, start_round = line_number, current_round
+        elif "Finals" in line:
+            current_round = "Final"
+
+    chunks.append((lines[start:], start + 1, start_round))
+    return chunks
+
+def init_worker(cache_size: int, cache_db: Optional[str]) -> None:
+    """
+    Prepare a section worker: the alias indexes come from the parent, and
+    the scorers and blocking index are loaded before the first chunk.
+    """
+    norm_cache.configure_cache(cache_size, cache_db)
+    EVENT_INDEX.scorer
+    SCHOOL_INDEX.scorer
+    SCHOOL_INDEX.blocker
+
+def parse_chunk(lines: List[str], first_line: int, initial_round: str, batch_schools: bool,
+                fixed_width: bool, input_format: str) -> List[tuple]:
+    """
+    Parse one chunk inside a worker.
+
+    Returns:
+        List[tuple]: Row fields in ResultRow argument order, which pickle
+            back to the parent much faster than the rows themselves.
+    """
+    rows = list(iter_parsed_rows(lines, batch_schools, fixed_width, initial_round=initial_round,
+                                 first_line=first_line, input_format=input_format))
+    if batch_schools:
+        normalize_schools(rows)
+
+    fields = operator.attrgetter(*STORED_FIELDS)
+    return [fields(row) for row in rows]
+
+def iter_section_rows(source: Union[str, os.PathLike, bytes, IO], workers: Optional[int] = None,
+                      batch_schools: bool = False, fixed_width: bool = False,
+                      cache_size: int = norm_cache.DEFAULT_CACHE_SIZE,
+                      cache_db: Optional[str] = norm_cache.DEFAULT_CACHE_DB,
+                      encoding: Optional[str] = None, input_format: Optional[str] = None) -> Iterator[ResultRow]:
+    """
+    Parse one large results file on several cores, one run of events per
+    worker, yielding the same rows in the same order as iter_matched_rows.
+
+    Args:
+        source: Path to the input text file, the file contents as bytes, or
+            an open text or binary stream.
+        workers (int): Worker processes, defaults to CPU count.
+        batch_schools (bool): Resolve each chunk's school names in one batch.
+        fixed_width (bool): Cut result lines by header column offsets.
+        cache_size (int): In-process normalization cache size per worker.
+        cache_db (str): Optional SQLite normalization cache shared by workers.
+        encoding (str): Codec of a byte source, None to detect it.
+        input_format (str): Name of a parser in RESULT_FORMATS, None to
+            sniff it.
+
+    Yields:
+        ResultRow: One parsed row, without metadata.
+    """
+    # Lines are split exactly as the serial parser splits them
+    with open_source(source, encoding) as file:
+        lines = list(file)
+
+    # The format is sniffed from the head of the file, not of each chunk
+    if input_format is None:
+        input_format, _ = sniff_lines(lines)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = split_sections(lines, max(MIN_CHUNK_LINES, len(lines) // (workers * CHUNKS_PER_WORKER)), input_format)
+
+    if len(chunks) == 1 or workers == 1:
+        yield from iter_matched_rows(lines, batch_schools, fixed_width, input_format=input_format)
+        return
+    del lines
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=init_worker,
+                             initargs=(cache_size, cache_db)) as executor:
+        results = executor.map(parse_chunk, *zip(*chunks), [batch_schools] * len(chunks),
+                               [fixed_width] * len(chunks), [input_format] * len(chunks))
+
+        # Chunks come back in file order
+        for rows in results:
+            for fields in rows:
+                yield ResultRow(*fields)
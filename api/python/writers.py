@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+import csv
+import json
+from typing import IO, Callable, Iterable, Iterator, List, NamedTuple
+
+from rows import ResultRow
+
+# Rows gathered into each Arrow record batch (and Parquet row group)
+BATCH_ROWS = 65_536
+
+# Columns stored dictionary-encoded: the meet metadata is the same on every
+# row of a meet, and events, rounds, genders and schools repeat constantly
+DICTIONARY_COLUMNS = {
+    "Meet Date", "Edition", "Meet Name", "Meet Location", "Season", "URL", "Timing",
+    "Event", "Round", "Gender", "School",
+}
+
+# Typed columns, as Arrow type names; anything else is a plain string
+TYPED_COLUMNS = {
+    "Place": "int32",
+    "Grade": "int16",
+    "Heat": "int16",
+    "Wind": "float64",
+    "Points": "float64",
+    "Review": "bool",
+    "Mark Seconds": "float64",
+    "Mark Meters": "float64",
+    "Qualifier": "bool",
+    "Record": "bool",
+    "Athlete ID": "int64",
+}
+
+def write_csv(rows: Iterable[ResultRow], sink: IO, columns: List[str]) -> int:
+    """
+    Write rows as CSV with a header row.
+
+    Args:
+        rows (Iterable[ResultRow]): Rows to write, consumed lazily.
+        sink (IO): Text sink.
+        columns (List[str]): Output columns, in order.
+
+    Returns:
+        int: Number of rows written.
+    """
+    writer = csv.writer(sink)
+    writer.writerow(columns)
+
+    count = 0
+    for row in rows:
+        writer.writerow(row.cells(columns))
+        count += 1
+
+    return count
+
+def write_ndjson(rows: Iterable[ResultRow], sink: IO, columns: List[str]) -> int:
+    """
+    Write rows as newline-delimited JSON, one object per row.
+
+    Args:
+        rows (Iterable[ResultRow]): Rows to write, consumed lazily.
+        sink (IO): Text sink.
+        columns (List[str]): Output columns, in order.
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    for row in rows:
+        sink.write(json.dumps(dict(zip(columns, row.cells(columns)))) + "\n")
+        count += 1
+
+    return count
+
+def arrow_schema(columns: List[str]):
+    """
+    Build the Arrow schema for the output columns.
+
+    Args:
+        columns (List[str]): Output columns, in order.
+
+    Returns:
+        pyarrow.Schema: Dictionary-encoded strings for repeated values, typed
+            numbers and flags, plain strings for the rest.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for column in columns:
+        if column in DICTIONARY_COLUMNS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        elif column in TYPED_COLUMNS:
+            fields.append(pa.field(column, pa.type_for_alias(TYPED_COLUMNS[column])))
+        else:
+            fields.append(pa.field(column, pa.string()))
+
+    return pa.schema(fields)
+
+def record_batches(rows: Iterable[ResultRow], columns: List[str], schema) -> Iterator[object]:
+    """
+    Gather rows into Arrow record batches of BATCH_ROWS rows.
+
+    Values are collected per column and converted by Arrow compute kernels,
+    so numbers are parsed a column at a time. Values that do not parse as
+    their column type (e.g. a "SR" grade) or do not fit it are stored as
+    nulls.
+
+    Args:
+        rows (Iterable[ResultRow]): Rows to convert, consumed lazily.
+        columns (List[str]): Output columns, in order.
+        schema (pyarrow.Schema): Schema from arrow_schema().
+
+    Yields:
+        pyarrow.RecordBatch: The next batch of rows.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def convert(values: List[object], field) -> object:
+        # Blank values are nulls in every column
+        if pa.types.is_dictionary(field.type):
+            return pa.array([value or None for value in values], pa.string()).dictionary_encode()
+        if pa.types.is_boolean(field.type):
+            return pa.array([None if value == "" else bool(value) for value in values], pa.bool_())
+
+        text = pa.array([None if value is None else str(value) for value in values], pa.string())
+        if pa.types.is_string(field.type):
+            return text
+
+        # Numbers parsed from text, anything unparseable is null
+        text = pc.utf8_trim_whitespace(text)
+        if not pa.types.is_integer(field.type):
+            valid = pc.match_substring_regex(text, r"^[+-]?(\d+\.?\d*|\.\d+)$")
+            return pc.if_else(valid, text, pa.scalar(None, pa.string())).cast(field.type)
+
+        # Integers are read as int64, which any 18 digits fit, and values
+        # out of the column type's range (a "2025" class year under Grade)
+        # are null
+        valid = pc.and_(pc.utf8_is_digit(text), pc.less_equal(pc.utf8_length(text), 18))
+        numbers = pc.if_else(valid, text, pa.scalar(None, pa.string())).cast(pa.int64())
+        in_range = pc.less_equal(numbers, 2 ** (field.type.bit_width - 1) - 1)
+        return pc.if_else(in_range, numbers, pa.scalar(None, pa.int64())).cast(field.type)
+
+    batch: List[List[object]] = []
+
+    def flush():
+        # Rows of cells transposed into one list per column
+        arrays = [convert(list(values), field) for values, field in zip(zip(*batch), schema)]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    for row in rows:
+        batch.append(row.cells(columns))
+
+        if len(batch) == BATCH_ROWS:
+            yield flush()
+            batch = []
+
+    if batch:
+        yield flush()
+
+def write_parquet(rows: Iterable[ResultRow], sink: IO, columns: List[str]) -> int:
+    """
+    Write rows as a Parquet file, one row group per record batch.
+
+    Args:
+        rows (Iterable[ResultRow]): Rows to write, consumed lazily.
+        sink (IO): Binary sink; it does not need to be seekable.
+        columns (List[str]): Output columns, in order.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(columns)
+    count = 0
+
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in record_batches(rows, columns, schema):
+            writer.write_batch(batch)
+            count += batch.num_rows
+
+    return count
+
+def write_arrow(rows: Iterable[ResultRow], sink: IO, columns: List[str]) -> int:
+    """
+    Write rows as a zstd-compressed Arrow IPC stream.
+
+    Args:
+        rows (Iterable[ResultRow]): Rows to write, consumed lazily.
+        sink (IO): Binary sink; it does not need to be seekable.
+        columns (List[str]): Output columns, in order.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pyarrow as pa
+
+    schema = arrow_schema(columns)
+    count = 0
+
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, schema, options=options) as writer:
+        for batch in record_batches(rows, columns, schema):
+            writer.write_batch(batch)
+            count += batch.num_rows
+
+    return count
+
+class OutputFormat(NamedTuple):
+    """
+    A pluggable output writer and how to serve what it writes.
+    """
+    write: Callable[[Iterable[ResultRow], IO, List[str]], int]
+    extension: str
+    content_type: str
+    binary: bool
+    # Columnar formats carry the typed mark columns as well as the raw mark
+    mark_values: bool
+
+# Output writers by name, as selected from the CLI and HTTP endpoint
+OUTPUT_FORMATS = {
+    "csv": OutputFormat(write_csv, ".csv", "text/csv", False, False),
+    "ndjson": OutputFormat(write_ndjson, ".ndjson", "application/x-ndjson", False, False),
+    "parquet": OutputFormat(write_parquet, ".parquet", "application/vnd.apache.parquet", True, True),
+    "arrow": OutputFormat(write_arrow, ".arrows", "application/vnd.apache.arrow.stream", True, True),
+}
+
+def format_available(output_format: str) -> bool:
+    """
+    Check that the optional dependencies of an output format are installed.
+
+    Args:
+        output_format (str): Name of a writer in OUTPUT_FORMATS.
+
+    Returns:
+        bool: False for the columnar formats when pyarrow is missing.
+    """
+    if not OUTPUT_FORMATS[output_format].binary:
+        return True
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
+from athletes import AthleteIndex
+from bench_blocking import SYLLABLES
+from generate_meet import FIRST_NAMES
+from standard_schools import STANDARD_SCHOOLS
+
+# Default season sizes, in athletes
+DEFAULT_SIZES = [2_000, 20_000, 100_000]
+
+# Fraction of appearances with a garbled last name, a shortened first name
+# or a blank grade
+TYPO_RATE = 0.05
+SHORT_FIRST_RATE = 0.03
+BLANK_GRADE_RATE = 0.3
+
+def garble(name: str, rng: random.Random) -> str:
+    """
+    Drop or swap a letter of a name, as results files sometimes do.
+    """
+    if len(name) < 4:
+        return name
+    index = rng.randrange(1, len(name) - 2)
+    if rng.random() < 0.5:
+        return name[:index] + name[index + 1:]
+    return name[:index] + name[index + 1] + name[index] + name[index + 2:]
+
+def season(athletes: int, meets: int, seed: int) -> List[Tuple[int, Tuple[str, ...]]]:
+    """
+    Draw a season of result rows: every athlete enters a few meets, with
+    the kinds of differences results files have between meets.
+
+    Returns:
+        List[tuple]: (true athlete, fields for AthleteIndex.link) per row.
+    """
+    rng = random.Random(seed)
+    schools = list(STANDARD_SCHOOLS)
+    roster = []
+    for _ in range(athletes):
+        last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        roster.append((rng.choice(schools), last, rng.choice(FIRST_NAMES), rng.choice("MF"), rng.randint(9, 12)))
+
+    rows = []
+    for meet in range(meets):
+        meet_date = f"2024-{1 + meet * 3 // meets:02d}-{1 + meet % 28:02d}"
+        for athlete in rng.sample(range(athletes), athletes * 3 // meets):
+            school, last, first, gender, grade = roster[athlete]
+            if rng.random() < TYPO_RATE:
+                last = garble(last, rng)
+            if rng.random() < SHORT_FIRST_RATE:
+                first = first[:3]
+            grade = "" if rng.random() < BLANK_GRADE_RATE else str(grade)
+            rows.append((athlete, (school, last, first, gender, grade, meet_date)))
+    return rows
+
+def pair_scores(truth: List[int], found: List[object]) -> Tuple[float, float]:
+    """
+    Pairwise precision and recall of the linked IDs against the true
+    athletes, over every pair of rows.
+    """
+    def pairs(counts: Counter) -> int:
+        return sum(count * (count - 1) // 2 for count in counts.values())
+
+    both = pairs(Counter(zip(truth, found)))
+    return both / (pairs(Counter(found)) or 1), both / (pairs(Counter(truth)) or 1)
+
+def run(athletes: int, meets: int, seed: int) -> Dict[str, float]:
+    """
+    Link one synthetic season into a fresh in-memory index.
+    """
+    rows = season(athletes, meets, seed)
+    index = AthleteIndex()
+
+    start = time.perf_counter()
+    found = [index.link(*fields) for _, fields in rows]
+    seconds = time.perf_counter() - start
+
+    distinct = len({fields for _, fields in rows})
+    precision, recall = pair_scores([athlete for athlete, _ in rows], found)
+    return {
+        "athletes": athletes,
+        "rows": len(rows),
+        "seconds": seconds,
+        "compared": index.compared,
+        "all_pairs": distinct * (distinct - 1) // 2,
+        "found": index.stats()["athletes"],
+        "precision": precision,
+        "recall": recall,
+    }
+
+if __name__ == "__main__":
+    '''
+    Measure athlete linking over synthetic seasons: time, name comparisons
+    against an all-pairs comparison, and pairwise precision and recall.
+    '''
+
+    parser = argparse.ArgumentParser(description="Benchmark blocked athlete linking across meets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Athletes per season")
+    parser.add_argument("--meets", type=int, default=12, help="Meets per season")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    print(f"{'athletes':>9} {'rows':>8} {'seconds':>8} {'compared':>10} {'all pairs':>14} {'found':>8} "
+          f"{'precision':>10} {'recall':>8}")
+    for size in args.sizes:
+        result = run(size, args.meets, args.seed)
+        print(f"{result['athletes']:>9} {result['rows']:>8} {result['seconds']:>8.2f} {result['compared']:>10} "
+              f"{result['all_pairs']:>14} {result['found']:>8} {result['precision']:>10.4f} "
+              f"{result['recall']:>8.4f}")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
+from generate_meet import misspell
+from match_index import MatchIndex, TrigramBlocker
+from standard_schools import STANDARD_SCHOOLS
+
+# Default table sizes, in standardized school names
+DEFAULT_SIZES = [1_000, 10_000, 50_000]
+
+# Pieces of synthetic town names and the school types appended to them
+SYLLABLES = ["ash", "bel", "brook", "bur", "carl", "ches", "dal", "den", "east", "field", "ford", "glen", "ham",
+             "har", "hill", "ing", "ken", "lake", "land", "ley", "lin", "mar", "mead", "mont", "new", "north",
+             "ock", "ox", "port", "ridge", "rock", "sal", "shel", "south", "stan", "ton", "vale", "ville", "wal",
+             "well", "west", "wick", "win", "wood", "york"]
+SCHOOL_TYPES = ["", "", "", " Regional", " Academy", " Catholic", " Christian", " Charter", " Tech", " Prep",
+                " Central", " Memorial"]
+
+def school_table(size: int, seed: int) -> Dict[str, List[str]]:
+    """
+    Build a school table of the given size: the real table, then synthetic
+    schools with the kinds of alternatives the real one has.
+
+    Args:
+        size (int): Number of standardized names.
+        seed (int): Random seed.
+
+    Returns:
+        Dict[str, List[str]]: Standardized names and their alternatives.
+    """
+    rng = random.Random(seed)
+    table = dict(list(STANDARD_SCHOOLS.items())[:size])
+
+    while len(table) < size:
+        town = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        name = town + rng.choice(SCHOOL_TYPES)
+        if name in table:
+            continue
+
+        alternatives = []
+        if rng.random() < 0.4:
+            alternatives.append(name + " High School")
+        if rng.random() < 0.2:
+            alternatives.append(name.replace(" Regional", " Reg.").replace(" Tech", " Technical")[:12])
+        table[name] = alternatives
+
+    return table
+
+def draw_queries(table: Dict[str, List[str]], count: int, seed: int) -> List[str]:
+    """
+    Draw raw school names that miss the exact-match path: misspelled names
+    from the table, plus names of schools that are not in it.
+    """
+    rng = random.Random(seed)
+    entries = list(table.items())
+    queries = []
+    while len(queries) < count:
+        if rng.random() < 0.2:
+            # Unknown school, should stay unmatched
+            queries.append("".join(rng.choice(SYLLABLES) for _ in range(3)).title() + " Friends")
+            continue
+        school, alternatives = rng.choice(entries)
+        queries.append(misspell(rng.choice([school] + alternatives), rng))
+    return queries
+
+def run(size: int, count: int, seed: int) -> Dict[str, float]:
+    """
+    Compare blocked lookups with the full scan over one table size.
+
+    Returns:
+        Dict[str, float]: Table size, build seconds, per-lookup milliseconds
+            for both paths, and recall of the blocked path.
+    """
+    table = school_table(size, seed)
+    index = MatchIndex("school", table, "partial_ratio")
+
+    # Only fuzzy lookups are blocked, exact key hits never reach scoring
+    queries = [query for query in draw_queries(table, count, seed) if index.exact_match(query) is None]
+
+    # Built directly, so tables below BLOCKING_MIN_CHOICES are measured too
+    start = time.perf_counter()
+    blocker = TrigramBlocker(index.choices)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = [index.fuzzy_match(query) for query in queries]
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocked = [index.fuzzy_match(query, blocker.candidates(query)) for query in queries]
+    blocked_seconds = time.perf_counter() - start
+
+    # Recall: queries the full scan matches that the blocked path resolves
+    # to the same standardized name
+    matched = [position for position, match in enumerate(full) if match]
+    agree = sum(1 for position in matched if blocked[position] and blocked[position][0] == full[position][0])
+
+    # Misses where another name scores exactly as high; the full scan keeps
+    # the earlier one in table order
+    ties = sum(1 for position in matched if blocked[position] and blocked[position][0] != full[position][0]
+               and blocked[position][1] == full[position][1])
+    extra = sum(1 for position, match in enumerate(full) if match is None and blocked[position])
+
+    return {
+        "size": size,
+        "choices": len(index.choices),
+        "queries": len(queries),
+        "build_seconds": build,
+        "full_ms": full_seconds / len(queries) * 1000,
+        "blocked_ms": blocked_seconds / len(queries) * 1000,
+        "recall": agree / len(matched) if matched else 1.0,
+        "missed": len(matched) - agree,
+        "ties": ties,
+        "extra": extra,
+    }
+
+if __name__ == "__main__":
+    '''
+    Measure trigram blocking against the full fuzzy scan as the school table
+    grows: per-lookup latency, index build time and recall.
+    '''
+
+    parser = argparse.ArgumentParser(description="Benchmark trigram blocking of school lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Standardized names per table")
+    parser.add_argument("--queries", type=int, default=2000, help="Raw names looked up per table")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    print(f"{'names':>8} {'choices':>8} {'queries':>8} {'build s':>8} {'full ms':>9} {'blocked ms':>11} "
+          f"{'speedup':>8} {'recall':>8} {'missed':>7} {'ties':>5} {'extra':>6}")
+    for size in args.sizes:
+        result = run(size, args.queries, args.seed)
+        print(f"{result['size']:>8} {result['choices']:>8} {result['queries']:>8} {result['build_seconds']:>8.2f} "
+              f"{result['full_ms']:>9.3f} {result['blocked_ms']:>11.3f} "
+              f"{result['full_ms'] / result['blocked_ms']:>7.1f}x {result['recall']:>8.4f} "
+              f"{result['missed']:>7} {result['ties']:>5} {result['extra']:>6}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+import io
+import os
+import re
+import sys
+import time
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
+from generate_meet import write_meet
+from formats import LINE_EVENT, LINE_RESULT, LINE_ROUND, RESULT_FORMATS, event_pattern, result_pattern
+
+# Line classifier of the individual results parser
+classify_line = RESULT_FORMATS["hytek"].classify_line
+
+# Round pattern as parse_results used to search it
+finals_pattern = re.compile(r"Finals")
+
+def dispatch_legacy(lines):
+    """
+    Run every pattern on every line, as parse_results used to.
+    """
+    counts = [0, 0, 0]
+    for line in lines:
+        if event_pattern.search(line):
+            counts[0] += 1
+            continue
+        if finals_pattern.search(line):
+            counts[1] += 1
+            continue
+        if result_pattern.search(line):
+            counts[2] += 1
+    return counts
+
+def dispatch_classified(lines):
+    """
+    Classify each line first and only run the result pattern on candidates.
+    """
+    counts = [0, 0, 0]
+    for line in lines:
+        line_type, _ = classify_line(line)
+        if line_type == LINE_EVENT:
+            counts[0] += 1
+        elif line_type == LINE_ROUND:
+            counts[1] += 1
+        elif line_type == LINE_RESULT and result_pattern.search(line):
+            counts[2] += 1
+    return counts
+
+def lines_per_second(dispatch, lines, repeat: int = 3) -> float:
+    """
+    Best lines/sec over a few runs.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dispatch(lines)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+def report(label: str, lines) -> None:
+    """
+    Print lines/sec for both dispatch paths over the same lines.
+    """
+    # Both paths must agree before their speed is compared
+    assert dispatch_legacy(lines) == dispatch_classified(lines)
+
+    before = lines_per_second(dispatch_legacy, lines)
+    after = lines_per_second(dispatch_classified, lines)
+    print(f"{label:>30}  {len(lines):>9} lines  before {before:>12,.0f} lines/s  "
+          f"after {after:>12,.0f} lines/s  ({after / before:.2f}x)")
+
+if __name__ == "__main__":
+    '''
+    Compare line dispatch throughput before and after line classification.
+
+    Arguments are synthetic file sizes in lines, or paths to real results files.
+    '''
+
+    targets = sys.argv[1:] or ["10000", "100000", "1000000"]
+
+    for target in targets:
+        # Real results file
+        if not target.isdigit():
+            with open(target, "r") as file:
+                report(os.path.basename(target)[:30], file.readlines())
+            continue
+
+        # Synthetic file of the requested size
+        buffer = io.StringIO()
+        write_meet(buffer, int(target))
+        report("synthetic", buffer.getvalue().splitlines(keepends=True))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_meet import write_meet
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api", "python")
+
+# Runs in a fresh interpreter: import the function, then send it two uploads
+# over a local socket, the way a cold serverless invocation would see them
+CHILD = r"""
+import http.client, json, sys, threading, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import index
+imported = time.perf_counter()
+
+from http.server import HTTPServer
+index.handler.log_message = lambda *args: None
+server = HTTPServer(("127.0.0.1", 0), index.handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+with open(sys.argv[2], "rb") as file:
+    contents = file.read()
+boundary = "benchboundary"
+body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"meetName\"\r\n\r\nBench\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"meet.txt\"\r\n"
+        f"Content-Type: text/plain\r\n\r\n").encode() + contents + f"\r\n--{boundary}--\r\n".encode()
+
+def request():
+    began = time.perf_counter()
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("POST", "/", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    response = json.loads(connection.getresponse().read())
+    assert response["success"]
+    return time.perf_counter() - began
+
+first = request()
+warm = request()
+print(json.dumps({"import": imported - start, "first_request": first, "warm_request": warm}))
+"""
+
+def run_child(upload_path: str, snapshot: bool, bytecode: bool = True) -> dict:
+    """
+    Time one cold start in a new interpreter.
+
+    Args:
+        upload_path (str): Results file to upload.
+        snapshot (bool): Load indexes from the alias snapshot, or rebuild
+            them from the tables.
+        bytecode (bool): Allow cached bytecode. Without it every module is
+            compiled from source, like a deployment that ships no
+            __pycache__.
+
+    Returns:
+        dict: Seconds for process start through import, import alone, the
+            first request and a warm request.
+    """
+    env = dict(os.environ)
+    if not snapshot:
+        env["ALIAS_SNAPSHOT"] = os.devnull
+    if not bytecode:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+        env["PYTHONPYCACHEPREFIX"] = tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", CHILD, API_DIR, upload_path],
+                               capture_output=True, text=True, env=env, check=True)
+    total = time.perf_counter() - start
+
+    timings = json.loads(completed.stdout)
+    timings["process"] = total - timings["first_request"] - timings["warm_request"]
+    return timings
+
+if __name__ == "__main__":
+    '''
+    Report cold-start and first-request latency of the HTTP function, with
+    and without the alias snapshot.
+    '''
+
+    parser = argparse.ArgumentParser(description="Measure cold-start and first-request latency.")
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts per mode")
+    parser.add_argument("--lines", type=int, default=1_000, help="Lines in the uploaded results file")
+    parser.add_argument("--no-bytecode", action="store_true", help="Compile every module from source")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as upload:
+        write_meet(upload, args.lines)
+
+    try:
+        for label, snapshot in (("snapshot", True), ("no snapshot", False)):
+            runs = [run_child(upload.name, snapshot, not args.no_bytecode) for _ in range(args.runs)]
+            medians = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+            print(f"{label:<12} process+import {medians['process']:7.1f}ms  import {medians['import']:6.1f}ms  "
+                  f"first request {medians['first_request']:6.1f}ms  warm request {medians['warm_request']:6.1f}ms")
+    finally:
+        os.unlink(upload.name)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from generate_meet import write_meet
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api", "python")
+
+# Runs in a fresh interpreter so the peak resident set size belongs to one
+# parse: every row of the file is held at once, as batch school resolution
+# and the columnar writers do
+CHILD = r"""
+import json, resource, sys
+sys.path.insert(0, sys.argv[1])
+from parse_file import iter_results
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+metadata = {"Meet Date": "2010-05-01", "Edition": "1st", "Meet Name": "Synthetic Invitational",
+            "Meet Location": "Worcester, MA", "Season": "Outdoor", "URL": "http://example.com",
+            "Timing": "FAT"}
+rows = list(iter_results(sys.argv[2], metadata, batch_schools=sys.argv[3] == "1"))
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rows": len(rows), "baseline_kb": baseline, "peak_kb": peak}))
+"""
+
+def peak_rss(path: str, batch_schools: bool, api_dir: str = API_DIR) -> dict:
+    """
+    Parse a file into memory in a new interpreter and report its peak RSS.
+
+    Args:
+        path (str): Results file to parse.
+        batch_schools (bool): Resolve school names in one batch.
+        api_dir (str): Directory of the parser modules, so another checkout
+            can be measured for comparison.
+
+    Returns:
+        dict: Rows parsed, RSS after imports and peak RSS, in kilobytes.
+    """
+    completed = subprocess.run([sys.executable, "-c", CHILD, api_dir, path, "1" if batch_schools else "0"],
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+if __name__ == "__main__":
+    '''
+    Report peak resident memory of holding every parsed row of synthetic
+    meets of several sizes.
+    '''
+
+    parser = argparse.ArgumentParser(description="Measure peak RSS of parsing synthetic meets into memory.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Synthetic file sizes in lines")
+    parser.add_argument("--batch-schools", action="store_true", help="Resolve school names in one batch")
+    parser.add_argument("--api-dir", default=API_DIR, help="Parser modules to measure (default: this checkout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"meet_{size}.txt")
+            with open(path, "w") as out:
+                write_meet(out, size)
+
+            result = peak_rss(path, args.batch_schools, args.api_dir)
+            growth = (result["peak_kb"] - result["baseline_kb"]) / 1024
+            print(f"{size:>9} lines  {result['rows']:>8} rows  peak RSS {result['peak_kb'] / 1024:7.1f} MB  "
+                  f"(+{growth:.1f} MB over imports, {growth * 1024 * 1024 / max(result['rows'], 1):.0f} B/row)")
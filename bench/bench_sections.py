@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
+from generate_meet import write_meet
+from parse_file import parse_results
+
+def parse_seconds(path: str, workers, batch_schools: bool) -> tuple:
+    """
+    Parse a file to CSV in memory.
+
+    Returns:
+        tuple: (seconds, CSV text)
+    """
+    output = io.StringIO()
+    start = time.perf_counter()
+    parse_results(path, {}, output, batch_schools=batch_schools, workers=workers)
+    return time.perf_counter() - start, output.getvalue()
+
+if __name__ == "__main__":
+    '''
+    Compare parsing one large synthetic meet serially and split at event
+    headers across worker processes; both outputs must be identical.
+    '''
+
+    parser = argparse.ArgumentParser(description="Benchmark event-parallel parsing of a single large file.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[100_000, 1_000_000], help="Synthetic file sizes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 0], help="Worker counts, 0 for one per CPU")
+    parser.add_argument("--batch-schools", action="store_true", help="Resolve school names in one batch")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in args.lines:
+            path = os.path.join(directory, f"meet_{lines}.txt")
+            with open(path, "w") as file:
+                write_meet(file, lines)
+
+            serial, expected = parse_seconds(path, None, args.batch_schools)
+            print(f"{lines:>10} lines  serial     {serial:>7.2f}s")
+            for workers in args.workers:
+                seconds, output = parse_seconds(path, workers, args.batch_schools)
+                assert output == expected, f"{workers} workers changed the output"
+                print(f"{lines:>10} lines  workers {workers or os.cpu_count():>2} {seconds:>7.2f}s  "
+                      f"({serial / seconds:.2f}x)")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import sys
+from typing import IO, List, Tuple
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
+from standard_events import STANDARD_EVENTS
+from standard_schools import STANDARD_SCHOOLS
+
+# Event names as they appear in HY-TEK event headers, with the
+# standardized event each one should normalize to
+EVENT_HEADERS = [
+    ("55 Meter Dash", "55m"),
+    ("55 Meter Hurdles", "55HH"),
+    ("300 Meter Dash", "300m"),
+    ("600 Meter Run", "600m"),
+    ("1000 Meter Run", "1000m"),
+    ("1 Mile Run", "1 mile"),
+    ("2 Mile Run", "2 mile"),
+    ("100 Meter Dash", "100m"),
+    ("200 Meter Dash", "200m"),
+    ("400 Meter Dash", "400m"),
+    ("800 Meter Run", "800m"),
+    ("1600 Meter Run", "1600m"),
+    ("3200 Meter Run", "3200m"),
+]
+
+# Field events, with the range of marks in meters a high school meet sees
+FIELD_EVENT_HEADERS = [
+    ("High Jump", 1.40, 2.10),
+    ("Pole Vault", 2.40, 4.80),
+    ("Long Jump", 4.50, 7.20),
+    ("Triple Jump", 9.50, 14.50),
+    ("Shot Put", 8.00, 18.50),
+    ("Discus Throw", 20.00, 55.00),
+    ("Javelin Throw", 25.00, 60.00),
+]
+
+# Relays, with the range of their times in seconds
+RELAY_EVENT_HEADERS = [
+    ("4x100 Meter Relay", 42.0, 55.0),
+    ("4x200 Meter Relay", 88.0, 115.0),
+    ("4x400 Meter Relay", 200.0, 260.0),
+    ("4x800 Meter Relay", 470.0, 600.0),
+]
+
+# Running events timed with a wind gauge
+WIND_EVENTS = ("55 Meter", "100 Meter", "200 Meter")
+
+# Share of events that are field events and relays, the rest are
+# individual running events
+FIELD_RATE = 0.25
+RELAY_RATE = 0.15
+
+# Suffixes HY-TEK appends to marks: qualified, and record or tie markers
+MARK_SUFFIXES = ["", "", "", "", "q", "Q", "*", "#", "@"]
+
+FIRST_NAMES = [
+    "John", "Jane", "Mary", "Alex", "Chris", "Sam", "Taylor", "Jordan", "Liam", "Ava",
+    "Noah", "Emma", "Olivia", "Ethan", "Mia", "Lucas", "Sofia", "Owen", "Grace", "Ryan",
+]
+LAST_NAMES = [
+    "Smith", "Doe", "O'Brien", "Nguyen", "Garcia", "Lee", "St. Pierre", "Kowalski-Ray",
+    "Murphy", "Sullivan", "Patel", "Chen", "Silva", "McCarthy", "Rodriguez", "Kelly",
+]
+
+# Column header shared by every individual event, and the result line that
+# lines up with it (Name at 4, Year at 28, School at 33, Prelims at 57)
+HEADER_LINE = "    Name                    Year School                  Prelims      H#"
+
+# Sprints add a wind reading between the mark and the heat
+WIND_HEADER_LINE = "    Name                    Year School                  Prelims  Wind  H#"
+
+# Field events give the mark and, for metric marks, its feet-inches
+# conversion (Finals at 57, Points at 75); marks are a column wider, as
+# long throws run to "141-06.00Q"
+FIELD_HEADER_LINE = "    Name                    Year School                  Finals            Points"
+
+# Relays list only the team (School at 4, Finals at 57, H# at 65)
+RELAY_HEADER_LINE = "    School                                               Finals  H# Points"
+
+def misspell(name: str, rng: random.Random) -> str:
+    """
+    Garble a school name the way results files do.
+
+    Args:
+        name (str): A standardized school name or alternative.
+        rng (random.Random): Random source.
+
+    Returns:
+        str: The name truncated to the HY-TEK column width, abbreviated, or
+            with a dropped or swapped letter.
+    """
+    kind = rng.randrange(4)
+
+    # HY-TEK truncates long names to the column width
+    if kind == 0:
+        return name[:12]
+
+    # Common abbreviations
+    if kind == 1:
+        return name.replace("Regional", "Reg.").replace("North ", "N. ").replace("Saint ", "St. ")
+
+    # Dropped letter
+    if kind == 2 and len(name) > 4:
+        index = rng.randrange(1, len(name) - 1)
+        return name[:index] + name[index + 1:]
+
+    # Swapped letters
+    if len(name) > 4:
+        index = rng.randrange(1, len(name) - 2)
+        return name[:index] + name[index + 1] + name[index] + name[index + 2:]
+
+    return name
+
+def school_names(rng: random.Random, misspell_rate: float, count: int) -> List[str]:
+    """
+    Draw school names as they appear in results files.
+
+    Args:
+        rng (random.Random): Random source.
+        misspell_rate (float): Fraction of names that are garbled.
+        count (int): Number of names to draw.
+
+    Returns:
+        List[str]: Raw school names, standardized names, alternatives and
+            misspellings mixed.
+    """
+    names = []
+    standard = list(STANDARD_SCHOOLS.items())
+
+    for _ in range(count):
+        school, alternatives = rng.choice(standard)
+        name = rng.choice([school] + alternatives)
+        if rng.random() < misspell_rate:
+            name = misspell(name, rng)
+        names.append(name)
+
+    return names
+
+def event_names(rng: random.Random, count: int) -> List[str]:
+    """
+    Draw event names as they appear in event headers.
+
+    Args:
+        rng (random.Random): Random source.
+        count (int): Number of names to draw.
+
+    Returns:
+        List[str]: Raw event names, header style or alternatives from
+            STANDARD_EVENTS.
+    """
+    names = []
+    for _ in range(count):
+        header, standard_event = rng.choice(EVENT_HEADERS)
+        alternatives = STANDARD_EVENTS.get(standard_event, [])
+        names.append(rng.choice([header, header] + alternatives))
+    return names
+
+def random_mark(rng: random.Random) -> str:
+    """
+    A sprint (##.##) or distance (#:##.##) mark with an optional qualifier,
+    record or tie suffix.
+    """
+    if rng.random() < 0.5:
+        mark = f"{rng.randint(6, 59)}.{rng.randint(0, 99):02d}"
+    else:
+        mark = f"{rng.randint(1, 11)}:{rng.randint(0, 59):02d}.{rng.randint(0, 99):02d}"
+    return mark + rng.choice(MARK_SUFFIXES)
+
+def feet_inches(meters: float) -> str:
+    """
+    A distance in meters as HY-TEK writes it in feet and quarter inches,
+    e.g. 5.60 -> "18-04.50".
+    """
+    quarters = round(meters / 0.0254 * 4)
+    feet, quarters = divmod(quarters, 48)
+    return f"{feet}-{quarters / 4:05.2f}"
+
+def random_field_mark(rng: random.Random, low: float, high: float) -> Tuple[str, str]:
+    """
+    A field mark between low and high meters, either metric with its
+    feet-inches conversion ("5.60m#", "18-04.50") or in feet-inches only
+    ("12-03.50", ""), with an optional suffix.
+    """
+    meters = round(rng.uniform(low, high), 2)
+    suffix = rng.choice(MARK_SUFFIXES)
+    if rng.random() < 0.5:
+        return f"{meters:.2f}m{suffix}", feet_inches(meters)
+    return feet_inches(meters) + suffix, ""
+
+def random_relay_time(rng: random.Random, low: float, high: float) -> str:
+    """
+    A relay time between low and high seconds, hand timed to tenths
+    ("3:30.8") or fully automatic to hundredths ("44.61").
+    """
+    seconds = rng.uniform(low, high)
+    minutes, seconds = divmod(seconds, 60)
+    text = f"{seconds:05.2f}" if rng.random() < 0.5 else f"{seconds:04.1f}"
+    return (f"{int(minutes)}:{text}" if minutes else text.lstrip("0")) + rng.choice(MARK_SUFFIXES)
+
+def random_wind(rng: random.Random) -> str:
+    """
+    A wind reading in meters per second, e.g. "+1.3" or "-0.4".
+    """
+    return f"{rng.uniform(-3.0, 3.5):+.1f}"
+
+def write_meet(out: IO, lines: int, seed: int = 0, misspell_rate: float = 0.2) -> None:
+    """
+    Write a synthetic HY-TEK style results file: individual running events,
+    sprints with wind readings, field events with metric and feet-inches
+    marks, and relays, in the shares FIELD_RATE and RELAY_RATE set.
+
+    Args:
+        out (IO): Text stream to write to.
+        lines (int): Approximate number of lines to write.
+        seed (int): Random seed, so the same file is produced every time.
+        misspell_rate (float): Fraction of school names that are garbled.
+    """
+    rng = random.Random(seed)
+
+    # A meet draws from a limited pool of schools and events, like a real
+    # invitational
+    schools = school_names(rng, misspell_rate, 60)
+    events = event_names(rng, 40)
+    written = 0
+    event = 0
+
+    # Banner
+    out.write("Licensed to First Time Out - Contractor License\n")
+    out.write("                                        HY-TEK's Meet Manager 5/3/2010 11:38 AM\n")
+    out.write("                      Synthetic Invitational - 5/1/2010\n")
+    out.write("                                    Results\n")
+    written += 4
+
+    while written < lines:
+        event += 1
+        gender = rng.choice(["Boys", "Girls"])
+
+        kind = rng.random()
+        if kind < FIELD_RATE:
+            name, low, high = rng.choice(FIELD_EVENT_HEADERS)
+            header_line = FIELD_HEADER_LINE
+        elif kind < FIELD_RATE + RELAY_RATE:
+            name, low, high = rng.choice(RELAY_EVENT_HEADERS)
+            header_line = RELAY_HEADER_LINE
+        else:
+            name = rng.choice(events)
+            header_line = WIND_HEADER_LINE if name.startswith(WIND_EVENTS) else HEADER_LINE
+
+        # Event header, previous winners, record line, column header and
+        # separators
+        out.write(f"Event {event}  {gender} {name}\n")
+        out.write("=" * 81 + "\n")
+        out.write(" 2010 First Place Names\n")
+        out.write(f" {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)},  "
+                  f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}\n")
+        out.write(f"  Division I: # {rng.randint(1, 9)}:{rng.randint(0, 59):02d}.{rng.randint(0, 9)}h  "
+                  f"{rng.randint(1970, 2009)}        {rng.choice(schools)}\n")
+        out.write(header_line + "\n")
+        out.write("=" * 81 + "\n")
+        written += 7
+
+        if rng.random() < 0.4:
+            out.write("Finals\n")
+            written += 1
+
+        # Result lines, fixed width under the header
+        for place in range(1, rng.randint(8, 40)):
+            if header_line is RELAY_HEADER_LINE:
+                school = rng.choice(schools)[:50]
+                out.write(f"{place:>3} {school:<50}{random_relay_time(rng, low, high):>9}"
+                          f"{rng.randint(1, 4):>4}{rng.randint(0, 10):>4}\n")
+                written += 1
+                continue
+
+            athlete = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            grade = str(rng.randint(9, 12)) if rng.random() < 0.8 else ""
+            school = rng.choice(schools)[:22]
+            line = f"{place:>3} {athlete:<24}{grade:>4} {school:<22}"
+            if header_line is FIELD_HEADER_LINE:
+                # A full width mark still needs a space after the school
+                mark, conversion = random_field_mark(rng, low, high)
+                line = f"{line[:54]} {mark:>10}{conversion:>10}{rng.randint(0, 10):>6}"
+            elif header_line is WIND_HEADER_LINE:
+                line += f"{random_mark(rng):>9}{random_wind(rng):>6}{rng.randint(1, 4):>4}"
+            else:
+                line += f"{random_mark(rng):>9}{rng.randint(1, 4):>7}"
+            out.write(line + "\n")
+            written += 1
+
+        # Scratches and disqualifications
+        if rng.random() < 0.2:
+            athlete = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            out.write(f" -- {athlete:<24}{'':>4} {rng.choice(schools)[:22]:<22}{'DQ':>9}\n")
+            written += 1
+
+        out.write(" \n")
+        written += 1
+
+if __name__ == "__main__":
+    '''
+    Write a synthetic results file of the given size.
+    '''
+
+    parser = argparse.ArgumentParser(description="Write a synthetic HY-TEK style results file.")
+    parser.add_argument("lines", type=int, help="Approximate number of lines, e.g. 1000 to 1000000")
+    parser.add_argument("output", help="Path of the results file to write")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--misspell-rate", type=float, default=0.2, help="Fraction of garbled school names")
+    args = parser.parse_args()
+
+    with open(args.output, "w") as out:
+        write_meet(out, args.lines, args.seed, args.misspell_rate)
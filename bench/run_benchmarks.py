@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
+import norm_cache
+from generate_meet import FIRST_NAMES, LAST_NAMES, event_names, random_mark, school_names, write_meet
+from marks import normalize_marks
+from parse_file import normalize_event, normalize_school, parse_name, parse_results
+
+# Default synthetic file sizes, in lines
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+def measure(func: Callable[[], object], repeat: int = 3) -> Dict[str, float]:
+    """
+    Time a function and trace its peak Python memory.
+
+    The best wall time over several runs is kept; memory is traced on a
+    separate run so tracing overhead does not skew the timings.
+
+    Args:
+        func (Callable): Function to benchmark, called with no arguments.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        Dict[str, float]: Best seconds and peak traced memory in bytes.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak}
+
+def bench_normalizers(count: int, seed: int) -> List[Dict[str, object]]:
+    """
+    Benchmark normalize_school, normalize_event, parse_name and
+    normalize_marks on raw strings drawn the way the generator draws them.
+
+    School and event lookups are measured with the cache disabled (every
+    call runs the fuzzy match) and with a warm cache.
+
+    Args:
+        count (int): Number of strings per benchmark.
+        seed (int): Random seed.
+
+    Returns:
+        List[Dict[str, object]]: One result per benchmark.
+    """
+    rng = random.Random(seed)
+    schools = school_names(rng, 0.2, count)
+    events = event_names(rng, count)
+    names = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(count)]
+    marks = [random_mark(rng) for _ in range(count)]
+    results = []
+
+    def normalize_all(func, inputs):
+        return [func(value, False) for value in inputs]
+
+    for label, func, inputs in (
+        ("normalize_school", normalize_school, schools),
+        ("normalize_event", normalize_event, events),
+    ):
+        # Cache disabled, every lookup is a fuzzy match
+        norm_cache.configure_cache(maxsize=0)
+        stats = measure(lambda: normalize_all(func, inputs), repeat=1)
+        results.append({"name": f"{label} (uncached)", "items": count, **stats})
+
+        # Warm cache
+        norm_cache.configure_cache()
+        normalize_all(func, inputs)
+        stats = measure(lambda: normalize_all(func, inputs))
+        results.append({"name": f"{label} (cached)", "items": count, **stats})
+
+    stats = measure(lambda: [parse_name(name) for name in names])
+    results.append({"name": "parse_name", "items": count, **stats})
+
+    # Whole column at once
+    normalize_marks(marks)
+    stats = measure(lambda: normalize_marks(marks))
+    results.append({"name": "normalize_marks", "items": count, **stats})
+
+    return results
+
+def bench_parse(sizes: List[int], seed: int, options: Dict[str, bool]) -> List[Dict[str, object]]:
+    """
+    Benchmark full parse_results runs on synthetic files.
+
+    Args:
+        sizes (List[int]): File sizes in lines.
+        seed (int): Random seed.
+        options (Dict[str, bool]): Parser options passed to parse_results.
+
+    Returns:
+        List[Dict[str, object]]: One result per file size.
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f"meet_{size}.txt")
+            with open(path, "w") as out:
+                write_meet(out, size, seed)
+
+            def run():
+                # Each run starts from a cold cache, like a fresh upload, and
+                # writes to a discarding sink so only the parser is measured
+                norm_cache.configure_cache()
+                with open(os.devnull, "w") as sink:
+                    return parse_results(path, {"Meet Name": "Benchmark"}, sink, **options)
+
+            rows = run()
+            stats = measure(run, repeat=1 if size >= 1_000_000 else 3)
+            results.append({
+                "name": "parse_results",
+                "lines": size,
+                "rows": rows,
+                "lines_per_second": size / stats["seconds"],
+                **stats,
+            })
+
+    return results
+
+def git_version() -> Optional[str]:
+    """
+    Describe the checked out commit, if this is a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(current: List[Dict[str, object]], baseline_path: str) -> None:
+    """
+    Print the change in time for every benchmark found in a previous run.
+    """
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)
+
+    previous = {(entry["name"], entry.get("lines")): entry for entry in baseline["results"]}
+    for entry in current:
+        before = previous.get((entry["name"], entry.get("lines")))
+        if before:
+            change = entry["seconds"] / before["seconds"]
+            print(f"{entry['name']:<28} {entry.get('lines') or '':>8}  {before['seconds']:.4f}s -> "
+                  f"{entry['seconds']:.4f}s  ({change:.2f}x time)")
+
+if __name__ == "__main__":
+    '''
+    Run the benchmark suite and save the results as JSON.
+    '''
+
+    parser = argparse.ArgumentParser(description="Benchmark the results parser on synthetic meets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Synthetic file sizes in lines (e.g. 1000 10000 100000 1000000)")
+    parser.add_argument("--strings", type=int, default=2_000, help="Strings per normalizer benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--fixed-width", action="store_true", help="Parse in fixed-width mode")
+    parser.add_argument("--batch-schools", action="store_true", help="Resolve school names in one batch")
+    parser.add_argument("--output", default="bench_results.json", help="Where to save the JSON results")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    options = {"fixed_width": args.fixed_width, "batch_schools": args.batch_schools}
+    results = bench_normalizers(args.strings, args.seed) + bench_parse(args.sizes, args.seed, options)
+
+    for entry in results:
+        size = entry.get("lines") or entry.get("items")
+        print(f"{entry['name']:<28} {size:>8}  {entry['seconds']:.4f}s  peak {entry['peak_bytes'] / 1e6:.1f} MB")
+
+    with open(args.output, "w") as file:
+        json.dump({
+            "version": git_version(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "options": options,
+            "results": results,
+        }, file, indent=2)
+    print(f"Benchmark results saved to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
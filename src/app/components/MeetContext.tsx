@@ -14,12 +14,23 @@ interface MeetData {
   resultsFile: File | null;
 }
 
+// A raw event or school name the parser could not match, with the output
+// rows it appears on and the closest standardized names
+export interface UnresolvedString {
+  kind: 'event' | 'school';
+  raw: string;
+  count: number;
+  rows: number[];
+  candidates: { name: string; score: number }[];
+}
+
 // Define the context type
 interface MeetContextType {
   meetData: MeetData;
   updateMeetData: (field: keyof MeetData, value: MeetData[keyof MeetData]) => void;
   isLoading: boolean;
   apiResponse: unknown | null;
+  unresolved: UnresolvedString[];
   submitMeetData: () => Promise<void>;
   resetForm: () => void;
   isDownloading: boolean;         // New state for download status
@@ -55,6 +66,7 @@ export const MeetProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
   // State for API call
   const [isLoading, setIsLoading] = useState<boolean>(false);
   const [apiResponse, setApiResponse] = useState<unknown | null>(null);
+  const [unresolved, setUnresolved] = useState<UnresolvedString[]>([]);
   
   // New state variables for file download
   // const [isDownloading, setIsDownloading] = useState<boolean>(false);
@@ -114,8 +126,16 @@ export const MeetProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
         }
       }
 
-      // Get the blob from the response
-      const blob = await response.blob();
+      // The CSV comes wrapped in JSON, next to the names that need review
+      let blob: Blob;
+      if (response.headers.get('Content-Type')?.includes('application/json')) {
+        const body = await response.json();
+        setApiResponse(body);
+        setUnresolved(body.unresolved ?? []);
+        blob = new Blob([body.data ?? ''], { type: 'text/csv' });
+      } else {
+        blob = await response.blob();
+      }
       
       // Create a download link and trigger the download
       const url = window.URL.createObjectURL(blob);
@@ -150,6 +170,7 @@ export const MeetProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
       resultsFile: null,
     });
     setApiResponse(null);
+    setUnresolved([]);
     setDownloadSuccess(false);
   };
 
@@ -159,6 +180,7 @@ export const MeetProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     updateMeetData,
     isLoading,
     apiResponse,
+    unresolved,
     submitMeetData,
     resetForm,
     isDownloading,
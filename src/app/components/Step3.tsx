@@ -6,7 +6,7 @@ import { useMeetContext } from "./MeetContext";
 
 const StepThree: React.FC = () => {
   // Use the shared context
-  const { submitMeetData, resetForm, isLoading, meetData } = useMeetContext();
+  const { submitMeetData, resetForm, isLoading, meetData, unresolved } = useMeetContext();
   
   // State to track if validation message should be shown
   const [showValidationMessage, setShowValidationMessage] = useState(false);
@@ -73,6 +73,30 @@ const StepThree: React.FC = () => {
             Please complete all required fields (meet date, name, location, and upload a file).
           </p>
         )}
+
+        {/* Names the parser could not match, each listed once with its closest standardized names */}
+        {unresolved.length > 0 && (
+          <div>
+            <p className="text-md font-medium text-gray-400">
+              Needs review: {unresolved.length} unmatched {unresolved.length === 1 ? "name" : "names"}
+            </p>
+            <ul className="mt-2 flex flex-col gap-2">
+              {unresolved.map((entry) => (
+                <li key={`${entry.kind}:${entry.raw}`} className="bg-gray-700 rounded-lg p-3">
+                  <p className="text-sm text-gray-100">
+                    <span className="text-gray-400 capitalize">{entry.kind}:</span> {entry.raw}
+                    <span className="text-gray-400"> ({entry.count} {entry.count === 1 ? "row" : "rows"})</span>
+                  </p>
+                  <p className="text-sm text-gray-300 mt-1">
+                    {entry.candidates.length > 0
+                      ? `Closest: ${entry.candidates.map((candidate) => `${candidate.name} (${candidate.score})`).join(", ")}`
+                      : "No close standardized name"}
+                  </p>
+                </li>
+              ))}
+            </ul>
+          </div>
+        )}
       </div>
     </div>
   );
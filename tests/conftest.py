@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import parser modules
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "api", "python"))
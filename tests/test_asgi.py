@@ -0,0 +1,101 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from asgi import ParseApp, WorkerPool, content_length, handle_connection
+
+BOUNDARY = "----boundary42"
+
+RESULTS = (
+    b"Event 1  Girls 600 Meter Run\r\n"
+    b"    Name                    Year School                  Prelims\r\n"
+    b"  1 Jane Doe                 10 Bartlett                 1:39.74   2\r\n"
+)
+
+def upload_body(data=RESULTS):
+    return (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"meet.txt\"\r\n"
+            f"Content-Type: text/plain\r\n\r\n").encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+def request(app, body, length=None, chunk_size=64):
+    """
+    Drive the app with one POST, its body split into chunks, and return
+    (status, headers, body) of the response.
+    """
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+               (b"content-length", str(len(body)).encode() if length is None else length)]
+    scope = {"type": "http", "method": "POST", "path": "/api/parse", "query_string": b"", "headers": headers}
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)] or [b""]
+    messages = [{"type": "http.request", "body": chunk, "more_body": position < len(chunks) - 1}
+                for position, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, response = sent
+    return start["status"], dict(start["headers"]), response["body"]
+
+@pytest.fixture
+def app():
+    app = ParseApp(WorkerPool(workers=1, queue_size=0), max_upload=4096)
+    yield app
+    app.close()
+
+def test_upload_returns_csv(app):
+    status, headers, body = request(app, upload_body())
+
+    assert status == 200 and headers[b"content-type"] == b"application/json"
+    response = json.loads(body)
+    rows = list(csv.DictReader(io.StringIO(response["data"])))
+    assert [(row["Last Name"], row["School"]) for row in rows] == [("Doe", "Bartlett")]
+    assert response["unresolved"] == []
+    assert app.pool.stats()["completed"] == 1 and app.pool.in_flight == 0
+
+def test_saturated_pool_answers_429_with_retry_after(app):
+    assert app.pool.reserve()
+    status, headers, body = request(app, upload_body())
+
+    assert status == 429
+    assert int(headers[b"retry-after"]) >= 1
+    assert app.pool.stats()["rejected"] == 1
+
+@pytest.mark.parametrize("declared", [True, False])
+def test_oversized_upload_answers_413(app, declared):
+    body = upload_body(RESULTS * 100)
+    status, _, response = request(app, body, length=None if declared else b"100")
+
+    assert status == 413
+    assert json.loads(response)["success"] is False
+    assert app.pool.in_flight == 0
+
+@pytest.mark.parametrize("length", [b"abc", b"-5", b"1e3", b"\xb2"])
+def test_malformed_content_length_answers_400(app, length):
+    status, _, response = request(app, upload_body(), length=length)
+    assert status == 400
+    assert "Content-Length" in json.loads(response)["error"]
+
+def test_built_in_server_refuses_a_malformed_content_length(app):
+    async def exchange():
+        server = await asyncio.start_server(lambda reader, writer: handle_connection(app, reader, writer),
+                                            "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /api/parse HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        server.close()
+        return response
+
+    assert asyncio.run(exchange()).startswith(b"HTTP/1.1 400 ")
+
+def test_content_length():
+    assert content_length(" 42 ") == 42
+    assert content_length("4_2") is None
+    assert content_length("") is None
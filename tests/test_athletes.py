@@ -0,0 +1,80 @@
+import csv
+import json
+
+import batch
+from athletes import ATHLETE_COLUMN, AthleteIndex, class_year, link_file, soundex
+
+RESULTS = (
+    "Event 1  Girls 600 Meter Run\n"
+    "    Name                    Year School                  Prelims\n"
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\n"
+    "  2 Mary Smith               11 Bartlett                 1:41.02   2\n"
+)
+
+def test_soundex_and_class_year():
+    assert soundex("smith") == soundex("smyth") == "S530"
+    assert soundex("ashcraft") == "A261"
+    assert class_year(10, "2023-01-14") == 2025
+    assert class_year(10, "2023-09-14") == 2026
+    assert class_year(None, "2023-01-14") is None
+
+def test_same_athlete_links_across_meets_and_runs(tmp_path):
+    path = str(tmp_path / "athletes.db")
+    index = AthleteIndex(path)
+    jane = index.link("Bartlett", "Doe", "Jane", "F", "10", "2023-01-14")
+    mary = index.link("Bartlett", "Smith", "Mary", "F", "10", "2023-01-14")
+    assert jane != mary
+    index.flush()
+
+    # A season later, a grade up, with a misspelled name
+    index = AthleteIndex(path)
+    assert index.link("Bartlett", "Smyth", "Mary", "F", "11", "2024-01-13") == mary
+    assert index.link("Bartlett", "Doe", "J", "F", "JR", "2024-01-13") == jane
+    assert index.created == 0
+
+def test_different_athletes_stay_apart():
+    index = AthleteIndex()
+    jane = index.link("Bartlett", "Doe", "Jane", "F", "10", "2023-01-14")
+    assert index.link("Xaverian", "Doe", "Jane", "F", "10", "2023-01-14") != jane
+    assert index.link("Bartlett", "Doe", "Jane", "M", "10", "2023-01-14") != jane
+    assert index.link("Bartlett", "Doe", "Jane", "F", "12", "2023-01-14") != jane
+    assert index.link("Bartlett", "", "", "F", "", "") == ""
+
+def test_link_file_adds_the_column_to_csv_and_ndjson(tmp_path):
+    csv_path = tmp_path / "meet.csv"
+    csv_path.write_text("Last Name,First Name,School,Gender,Grade\nDoe,Jane,Bartlett,F,10\n")
+    ndjson_path = tmp_path / "meet.ndjson"
+    ndjson_path.write_text(json.dumps({"Last Name": "Doe", "First Name": "Jane", "School": "Bartlett",
+                                       "Gender": "F", "Grade": 10}) + "\n")
+
+    index = AthleteIndex()
+    assert link_file(str(csv_path), index)["rows"] == 1
+    assert link_file(str(ndjson_path), index)["rows"] == 1
+
+    header, row = list(csv.reader(csv_path.open()))
+    assert header[-1] == ATHLETE_COLUMN
+    assert json.loads(ndjson_path.read_text())[ATHLETE_COLUMN] == int(row[-1])
+
+    # Linking again refreshes the column instead of adding another
+    link_file(str(csv_path), index)
+    assert list(csv.reader(csv_path.open()))[0].count(ATHLETE_COLUMN) == 1
+
+def test_link_file_skips_empty_outputs(tmp_path):
+    for name in ("empty.csv", "empty.ndjson"):
+        path = tmp_path / name
+        path.write_text("")
+        assert link_file(str(path), AthleteIndex())["rows"] == 0
+        assert path.read_text() == ""
+
+def test_batch_links_meets_in_file_order(tmp_path):
+    for name in ("meet1.txt", "meet2.txt"):
+        (tmp_path / name).write_text(RESULTS)
+    files = batch.find_files(str(tmp_path))
+    manifest = {"meet1.txt": {"Meet Date": "2023-01-14"}, "meet2.txt": {"Meet Date": "2023-01-21"}}
+
+    out = tmp_path / "out"
+    batch.run_batch(files, manifest, output_dir=str(out), workers=1, athlete_db=str(tmp_path / "athletes.db"))
+
+    ids = [[row[ATHLETE_COLUMN] for row in csv.DictReader((out / name).open())]
+           for name in ("meet1.csv", "meet2.csv")]
+    assert ids[0] == ids[1] and len(set(ids[0])) == 2
@@ -0,0 +1,65 @@
+import csv
+
+import pytest
+
+import batch
+from renormalize import find_outputs
+
+RESULTS = (
+    "Event 1  Girls 600 Meter Run\n"
+    "    Name                    Year School                  Prelims\n"
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\n"
+)
+
+def write_season(tmp_path, names):
+    files = []
+    for name in names:
+        path = tmp_path / "season" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(RESULTS.replace("Jane", path.parent.name.capitalize()))
+        files.append(str(path))
+    return files
+
+def test_same_named_meets_in_different_folders_keep_their_own_outputs(tmp_path):
+    files = write_season(tmp_path, ["week1/results.txt", "week2/results.txt"])
+    out = tmp_path / "out"
+
+    report = batch.run_batch(files, {}, output_dir=str(out), workers=1, keep_raw=True)
+    assert [entry["rows"] for entry in report] == [1, 1]
+
+    for week in ("week1", "week2"):
+        rows = list(csv.DictReader((out / week / "results.csv").open()))
+        assert rows[0]["First Name"] == week.capitalize()
+        assert (out / week / "results.csv.raw.json").exists()
+
+    assert find_outputs([str(out)]) == [str(out / "week1" / "results.csv"), str(out / "week2" / "results.csv")]
+
+def test_files_in_one_folder_are_written_flat(tmp_path):
+    files = write_season(tmp_path, ["meet1.txt", "meet2.txt"])
+    out = tmp_path / "out"
+
+    batch.run_batch(files, {}, output_dir=str(out), workers=1, output_format="ndjson")
+    assert sorted(path.name for path in out.iterdir()) == ["meet1.ndjson", "meet2.ndjson"]
+
+def test_outputs_that_would_collide_are_refused(tmp_path):
+    files = write_season(tmp_path, ["meet.txt", "meet.TXT"])
+    with pytest.raises(ValueError):
+        batch.run_batch(files, {}, output_dir=str(tmp_path / "out"), workers=1)
+
+def test_a_file_that_fails_is_reported_and_the_rest_are_merged(tmp_path):
+    files = write_season(tmp_path, ["meet1.txt", "meet3.txt"])
+    files.insert(1, str(tmp_path / "season" / "meet2.txt"))
+    merged = tmp_path / "merged.csv"
+
+    report = batch.run_batch(files, {}, output=str(merged), workers=1)
+    assert [entry["rows"] for entry in report] == [1, 0, 1]
+    assert "FileNotFoundError" in report[1]["error"]
+    assert "error" not in report[0] and "error" not in report[2]
+    assert len(list(csv.DictReader(merged.open()))) == 2
+
+def test_directories_are_searched_recursively(tmp_path):
+    files = write_season(tmp_path, ["meet.txt", "week1/results.txt", "week2/day1/results.txt"])
+    (tmp_path / "season" / "notes.md").write_text("")
+
+    assert batch.find_files(str(tmp_path / "season")) == sorted(files)
+    assert batch.find_files(str(tmp_path / "season" / "**" / "results.txt")) == sorted(files[1:])
@@ -0,0 +1,75 @@
+import codecs
+import io
+
+import pytest
+
+import byte_lines
+import parse_file
+from byte_lines import detect_encoding, iter_bytes_lines, iter_stream_lines, open_file_lines
+
+TEXT = "Event 1  Girls 600 Meter Run\r\n  1 Zoë Brontë   10 Académie   1:39.74\rlast line"
+LINES = ["Event 1  Girls 600 Meter Run\n", "  1 Zoë Brontë   10 Académie   1:39.74\n", "last line"]
+
+class CountingStream(io.BytesIO):
+    """
+    A binary stream recording how many bytes have been read from it.
+    """
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.total = getattr(self, "total", 0) + len(data)
+        return data
+
+def test_detect_encoding():
+    assert detect_encoding(b"plain ascii\n") == "utf-8"
+    assert detect_encoding(TEXT.encode("utf-8")) == "utf-8"
+    assert detect_encoding(codecs.BOM_UTF8 + TEXT.encode("utf-8")) == "utf-8-sig"
+    assert detect_encoding(TEXT.encode("utf-16")) == "utf-16"
+    assert detect_encoding(TEXT.encode("cp1252")) == "cp1252"
+
+def test_cp1252_found_past_the_first_block(monkeypatch):
+    monkeypatch.setattr(byte_lines, "BLOCK_SIZE", 16)
+    data = ("ascii line\n" * 20 + "Académie\n").encode("cp1252")
+    assert detect_encoding(data) == "cp1252"
+    assert list(iter_bytes_lines(data))[-1] == "Académie\n"
+
+@pytest.mark.parametrize("encoding", ["utf-8", "cp1252", "utf-16"])
+def test_files_bytes_and_streams_decode_alike(tmp_path, encoding):
+    data = TEXT.encode(encoding)
+    path = tmp_path / "results.txt"
+    path.write_bytes(data)
+
+    with open_file_lines(str(path)) as lines:
+        assert list(lines) == LINES
+    assert list(iter_bytes_lines(data)) == LINES
+    assert list(iter_stream_lines(io.BytesIO(data))) == LINES
+
+def test_streams_fall_back_to_cp1252_from_the_first_bad_block(monkeypatch):
+    monkeypatch.setattr(byte_lines, "STREAM_BLOCK_SIZE", 16)
+    data = "Zoë line\n".encode("utf-8") + "Académie\n".encode("cp1252")
+    assert list(iter_stream_lines(io.BytesIO(data))) == ["Zoë line\n", "Académie\n"]
+
+@pytest.mark.parametrize("encoding", [None, "utf-8-sig", "UTF_8_SIG"])
+def test_byte_order_mark_is_dropped(encoding):
+    data = codecs.BOM_UTF8 + TEXT.encode("utf-8")
+    assert list(iter_bytes_lines(data, encoding)) == LINES
+    assert list(iter_stream_lines(io.BytesIO(data), encoding)) == LINES
+
+def test_declared_utf8_sig_stream_is_decoded_as_it_is_read(monkeypatch):
+    monkeypatch.setattr(byte_lines, "STREAM_BLOCK_SIZE", 64)
+    stream = CountingStream(codecs.BOM_UTF8 + ("Event 1  Girls 600 Meter Run\n" * 1000).encode("utf-8"))
+
+    lines = iter_stream_lines(stream, "utf-8-sig")
+    assert next(lines) == "Event 1  Girls 600 Meter Run\n"
+    assert stream.total < 1024
+    assert sum(1 for _ in lines) == 999
+
+def test_declared_utf8_sig_without_a_mark():
+    assert list(iter_bytes_lines(TEXT.encode("utf-8"), "utf-8-sig")) == LINES
+    assert list(iter_stream_lines(io.BytesIO(TEXT.encode("utf-8")), "utf-8-sig")) == LINES
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(parse_file.iter_results(str(path))) == []
+    assert list(iter_stream_lines(io.BytesIO(b""))) == []
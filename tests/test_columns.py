@@ -0,0 +1,46 @@
+from columns import ColumnLayout
+from formats import LINE_EVENT, LINE_RESULT, LINE_ROUND, LINE_SKIP, RESULT_FORMATS
+
+HEADER = "    Name                    Year School                  Finals  H# Points"
+
+def test_header_row_gives_column_offsets():
+    layout = ColumnLayout.from_header(HEADER)
+    assert [field for _, field in layout.text_columns] == ["name", "grade", "school"]
+    assert [field for _, _, field in layout.value_columns] == ["mark", "heat", "points"]
+
+def test_non_header_rows_are_rejected():
+    assert ColumnLayout.from_header("Event 1  Girls 600 Meter Run") is None
+    assert ColumnLayout.from_header("    Name                    Year School") is None
+    assert ColumnLayout.from_header("") is None
+
+def test_split_cuts_fields_by_position():
+    layout = ColumnLayout.from_header(HEADER)
+    fields = layout.split("  1 Jane St. Pierre          9   Bartlett High School  1:39.74q  2    10")
+    assert fields == {"place": "1", "name": "Jane St. Pierre", "grade": "9", "school": "Bartlett High School",
+                      "mark": "1:39.74q", "heat": "2", "wind": "", "points": "10"}
+
+def test_split_handles_nbsp_padding_and_values_spilling_left():
+    layout = ColumnLayout.from_header(HEADER)
+    fields = layout.split("\xa0 2 Mary Smith              11   Xavier            1:01:39.74    2")
+    assert (fields["name"], fields["school"], fields["mark"], fields["heat"]) == \
+        ("Mary Smith", "Xavier", "1:01:39.74", "2")
+
+def test_split_rejects_unplaced_lines():
+    layout = ColumnLayout.from_header(HEADER)
+    assert layout.split(" -- Sam Lee                  12 Bartlett                      DQ") is None
+    assert layout.split("  3 Sam Lee                  12 Bartlett                        ") is None
+
+def test_team_scored_line_puts_team_in_school():
+    layout = ColumnLayout.from_header("    School                  Finals  Points")
+    fields = layout.split("  1 . Saint John's           46.21    10")
+    assert (fields["name"], fields["school"], fields["mark"]) == ("", "Saint John's", "46.21")
+
+def test_classify_line_runs_cheap_checks_first():
+    classify_line = RESULT_FORMATS["hytek"].classify_line
+    assert classify_line("Event 9  Boys 4x400 Meter Relay")[0] == LINE_EVENT
+    assert classify_line("Event 9  Boys 4x400 Meter Relay")[1].group(2) == "4x400 Meter Relay"
+    assert classify_line("Preliminaries and Finals")[0] == LINE_ROUND
+    assert classify_line("  1 Jane Doe   10 Bartlett   9.72*   2 ")[0] == LINE_RESULT
+    assert classify_line("=" * 60)[0] == LINE_SKIP
+    assert classify_line(HEADER)[0] == LINE_ROUND
+    assert classify_line("    Name                    Year School     Prelims")[0] == LINE_SKIP
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+import formats
+import parse_file
+from formats import DEFAULT_FORMAT, RESULT_FORMATS, ResultFormat, register_format, sniff_format, sniff_lines
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "tmp", "Sample Track Meet Results.txt")
+
+INDIVIDUAL = [
+    "Event 1  Girls 600 Meter Run\n",
+    "    Name                    Year School                  Prelims\n",
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\n",
+]
+
+TEAM = [
+    "Event 9  Boys 4x400 Meter Relay\n",
+    "    School                   Finals  Points\n",
+    "  1 . Saint John's           3:31.20   10\n",
+]
+
+def test_individual_results_sniff_as_hytek():
+    name, lines = sniff_lines(INDIVIDUAL)
+    assert name == "hytek"
+    assert list(lines) == INDIVIDUAL
+
+def test_relay_tables_sniff_as_hytek_team():
+    assert sniff_lines(INDIVIDUAL + TEAM)[0] == "hytek-team"
+
+def test_unrecognized_head_falls_back_to_default():
+    assert sniff_format("Meet results\nNothing here\n") == DEFAULT_FORMAT
+
+def test_sniff_reads_only_the_head_and_loses_no_lines(monkeypatch):
+    monkeypatch.setattr(formats, "SNIFF_CHARS", 100)
+    read = []
+
+    def lines():
+        for line in INDIVIDUAL * 50 + TEAM:
+            read.append(line)
+            yield line
+
+    name, rest = sniff_lines(lines())
+    assert name == "hytek"
+    assert len(read) < 5
+    assert list(rest) == INDIVIDUAL * 50 + TEAM
+
+def test_sample_file_is_sniffed_and_parsed_as_team_results():
+    with parse_file.open_source(SAMPLE) as file:
+        assert sniff_lines(file)[0] == "hytek-team"
+    assert len(list(parse_file.iter_results(SAMPLE))) == 202
+
+def test_registered_format_wins_when_it_scores_highest(monkeypatch):
+    monkeypatch.setattr(formats, "RESULT_FORMATS", dict(RESULT_FORMATS))
+    hytek = RESULT_FORMATS["hytek"]
+    register_format("custom", ResultFormat("Custom", lambda head: 5 if "CUSTOM" in head else 0,
+                                           hytek.classify_line, hytek.match_result, False))
+
+    assert sniff_lines(["CUSTOM results\n"] + INDIVIDUAL)[0] == "custom"
+    assert sniff_lines(INDIVIDUAL)[0] == "hytek"
+
+@pytest.mark.parametrize("input_format", ["hytek", "hytek-team"])
+def test_explicit_format_skips_sniffing(monkeypatch, input_format):
+    monkeypatch.setattr(formats, "sniff_format", lambda head: pytest.fail("sniffed"))
+    list(parse_file.iter_results(INDIVIDUAL, input_format=input_format))
+
+TSV = [
+    "Girls 600 Meter Run\n",
+    "Place\tName\tYear\tSchool\tMark\tHeat\n",
+    "1\tJane Doe\t10\tBartlett\t1:39.74\t2\n",
+    "2\tMary Smith\t\tBartlett\t1:41.02q\n",
+    "Boys Long Jump\n",
+    "1\tSam Lee\t12\tBartlett\t18-04.50\t\t+1.2\t10\n",
+]
+
+def test_tab_separated_exports_sniff_and_parse_as_tsv():
+    assert sniff_lines(TSV)[0] == "tsv"
+    assert sniff_lines(INDIVIDUAL + TEAM)[0] != "tsv"
+
+    rows = [row.cells(["Gender", "Place", "Last Name", "Grade", "Mark", "Heat", "Wind", "Points"])
+            for row in parse_file.iter_results(TSV)]
+    assert rows == [["F", "1", "Doe", "10", "1:39.74", "2", "", ""],
+                    ["F", "2", "Smith", "", "1:41.02q", "", "", ""],
+                    ["M", "1", "Lee", "12", "18-04.50", "", "+1.2", "10"]]
+
+def test_one_team_table_switches_the_whole_file_and_keeps_individual_results():
+    assert sniff_lines(INDIVIDUAL * 3 + TEAM)[0] == "hytek-team"
+
+    rows = list(parse_file.iter_results(INDIVIDUAL * 3 + TEAM))
+    assert [(row["Last Name"], row["Mark"]) for row in rows] == [("Doe", "1:39.74")] * 3 + [("", "3:31.20")]
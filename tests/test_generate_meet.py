@@ -0,0 +1,29 @@
+import io
+import os
+import sys
+
+import parse_file
+
+# Import the benchmark generator
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "bench"))
+from generate_meet import feet_inches, write_meet
+
+def test_feet_inches():
+    assert feet_inches(5.60) == "18-04.50"
+    assert feet_inches(3.74) == "12-03.25"
+
+def meet(lines, seed):
+    out = io.StringIO()
+    write_meet(out, lines, seed)
+    return out.getvalue()
+
+def test_meet_has_field_marks_relays_and_wind_readings():
+    text = meet(2000, 1)
+    assert meet(2000, 1) == text
+
+    rows = list(parse_file.iter_results(text.encode(), fixed_width=True, mark_values=True))
+    assert any(row["Mark Meters"] != "" and row.mark.endswith("m") for row in rows)
+    assert any(row["Mark Meters"] != "" and "-" in row.mark for row in rows)
+    assert any(not row.last_name and row["Mark Seconds"] != "" for row in rows)
+    assert any(row.wind.startswith(("+", "-")) for row in rows)
+    assert {row.mark[-1] for row in rows} >= set("qQ*#@")
@@ -0,0 +1,39 @@
+import io
+import time
+
+import jobs
+
+RESULTS = (
+    "Event 1  Girls 600 Meter Run\n"
+    "    Name                    Year School                  Prelims\n"
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\n"
+)
+
+def test_run_job_writes_output_and_no_partial(tmp_path):
+    store = jobs.JobStore(str(tmp_path))
+    job_id = store.submit(io.BytesIO(RESULTS.encode()), {"Meet Date": "2024-01-01"})
+    jobs.run_job(store, store.claim())
+
+    assert store.get(job_id)["status"] == jobs.DONE
+    assert store.get(job_id)["rows"] == 1
+    assert not list(tmp_path.glob("*.part"))
+
+def test_each_claim_writes_its_own_partial(tmp_path):
+    store = jobs.JobStore(str(tmp_path))
+    assert store.partial_path("abc", 1) != store.partial_path("abc", 2)
+
+def test_heartbeat_keeps_job_fresh_without_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_SECONDS", 0.05)
+    store = jobs.JobStore(str(tmp_path))
+    job_id = store.submit(io.BytesIO(RESULTS.encode()), {})
+    store.claim()
+    claimed = store.get(job_id)["updated"]
+
+    # No lines or rows pass, as while a source is read whole
+    with jobs.JobProgress(store, job_id):
+        time.sleep(0.3)
+
+    assert store.get(job_id)["updated"] > claimed
+
+def test_stale_claim_needs_many_missed_heartbeats():
+    assert jobs.STALE_SECONDS >= 10 * jobs.HEARTBEAT_SECONDS
@@ -0,0 +1,55 @@
+import math
+
+import pytest
+
+from marks import FOOT, INCH, add_mark_columns, iter_with_marks, normalize_marks
+from rows import ResultRow
+
+def normalized(marks):
+    converted = normalize_marks(marks)
+    return [tuple(None if isinstance(value, float) and math.isnan(value) else value for value in mark)
+            for mark in zip(*(converted[name].tolist() for name in ("seconds", "meters", "qualifier", "record")))]
+
+def test_times_become_seconds():
+    assert normalized(["10.23", "1:58.23q", "1:02:03.4", "46.2"]) == [
+        (10.23, None, False, False),
+        (118.23, None, True, False),
+        (3723.4, None, False, False),
+        (46.2, None, False, False),
+    ]
+
+def test_field_marks_become_meters():
+    converted = normalize_marks(["5.60m#", "18-04.50", "12-03.50Q"])
+    assert converted["meters"].tolist() == [5.6, round(18 * FOOT + 4.5 * INCH, 4), round(12 * FOOT + 3.5 * INCH, 4)]
+    assert math.isnan(converted["seconds"][1])
+    assert converted["record"].tolist() == [True, False, False]
+    assert converted["qualifier"].tolist() == [False, False, True]
+
+def test_unreadable_marks_are_blank_and_unflagged():
+    assert normalized(["DQ", "", "NT", "10.23*"]) == [
+        (None, None, False, False),
+        (None, None, False, False),
+        (None, None, False, False),
+        (10.23, None, False, True),
+    ]
+
+def test_empty_column():
+    converted = normalize_marks([])
+    assert all(len(values) == 0 for values in converted.values())
+
+@pytest.mark.parametrize("batch_size", [1, 2, 4096])
+def test_rows_get_mark_columns_in_order(batch_size):
+    marks = ["9.72*", "5.60m", "DNF"]
+    rows = [ResultRow("100 Meters", "Finals", "Girls", str(place), "Doe", "Jane", "10", "Bartlett", mark,
+                      "", "", "", False)
+            for place, mark in enumerate(marks, 1)]
+
+    rows = list(iter_with_marks(rows, batch_size))
+    assert [row["Mark"] for row in rows] == marks
+    assert [(row["Mark Seconds"], row["Mark Meters"], row["Record"]) for row in rows] == [
+        (9.72, "", True), ("", 5.6, False), ("", "", False)]
+
+def test_add_mark_columns_blanks_nan():
+    row = ResultRow("Shot Put", "Finals", "Boys", "1", "Lee", "Sam", "12", "Bartlett", "DQ", "", "", "", False)
+    add_mark_columns([row])
+    assert (row["Mark Seconds"], row["Mark Meters"], row["Qualifier"]) == ("", "", False)
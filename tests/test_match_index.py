@@ -0,0 +1,107 @@
+import io
+import os
+import random
+import sys
+
+import pytest
+from rapidfuzz import fuzz, process
+
+import match_index
+import norm_cache
+import parse_file
+import result_cache
+from match_index import SCHOOL_INDEX, MatchIndex, build_index
+from metrics import ParseMetrics
+from standard_events import STANDARD_EVENTS
+from standard_schools import STANDARD_SCHOOLS
+
+# Import the benchmark's synthetic school tables and misspellings
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "bench"))
+from bench_blocking import draw_queries, school_table
+from generate_meet import misspell
+
+def per_standard_loop(table, query, scorer):
+    """
+    The matching the index replaced: one extractOne per standardized name,
+    keeping the first best, matched above 85.
+    """
+    best_match, best_score = "", 0
+    for standard, alternatives in table.items():
+        result = process.extractOne(query, [standard] + alternatives, scorer=scorer)
+        if result[1] > best_score:
+            best_match, best_score = standard, result[1]
+    return (best_match if best_score > 85 else None), best_score <= 85
+
+@pytest.mark.parametrize("name, table, scorer", [("event", STANDARD_EVENTS, fuzz.WRatio),
+                                                 ("school", STANDARD_SCHOOLS, fuzz.partial_ratio)])
+def test_flat_index_matches_the_per_standard_loop(name, table, scorer):
+    index = build_index(name)
+    rng = random.Random(7)
+    strings = [choice for standard, alternatives in table.items() for choice in [standard] + alternatives]
+    queries = rng.sample(strings, min(len(strings), 120))
+    queries += [misspell(choice, rng) for choice in rng.sample(strings, min(len(strings), 120))]
+    queries += ["Xyzzy Academy", "Underwater Basket Weaving", ""]
+
+    # The exact-key path is left out: it keeps "Greater New Bedford RVT"
+    # itself where the loop's partial_ratio took the earlier "Bedford"
+    expected = [per_standard_loop(table, query, scorer) for query in queries]
+    flat = [index.fuzzy_resolve(query)[0] for query in queries]
+    assert [((match[0] if match else None), match is None) for match in flat] == expected
+
+    # The batch path scores the same flat choices in one matrix
+    assert [match for match, _ in index.resolve_scores(index.score(queries))] == flat
+
+def test_exact_keys_skip_the_fuzzy_scorer():
+    index = MatchIndex("school", {"Cape Cod Regional Technical": [], "Notre Dame Academy": ["NDA"],
+                                  "Littleton": [], "Saint John's": []})
+    index._scorer = lambda *args, **kwargs: pytest.fail("scored")
+
+    assert index.resolve("Cape Cod Reg. Tech")[0] == ("Cape Cod Regional Technical", 100.0)
+    assert index.resolve("N.D.A.")[0] == ("Notre Dame Academy", 100.0)
+    assert index.resolve("Littleton High School")[0] == ("Littleton", 100.0)
+    assert index.resolve_many(["ST. JOHNS", "littleton h.s."]) == [(("Saint John's", 100.0), []),
+                                                                   (("Littleton", 100.0), [])]
+    assert index.stats()["exact_hits"] == 5 and index.stats()["fuzzy_lookups"] == 0
+
+def test_parse_metrics_count_exact_hits(monkeypatch):
+    # A fresh cache, so every distinct name reaches the index
+    monkeypatch.setattr(norm_cache, "NORM_CACHE", norm_cache.NormalizationCache())
+    monkeypatch.setattr(result_cache, "RESULT_CACHE", None)
+    source = ["Event 1  Girls 600 Meter Run\n",
+              "    Name                    Year School                  Prelims\n",
+              "  1 Jane Doe                 10 Bartlett High School     1:39.74   2\n",
+              "  2 Mary Smith               11 Xyzzy Academy            1:41.02   2\n"]
+
+    metrics = ParseMetrics()
+    parse_file.write_results(parse_file.iter_results(source, metrics=metrics), io.StringIO(), metrics)
+    counters = metrics.as_dict()["counters"]
+
+    assert counters["exact_hits"] >= 1 and counters["fuzzy_lookups"] >= 1
+    assert counters["exact_hit_rate"] == round(counters["exact_hits"] /
+                                               (counters["exact_hits"] + counters["fuzzy_lookups"]), 4)
+
+def test_blocked_lookups_find_the_unblocked_top_match(monkeypatch):
+    monkeypatch.setattr(match_index, "BLOCKING_MIN_CHOICES", 2000)
+    table = school_table(3000, seed=1)
+    index = MatchIndex("school", table, SCHOOL_INDEX.scorer_name)
+    assert index.blocker is not None and index.blocker.count == len(index.choices)
+
+    queries = [query for query in draw_queries(table, 150, seed=2) if index.exact_match(query) is None]
+    assert len(queries) > 100
+
+    unblocked = [index.fuzzy_resolve(query)[0] for query in queries]
+    assert any(unblocked) and not all(unblocked)
+    assert [match for match, _ in index.resolve_many(queries)] == unblocked
+    assert [index.resolve(query)[0] for query in queries] == unblocked
+
+def test_small_tables_are_not_blocked():
+    assert MatchIndex("school", school_table(100, seed=1)).blocker is None
+
+def test_blocker_candidates_are_in_table_order_and_limited():
+    index = MatchIndex("school", school_table(3000, seed=1), SCHOOL_INDEX.scorer_name)
+    blocker = match_index.TrigramBlocker(index.choices)
+
+    candidates = blocker.candidates("Westborogh High", limit=20)
+    assert len(candidates) == 20 and candidates == sorted(candidates)
+    assert index.choices.index("Westborough") in candidates
+    assert blocker.candidates("") == []
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+import parse_file
+from multipart import MultipartError, MultipartReader, parse_options_header
+
+BOUNDARY = "----boundary42"
+
+RESULTS = (
+    b"Event 1  Girls 600 Meter Run\r\n"
+    b"    Name                    Year School                  Prelims\r\n"
+    b"  1 Jane Doe                 10 Bartlett                 1:39.74   2\r\n"
+)
+
+def multipart_body(fields, filename, data):
+    body = b"preamble\r\n"
+    for name, value in fields.items():
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                 f"{value}\r\n").encode()
+    body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+             f"Content-Type: text/plain\r\n\r\n").encode()
+    return body + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+def test_parse_options_header():
+    assert parse_options_header('form-data; name="file"; filename="a;b.txt"')[0] == "form-data"
+    assert parse_options_header('multipart/form-data; boundary=xyz') == ("multipart/form-data", {"boundary": "xyz"})
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(BOUNDARY) + 3, 64 * 1024])
+def test_parts_survive_delimiters_split_across_chunks(chunk_size):
+    data = RESULTS + b"\r\n--" + BOUNDARY[:-1].encode() + b" not a delimiter\r\n"
+    body = multipart_body({"format": "csv", "batch_schools": "1"}, "meet.txt", data)
+    reader = MultipartReader(io.BytesIO(body), BOUNDARY, len(body), chunk_size)
+
+    parts = reader.parts()
+    assert next(parts).read_value() == "csv"
+    assert next(parts).read_value() == "1"
+    upload = next(parts)
+    assert upload.name == "file" and upload.filename == "meet.txt"
+    assert upload.read() == data
+    assert list(parts) == []
+
+def test_unread_parts_are_skipped():
+    body = multipart_body({"format": "csv"}, "meet.txt", RESULTS)
+    names = [part.name for part in MultipartReader(io.BytesIO(body), BOUNDARY, chunk_size=5).parts()]
+    assert names == ["format", "file"]
+
+def test_upload_streams_into_parser():
+    body = multipart_body({}, "meet.txt", RESULTS)
+    upload = next(MultipartReader(io.BytesIO(body), BOUNDARY, chunk_size=16).parts())
+
+    rows = list(parse_file.iter_results(upload))
+    assert [(row["Last Name"], row["School"]) for row in rows] == [("Doe", "Bartlett")]
+
+def test_content_length_bounds_the_read():
+    body = multipart_body({"format": "csv"}, "meet.txt", RESULTS)
+    reader = MultipartReader(io.BytesIO(body + b"trailing bytes"), BOUNDARY, len(body))
+    assert [part.name for part in reader.parts()] == ["format", "file"]
+
+def test_truncated_body_raises():
+    body = multipart_body({}, "meet.txt", RESULTS)[:-20]
+    upload = next(MultipartReader(io.BytesIO(body), BOUNDARY).parts())
+    with pytest.raises(MultipartError):
+        upload.read()
+
+def test_from_headers_requires_multipart():
+    with pytest.raises(MultipartError):
+        MultipartReader.from_headers(io.BytesIO(b""), {"content-type": "text/plain"})
+    with pytest.raises(MultipartError):
+        MultipartReader.from_headers(io.BytesIO(b""), {"content-type": "multipart/form-data"})
+
+def test_oversized_field_raises(monkeypatch):
+    monkeypatch.setattr("multipart.MAX_FIELD_SIZE", 4)
+    body = multipart_body({"format": "spreadsheet"}, "meet.txt", RESULTS)
+    with pytest.raises(MultipartError):
+        next(MultipartReader(io.BytesIO(body), BOUNDARY).parts()).read_value()
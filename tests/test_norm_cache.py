@@ -0,0 +1,79 @@
+import sqlite3
+
+import match_index
+import norm_cache
+from match_index import MatchIndex
+from norm_cache import NormalizationCache
+
+OLD_TABLE = {"Bartlett": ["Bartlett High School"], "Doherty": ["Doherty Memorial"]}
+NEW_TABLE = dict(OLD_TABLE, Westborough=["Westborough High"])
+
+def stored_rows(path):
+    return sqlite3.connect(path).execute("SELECT version, raw FROM normalized ORDER BY rowid").fetchall()
+
+def test_stored_results_are_reused_across_processes(tmp_path):
+    path = str(tmp_path / "norm.db")
+    index = MatchIndex("school", OLD_TABLE)
+
+    first = NormalizationCache(db_path=path)
+    result = first.resolve(index, "Bartlet")
+    first.flush()
+
+    second = NormalizationCache(db_path=path)
+    assert second.resolve(index, "Bartlet") == result
+    assert (second.disk_hits, second.misses) == (1, 0)
+
+def test_processes_on_different_table_versions_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / "norm.db")
+    old, new = MatchIndex("school", OLD_TABLE), MatchIndex("school", NEW_TABLE)
+    assert old.version != new.version
+
+    old_cache = NormalizationCache(db_path=path)
+    old_cache.resolve(old, "Bartlet")
+    old_cache.flush()
+
+    new_cache = NormalizationCache(db_path=path)
+    new_cache.resolve(new, "Bartlet")
+    new_cache.flush()
+
+    # The old version's entry is still there for processes running it
+    assert {version for version, _ in stored_rows(path)} == {old.version, new.version}
+    restarted = NormalizationCache(db_path=path)
+    restarted.resolve(old, "Bartlet")
+    assert restarted.disk_hits == 1
+
+def test_store_is_pruned_to_its_size_oldest_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(norm_cache, "PRUNE_EVERY", 1)
+    monkeypatch.setattr(norm_cache, "FLUSH_EVERY", 1)
+    path = str(tmp_path / "norm.db")
+    index = MatchIndex("school", OLD_TABLE)
+
+    cache = NormalizationCache(db_path=path, max_rows=3)
+    for query in ("a school", "b school", "c school", "d school", "e school"):
+        cache.resolve(index, query)
+
+    assert [raw for _, raw in stored_rows(path)] == ["c school", "d school", "e school"]
+
+def test_matcher_settings_change_misses(tmp_path, monkeypatch):
+    path = str(tmp_path / "norm.db")
+    index = MatchIndex("school", OLD_TABLE)
+
+    cache = NormalizationCache(db_path=path)
+    cache.resolve(index, "Xyzzy Academy")
+    cache.flush()
+
+    # Same table, but unmatched names now offer a different number of candidates
+    monkeypatch.setattr(match_index, "CANDIDATE_LIMIT", match_index.CANDIDATE_LIMIT + 1)
+    changed = MatchIndex("school", OLD_TABLE)
+    assert changed.table_version == index.table_version and changed.version != index.version
+
+    restarted = NormalizationCache(db_path=path)
+    restarted.resolve(changed, "Xyzzy Academy")
+    assert (restarted.disk_hits, restarted.misses) == (0, 1)
+
+def test_snapshot_keeps_the_version(monkeypatch):
+    index = MatchIndex("school", OLD_TABLE)
+    assert MatchIndex.from_snapshot("school", index.to_snapshot()).version == index.version
+
+    monkeypatch.setattr(match_index, "MATCH_THRESHOLD", match_index.MATCH_THRESHOLD + 1)
+    assert MatchIndex.from_snapshot("school", index.to_snapshot()).version != index.version
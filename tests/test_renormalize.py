@@ -0,0 +1,93 @@
+import csv
+import json
+
+import pytest
+
+import parse_file
+import renormalize
+from match_index import EVENT_INDEX, SCHOOL_INDEX, MatchIndex
+from renormalize import raw_fields_path, renormalize_file
+from standard_schools import STANDARD_SCHOOLS
+
+RESULTS = (
+    "Event 1  Girls 600 Meter Run\n"
+    "    Name                    Year School                  Prelims\n"
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\n"
+    "  2 Mary Smith               11 Xyzzy Academy            1:41.02   2\n"
+    "  3 Sam Lee                  12 Xyzzy Academy            1:42.50   2\n"
+)
+
+@pytest.fixture
+def output(tmp_path):
+    path = str(tmp_path / "meet.csv")
+    parse_file.parse_results(RESULTS.encode(), {}, path, keep_raw=True)
+    return path
+
+@pytest.fixture
+def new_tables(monkeypatch):
+    """
+    Alias tables where "Xyzzy Academy" is an alternative of the first school.
+    """
+    table = {school: list(alternatives) for school, alternatives in STANDARD_SCHOOLS.items()}
+    school = next(iter(table))
+    table[school].append("Xyzzy Academy")
+    monkeypatch.setattr(renormalize, "current_indexes",
+                        lambda: {"event": EVENT_INDEX, "school": MatchIndex("school", table, SCHOOL_INDEX.scorer_name)})
+    return school
+
+def read_rows(path):
+    return list(csv.DictReader(open(path, newline="")))
+
+def test_raw_fields_record_what_each_string_resolved_to(output):
+    raw = json.load(open(raw_fields_path(output)))
+    results = dict(zip(raw["schools"], raw["school_results"]))
+
+    assert results["Xyzzy Academy"] is None
+    assert results["Bartlett"] == read_rows(output)[0]["School"]
+    assert raw["event_results"] == [read_rows(output)[0]["Event"]]
+    assert raw["rows"] == [[0, 0], [0, 1], [0, 1]]
+
+def test_unchanged_tables_rewrite_nothing(output):
+    before = open(output).read()
+    assert renormalize_file(output)["changed"] == 0
+    assert open(output).read() == before
+
+def test_table_change_rewrites_only_affected_rows(output, new_tables):
+    report = renormalize_file(output)
+    assert report["changed"] == 2
+
+    rows = read_rows(output)
+    assert [(row["School"], row["Review"]) for row in rows[1:]] == [(new_tables, "False")] * 2
+    assert rows[0]["School"] != new_tables
+
+    # The new results are recorded, so running again changes nothing
+    raw = json.load(open(raw_fields_path(output)))
+    assert dict(zip(raw["schools"], raw["school_results"]))["Xyzzy Academy"] == new_tables
+    assert renormalize_file(output)["changed"] == 0
+
+def test_old_results_come_from_the_raw_fields_not_the_output(output, new_tables):
+    # A reviewer clearing the flag by hand does not make the string matched
+    rows = list(csv.reader(open(output, newline="")))
+    review = rows[0].index("Review")
+    rows[2][review] = "False"
+    csv.writer(open(output, "w", newline="")).writerows(rows)
+
+    renormalize_file(output)
+    assert [row["School"] for row in read_rows(output)[1:]] == [new_tables] * 2
+
+def test_raw_fields_without_results_are_rechecked_in_full(output, new_tables):
+    raw = json.load(open(raw_fields_path(output)))
+    for key in ("event_results", "school_results"):
+        del raw[key]
+    raw["format"] = 1
+    json.dump(raw, open(raw_fields_path(output), "w"))
+
+    report = renormalize_file(output)
+    assert report["rechecked"] == len(raw["events"]) + len(raw["schools"])
+    assert report["changed"] == 2
+    assert json.load(open(raw_fields_path(output)))["format"] == renormalize.RAW_FORMAT
+
+def test_dry_run_writes_nothing(output, new_tables):
+    before = open(output).read()
+    assert renormalize_file(output, dry_run=True)["changed"] == 2
+    assert open(output).read() == before
@@ -0,0 +1,106 @@
+import io
+import os
+
+import parse_file
+import result_cache
+from result_cache import FileCacheBackend, ResultCache
+
+def test_parser_digest_covers_matcher_and_decoding_code():
+    for module_name in ("parse_file", "formats", "columns", "match_index", "marks", "byte_lines"):
+        assert module_name in result_cache.PARSER_MODULES
+
+def test_key_changes_with_parser_code(tmp_path, monkeypatch):
+    cache = ResultCache(FileCacheBackend(str(tmp_path)))
+    key = cache.key("text", {})
+
+    monkeypatch.setattr(result_cache, "PARSER_MODULES", ("parse_file",))
+    assert ResultCache(FileCacheBackend(str(tmp_path))).key("text", {}) != key
+
+RESULTS = (
+    "Event 1  Girls 600 Meter Run\r\n"
+    "    Name                    Year School                  Prelims\r\n"
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\r\n"
+    "  2 Mary Smith               11 Bartlett                 1:41.02   2\r\n"
+)
+
+def parse(source):
+    return [dict(row) for row in parse_file.iter_results(source)]
+
+def use_cache(tmp_path, monkeypatch):
+    cache = ResultCache(FileCacheBackend(str(tmp_path)))
+    monkeypatch.setattr(result_cache, "RESULT_CACHE", cache)
+    return cache
+
+def test_file_bytes_and_stream_share_one_entry(tmp_path, monkeypatch):
+    cache = use_cache(tmp_path / "cache", monkeypatch)
+    path = tmp_path / "results.txt"
+    path.write_bytes(RESULTS.encode())
+
+    first = parse(str(path))
+    assert parse(RESULTS.encode()) == first
+    assert parse(io.BytesIO(RESULTS.encode())) == first
+    assert parse(io.StringIO(RESULTS.replace("\r\n", "\n"))) == first
+    assert (cache.hits, cache.misses) == (3, 1)
+
+def test_long_stream_is_stored_under_its_streamed_key(tmp_path, monkeypatch):
+    cache = use_cache(tmp_path, monkeypatch)
+    monkeypatch.setattr(result_cache, "MAX_BUFFERED_CHARS", 100)
+
+    first = parse(io.StringIO(RESULTS))
+    assert cache.hits == 0
+    assert parse(RESULTS.encode()) == first
+    assert cache.hits == 1
+
+def test_unfinished_parse_stores_nothing(tmp_path, monkeypatch):
+    cache = use_cache(tmp_path, monkeypatch)
+    monkeypatch.setattr(result_cache, "MAX_BUFFERED_CHARS", 100)
+
+    next(parse_file.iter_results(io.StringIO(RESULTS)))
+    parse(RESULTS.encode())
+    assert cache.hits == 0
+
+def test_key_depends_on_text_options_and_tables(tmp_path, monkeypatch):
+    cache = ResultCache(FileCacheBackend(str(tmp_path)))
+    key = cache.key(RESULTS, {"batch_schools": False})
+
+    assert cache.key(RESULTS.replace("\r\n", "\n"), {"batch_schools": False}) == key
+    assert cache.key(RESULTS + "\n", {"batch_schools": False}) != key
+    assert cache.key(RESULTS, {"batch_schools": True}) != key
+
+    monkeypatch.setattr(result_cache.SCHOOL_INDEX, "version", "changed")
+    assert cache.key(RESULTS, {"batch_schools": False}) != key
+
+def test_streamed_key_matches_whole_text_key(tmp_path):
+    cache = ResultCache(FileCacheBackend(str(tmp_path)))
+    key = cache.source_key({"fixed_width": True})
+    assert list(key.track(RESULTS.splitlines(True))) == RESULTS.splitlines(True)
+    assert key.hexdigest() == cache.key(RESULTS, {"fixed_width": True})
+
+def test_alias_table_change_misses(tmp_path, monkeypatch):
+    cache = use_cache(tmp_path, monkeypatch)
+    parse(RESULTS.encode())
+
+    monkeypatch.setattr(result_cache.EVENT_INDEX, "version", "changed")
+    parse(RESULTS.encode())
+    assert (cache.hits, cache.misses) == (0, 2)
+
+def test_entries_round_trip_every_stored_field(tmp_path, monkeypatch):
+    use_cache(tmp_path, monkeypatch)
+    source = RESULTS.replace("Bartlett", "Xyzzy Academy").encode()
+
+    parsed = list(parse_file.iter_results(source))
+    cached = list(parse_file.iter_results(source))
+    assert [[getattr(row, name) for name in result_cache.STORED_FIELDS] for row in cached] == \
+        [[getattr(row, name) for name in result_cache.STORED_FIELDS] for row in parsed]
+    assert cached[0].school_candidates
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    backend = FileCacheBackend(str(tmp_path), max_bytes=10)
+    backend.put("old", b"12345")
+    os.utime(tmp_path / "old.rows", (0, 0))
+    backend.put("new", b"12345")
+    assert backend.get("old") is not None
+
+    backend.put("newest", b"12345")
+    assert backend.get("new") is None
+    assert backend.get("old") is not None and backend.get("newest") is not None
@@ -0,0 +1,49 @@
+import norm_cache
+import parse_file
+import sections
+from review import ReviewSummary
+from rows import ResultRow
+
+RESULTS = (
+    "Event 1  Girls 600 Meter Run\n"
+    "    Name                    Year School                  Prelims\n"
+    "  1 Jane Doe                 10 Bartlett                 1:39.74   2\n"
+    "  2 Mary Smith               11 Xyzzy Academy            1:41.02   2\n"
+    "Event 2  Boys Two Mile Run\n"
+    "    Name                    Year School                  Prelims\n"
+    "  1 Sam Lee                  12 Xyzzy Academy           10:12.44   1\n"
+)
+
+def summarize(rows):
+    summary = ReviewSummary()
+    for _ in summary.track(rows):
+        pass
+    return summary.unresolved()
+
+def test_unresolved_groups_rows_with_candidates():
+    entries = summarize(parse_file.iter_results(RESULTS.splitlines(True)))
+    entries = {(entry["kind"], entry["raw"]): entry for entry in entries}
+
+    school = entries[("school", "Xyzzy Academy")]
+    assert school["rows"] == [1, 2]
+    assert school["candidates"] and all(candidate["score"] < 85 for candidate in school["candidates"])
+    assert entries[("event", "Two Mile Run")]["rows"] == [2]
+    assert ("school", "Bartlett") not in entries
+
+def test_summary_does_not_look_strings_up_again(monkeypatch):
+    rows = list(parse_file.iter_results(RESULTS.splitlines(True)))
+
+    def fail(*args):
+        raise AssertionError("looked up again")
+
+    monkeypatch.setattr(norm_cache.NORM_CACHE, "resolve", fail)
+    monkeypatch.setattr(norm_cache.NORM_CACHE, "resolve_many", fail)
+    assert summarize(rows)
+
+def test_candidates_survive_batch_and_section_parsing():
+    expected = summarize(parse_file.iter_results(RESULTS.splitlines(True)))
+    assert summarize(parse_file.iter_results(RESULTS.splitlines(True), batch_schools=True)) == expected
+
+    # Candidates travel back from section workers with the other row fields
+    fields = sections.parse_chunk(RESULTS.splitlines(True), 1, "", False, False, "hytek")
+    assert summarize(ResultRow(*row) for row in fields) == expected
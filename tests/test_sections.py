@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+import parse_file
+import sections
+from result_cache import STORED_FIELDS
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "tmp", "Sample Track Meet Results.txt")
+
+def meet_lines(events=12):
+    lines = ["                                        HY-TEK's Meet Manager\n"]
+    for event in range(1, events + 1):
+        lines.append(f"Event {event}  {'Girls' if event % 2 else 'Boys'} {200 * event} Meter Run\n")
+        lines.append("    Name                    Year School                  Prelims      H#\n")
+        lines.append("=" * 72 + "\n")
+
+        # Every "Finals" line sets the round for the rest of the file
+        if event == 5:
+            lines.append("Finals\n")
+        for place in range(1, 6):
+            school = ["Bartlett", "Xyzzy Academy", "Saint John's"][place % 3]
+            lines.append(f"{place:>3} {'Jane Doe':<24}{'10':>4} {school:<22}{f'1:{place + 10}.{event:02d}':>9}{1:>7}\n")
+        lines.append(" \n")
+    return lines
+
+def fields(rows):
+    return [tuple(getattr(row, name) for name in STORED_FIELDS) for row in rows]
+
+def test_split_sections_cuts_at_event_headers_and_carries_the_round():
+    lines = meet_lines()
+    chunks = sections.split_sections(lines, 20)
+
+    assert [line for chunk, _, _ in chunks for line in chunk] == lines
+    for chunk, first_line, _ in chunks[1:]:
+        assert chunk[0].startswith("Event ") and lines[first_line - 1] is chunk[0]
+    assert [initial_round for _, first_line, initial_round in chunks] == \
+        ["" if first_line < lines.index("Finals\n") else "Final" for _, first_line, _ in chunks]
+
+@pytest.mark.parametrize("batch_schools", [False, True])
+def test_section_workers_match_serial_parse(monkeypatch, batch_schools):
+    monkeypatch.setattr(sections, "MIN_CHUNK_LINES", 10)
+    lines = meet_lines()
+
+    serial = list(parse_file.iter_matched_rows(lines, batch_schools))
+    parallel = list(sections.iter_section_rows(lines, workers=2, batch_schools=batch_schools, cache_db=None))
+    assert len(sections.split_sections(lines, 10)) > 2
+    assert fields(parallel) == fields(serial)
+
+def test_sample_file_matches_serial_parse(monkeypatch):
+    monkeypatch.setattr(sections, "MIN_CHUNK_LINES", 50)
+
+    serial = list(parse_file.iter_matched_rows(SAMPLE))
+    parallel = list(sections.iter_section_rows(SAMPLE, workers=2, cache_db=None))
+    assert len(serial) == 202
+    assert fields(parallel) == fields(serial)
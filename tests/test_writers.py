@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+import parse_file
+from rows import ResultRow
+from writers import OUTPUT_FORMATS
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+COLUMNS = ["Event", "School", "Place", "Grade", "Heat", "Wind", "Points", "Review", "Athlete ID"]
+
+def make_row(place, grade, heat="", wind="", points="", school="Bartlett", review=False):
+    return ResultRow("600m", "Prelim", "F", place, "Doe", "Jane", grade, school, "1:39.74", heat, wind, points,
+                     review)
+
+def write(rows, output_format, columns=COLUMNS):
+    sink = io.BytesIO()
+    assert OUTPUT_FORMATS[output_format].write(rows, sink, columns) == len(rows)
+    sink.seek(0)
+    if output_format == "parquet":
+        return pq.read_table(sink)
+    return pa.ipc.open_stream(sink).read_all()
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_typed_columns_round_trip(output_format):
+    table = write([make_row("1", "10", "2", "+1.3", "10"), make_row("2", "9", "1", "-0.4", "0.50", review=True)],
+                  output_format)
+
+    assert table.column("Place").type == pa.int32()
+    assert table.column("Grade").type == pa.int16()
+    assert table.to_pydict()["Grade"] == [10, 9]
+    assert table.to_pydict()["Wind"] == [1.3, -0.4]
+    assert table.to_pydict()["Points"] == [10.0, 0.5]
+    assert table.to_pydict()["Review"] == [False, True]
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_blank_unparseable_and_out_of_range_values_are_null(output_format):
+    rows = [
+        make_row("1", "", heat=""),
+        make_row("2", "SR", heat="2a", wind="NWI"),
+        make_row("3", "2025", heat="99999", points="1e400"),
+        make_row("9" * 30, "99999999999999999999", heat="-1"),
+    ]
+    table = write(rows, output_format).to_pydict()
+
+    assert table["Grade"] == [None, None, 2025, None]
+    assert table["Heat"] == [None, None, None, None]
+    assert table["Place"] == [1, 2, 3, None]
+    assert table["Wind"] == [None, None, None, None]
+    assert table["Points"] == [None, None, None, None]
+    assert table["Athlete ID"] == [None] * 4
+
+def test_repeated_strings_are_dictionary_encoded():
+    rows = [make_row(str(place), "10", school=["Bartlett", "Doherty", ""][place % 3]) for place in range(1, 7)]
+    table = write(rows, "parquet")
+
+    assert pa.types.is_dictionary(table.column("School").type)
+    assert table.column("Event").to_pylist() == ["600m"] * 6
+    assert table.column("School").to_pylist() == ["Doherty", None, "Bartlett"] * 2
+
+def test_class_year_grade_no_longer_loses_the_meet(tmp_path):
+    source = (b"Event 1  Girls 600 Meter Run\n"
+              b"    Name                    Year School                  Prelims\n"
+              b"  1 Jane Doe                 2025 Bartlett             1:39.74   2\n"
+              b"  2 Mary Smith               11 Bartlett               1:41.02   2\n")
+    path = str(tmp_path / "meet.parquet")
+    assert parse_file.parse_results(source, {}, path, output_format="parquet") == 2
+    assert pq.read_table(path).column("Grade").to_pylist() == [2025, 11]
+
+def test_text_formats_keep_raw_values():
+    sink = io.StringIO()
+    OUTPUT_FORMATS["ndjson"].write([make_row("1", "SR", heat="2a")], sink, COLUMNS)
+    assert json.loads(sink.getvalue())["Grade"] == "SR"